@@ -0,0 +1,304 @@
+# benchmark_index.py
+# ============================================
+# ⚾ FAISS 인덱스 종류별 recall / 지연시간 / 메모리 비교
+#  - 기준: flat(정확 검색) 결과
+#  - 저장된 벡터 스토어(index.faiss)의 벡터를 그대로 사용 (임베딩 호출 없음)
+#  - 벡터 스토어가 없으면 --synthetic N 으로 임의 벡터 생성
+#  - --csv 면 문서 CSV를 EMBEDDING_BACKEND로 임베딩 (hashing이면 네트워크 없이)
+#
+# 사용 예:
+#   python benchmark_index.py --store ./data/vector_store
+#   EMBEDDING_BACKEND=hashing python benchmark_index.py --csv ./data/final_final4_docs.csv
+#   python benchmark_index.py --synthetic 50000 --dim 256 --nprobe 1,8,32 --ef-search 16,64,256
+#   python benchmark_index.py --synthetic 20000 --dim 64 --filtered 3,20,500
+#     → 메타데이터 필터(허용 위치 N개) 안에서의 recall@k (기준: 같은 후보 안의 flat 정확 검색)
+#       EXACT_SEARCH_MAX_CANDIDATES 이하 후보는 서버처럼 정확 검색, --no-exact 면 근사 인덱스 그대로
+# ============================================
+
+import os
+import time
+import argparse
+from typing import Dict, List, Optional
+
+import numpy as np
+import faiss
+
+from vector_index import (
+    IndexConfig, INDEX_TYPES, COMPRESSED_TYPES, build_index, extract_vectors,
+    search_parameters, index_memory_bytes, exact_rerank, exact_search, use_exact_search, supports_selector
+)
+from store_manifest import read_manifest
+
+
+def load_vectors(store_path: str) -> np.ndarray:
+    """
+    벡터 스토어의 flat 인덱스에서 벡터 복원 (docstore pickle은 읽지 않음)
+
+    샤드 하나의 디렉터리를 주면 그 샤드만, vector_store 루트를 주면
+    매니페스트가 가리키는 현재 세대의 샤드 전체를 합쳐서
+    """
+    index_path = os.path.join(store_path, "index.faiss")
+    if os.path.exists(index_path):
+        return extract_vectors(faiss.read_index(index_path))
+
+    generation = read_manifest(store_path).get("generation")
+    base_dir = os.path.join(store_path, generation) if generation else store_path
+    parts = [
+        extract_vectors(faiss.read_index(os.path.join(base_dir, name, "index.faiss")))
+        for name in sorted(os.listdir(base_dir))
+        if os.path.exists(os.path.join(base_dir, name, "index.faiss"))
+    ]
+    if not parts:
+        raise FileNotFoundError(f"index.faiss 없음: {store_path}")
+    return np.concatenate(parts)
+
+
+def embed_csv(csv_path: str, batch_size: int = 1000) -> np.ndarray:
+    """문서 CSV의 DOC_TEXT를 설정된 임베딩 백엔드로 임베딩"""
+    import pandas as pd
+    from embedding_backends import create_embeddings, embedding_identity
+
+    embeddings = create_embeddings()
+    print(f"🔤 임베딩 백엔드: {embedding_identity(embeddings)}")
+    parts = []
+    for frame in pd.read_csv(csv_path, encoding="utf-8-sig", usecols=["DOC_TEXT"], chunksize=batch_size):
+        texts = frame["DOC_TEXT"].fillna("").astype(str).tolist()
+        parts.append(np.asarray(embeddings.embed_documents(texts), dtype="float32"))
+    return np.concatenate(parts)
+
+
+def make_queries(vectors: np.ndarray, n: int, noise: float, seed: int) -> np.ndarray:
+    """코퍼스 벡터를 뽑아 약간 흔든 것을 질의로 사용 (실제 질문 분포 근사)"""
+    rng = np.random.default_rng(seed)
+    picks = vectors[rng.choice(len(vectors), size=min(n, len(vectors)), replace=False)]
+    scale = noise * float(np.linalg.norm(picks, axis=1).mean()) / np.sqrt(vectors.shape[1])
+    return (picks + rng.normal(0, scale, picks.shape)).astype("float32")
+
+
+def recall_at_k(found: np.ndarray, truth: np.ndarray) -> float:
+    """정답(flat) top-k 중 찾아낸 비율"""
+    hits = sum(len(set(f[f >= 0]) & set(t[t >= 0])) for f, t in zip(found, truth))
+    return hits / max(int((truth >= 0).sum()), 1)
+
+
+def measure(
+    index: faiss.Index,
+    config: IndexConfig,
+    queries: np.ndarray,
+    k: int,
+    full_vectors: Optional[np.ndarray] = None,
+):
+    """
+    질의 1건씩 검색해서 (결과 위치, 지연시간 ms 목록)
+
+    full_vectors를 주면 k × rerank_factor개를 뽑아 원본 벡터로 재정렬한 시간까지 포함
+    """
+    search_k = k * config.rerank_factor if full_vectors is not None else k
+    params = search_parameters(index, config)
+    results, latencies = [], []
+    # 질의 1건 지연시간 기준이므로 측정 중에는 단일 스레드 (학습/구성은 멀티스레드)
+    threads = faiss.omp_get_max_threads()
+    faiss.omp_set_num_threads(1)
+    for q in queries:
+        x = q.reshape(1, -1)
+        start = time.perf_counter()
+        if params is not None:
+            _, ids = index.search(x, search_k, params=params)
+        else:
+            _, ids = index.search(x, search_k)
+        found = ids[0]
+        if full_vectors is not None:
+            reranked = exact_rerank(q, [int(p) for p in found if p >= 0], full_vectors)
+            found = np.full(k, -1, dtype="int64")
+            found[:min(k, len(reranked))] = [p for p, _ in reranked[:k]]
+        latencies.append((time.perf_counter() - start) * 1000)
+        results.append(found)
+    faiss.omp_set_num_threads(threads)
+    return np.asarray(results), latencies
+
+
+def measure_filtered(
+    index: faiss.Index,
+    config: IndexConfig,
+    queries: np.ndarray,
+    k: int,
+    allowed: List[np.ndarray],
+    vectors: np.ndarray,
+    rerank: bool = False,
+    exact: bool = True,
+):
+    """
+    질의마다 허용 위치(allowed[i]) 안에서만 검색 → (결과 위치, 지연시간 ms 목록)
+
+    서버(VectorShard.vector_search_batch)와 같은 경로: 후보가 적으면 정확 검색,
+    아니면 IDSelector 검색 (+ 압축 인덱스 재정렬)
+    """
+    results, latencies = [], []
+    threads = faiss.omp_get_max_threads()
+    faiss.omp_set_num_threads(1)
+    for q, positions in zip(queries, allowed):
+        x = q.reshape(1, -1)
+        start = time.perf_counter()
+        if (exact or not supports_selector(index)) and use_exact_search(index, config, len(positions)):
+            hits = exact_search(x, positions, vectors[positions], k)[0]
+            found_list = [p for p, _ in hits]
+        else:
+            search_k = min(k * config.rerank_factor if rerank else k, len(positions))
+            params = search_parameters(index, config, faiss.IDSelectorBatch(positions))
+            _, ids = index.search(x, search_k, params=params)
+            found_list = [int(p) for p in ids[0] if p >= 0]
+            if rerank:
+                found_list = [p for p, _ in exact_rerank(q, found_list, vectors)[:k]]
+        latencies.append((time.perf_counter() - start) * 1000)
+        found = np.full(k, -1, dtype="int64")
+        found[:min(k, len(found_list))] = found_list[:k]
+        results.append(found)
+    faiss.omp_set_num_threads(threads)
+    return np.asarray(results), latencies
+
+
+def filtered_truth(vectors: np.ndarray, queries: np.ndarray, k: int, allowed: List[np.ndarray]) -> np.ndarray:
+    """허용 위치 안의 정확한 top-k (부족하면 -1)"""
+    truth = np.full((len(queries), k), -1, dtype="int64")
+    for i, (q, positions) in enumerate(zip(queries, allowed)):
+        hits = exact_search(q.reshape(1, -1), positions, vectors[positions], k)[0]
+        truth[i, :len(hits)] = [p for p, _ in hits]
+    return truth
+
+
+def run_benchmark(
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    index_types: List[str],
+    k: int,
+    nprobes: List[int],
+    ef_searches: List[int],
+    base: IndexConfig,
+    filter_sizes: Optional[List[int]] = None,
+    exact: bool = True,
+    seed: int = 0,
+) -> List[Dict]:
+    """filter_sizes를 주면 허용 위치 N개짜리 필터 검색의 recall (아니면 전체 검색)"""
+    flat = build_index(vectors, IndexConfig(index_type="flat"))
+    truth, _ = measure(flat, IndexConfig(), queries, k)
+
+    # 필터 크기별 질의마다 임의 허용 위치 (모든 인덱스에 같은 집합)
+    rng = np.random.default_rng(seed)
+    filter_sets = {
+        size: [np.sort(rng.choice(len(vectors), size=min(size, len(vectors)), replace=False)).astype("int64")
+               for _ in queries]
+        for size in (filter_sizes or [])
+    }
+    filter_truths = {size: filtered_truth(vectors, queries, k, sets) for size, sets in filter_sets.items()}
+
+    rows = []
+    for index_type in index_types:
+        config = IndexConfig(**{**base.__dict__, "index_type": index_type})
+        start = time.perf_counter()
+        index = build_index(vectors, config)
+        build_sec = time.perf_counter() - start
+
+        if index_type in ("ivf_flat", "ivf_pq"):
+            sweep = [("nprobe", v) for v in nprobes]
+        elif index_type == "hnsw":
+            sweep = [("efSearch", v) for v in ef_searches]
+        else:
+            sweep = [("-", None)]
+
+        reranks = [False, True] if index_type in COMPRESSED_TYPES and config.rerank_factor > 0 else [False]
+        for (name, value), rerank in [(p, r) for p in sweep for r in reranks]:
+            if name == "nprobe":
+                config.nprobe = value
+            elif name == "efSearch":
+                config.ef_search = value
+            if filter_sets:
+                runs = [
+                    (size, measure_filtered(index, config, queries, k, filter_sets[size], vectors, rerank, exact),
+                     filter_truths[size])
+                    for size in filter_sets
+                ]
+            else:
+                runs = [("-", measure(index, config, queries, k, vectors if rerank else None), truth)]
+            for size, (found, latencies), expected in runs:
+                row = {
+                    "index": index_type + ("+rerank" if rerank else ""),
+                    "param": f"{name}={value}" if value is not None else "-",
+                }
+                if filter_sets:
+                    row["filter"] = size
+                    # k개를 못 채운 질의 비율 (후보가 k개 이상인데 결과가 모자란 경우)
+                    row["short"] = float(np.mean((found >= 0).sum(axis=1) < (expected >= 0).sum(axis=1)))
+                row.update({
+                    f"recall@{k}": recall_at_k(found, expected),
+                    "p50_ms": float(np.percentile(latencies, 50)),
+                    "p99_ms": float(np.percentile(latencies, 99)),
+                    "memory_mb": index_memory_bytes(index) / 1024 / 1024,
+                    "build_s": build_sec,
+                })
+                rows.append(row)
+    return rows
+
+
+def print_table(rows: List[Dict]):
+    if not rows:
+        return
+    headers = list(rows[0].keys())
+    print(" | ".join(f"{h:>12}" for h in headers))
+    print("-" * (15 * len(headers)))
+    for row in rows:
+        cells = [f"{v:>12.3f}" if isinstance(v, float) else f"{str(v):>12}" for v in row.values()]
+        print(" | ".join(cells))
+
+
+def _int_list(text: str) -> List[int]:
+    return [int(v) for v in text.split(",") if v.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FAISS 인덱스 종류별 recall/지연시간/메모리 비교")
+    parser.add_argument("--store", default=os.getenv("VECTOR_STORE_PATH", "./data/vector_store"))
+    parser.add_argument("--synthetic", type=int, default=0, help="벡터 스토어 대신 임의 벡터 N개 사용")
+    parser.add_argument("--csv", default=None, help="벡터 스토어 대신 문서 CSV를 EMBEDDING_BACKEND로 임베딩")
+    parser.add_argument("--dim", type=int, default=1536, help="--synthetic 벡터 차원")
+    parser.add_argument("--types", default=",".join(INDEX_TYPES))
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--noise", type=float, default=0.1)
+    parser.add_argument("-k", type=int, default=5)
+    parser.add_argument("--nprobe", default="1,4,8,16,32")
+    parser.add_argument("--ef-search", default="16,32,64,128")
+    parser.add_argument("--rerank-factor", type=int, default=None, help="압축 인덱스 재정렬 배수 (0 = 끔)")
+    parser.add_argument("--filtered", default="", help="필터 검색 recall: 허용 위치 수 목록 (예: 3,20,500)")
+    parser.add_argument("--no-exact", action="store_true", help="--filtered 에서 후보가 적어도 근사 인덱스로만 검색")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.synthetic:
+        rng = np.random.default_rng(args.seed)
+        # 군집 구조가 있는 임의 벡터 (균일 분포면 IVF가 비현실적으로 불리함)
+        centers = rng.normal(size=(max(args.synthetic // 200, 1), args.dim))
+        vectors = (centers[rng.integers(len(centers), size=args.synthetic)]
+                   + 0.3 * rng.normal(size=(args.synthetic, args.dim))).astype("float32")
+        print(f"🧪 임의 벡터 {vectors.shape[0]}개 × {vectors.shape[1]}차원")
+    elif args.csv:
+        vectors = embed_csv(args.csv)
+        print(f"📄 문서 CSV 임베딩: {args.csv} ({vectors.shape[0]}개 × {vectors.shape[1]}차원)")
+    else:
+        vectors = load_vectors(args.store)
+        print(f"📦 벡터 스토어 로드: {args.store} ({vectors.shape[0]}개 × {vectors.shape[1]}차원)")
+
+    queries = make_queries(vectors, args.queries, args.noise, args.seed)
+    base = IndexConfig.from_env()
+    if args.rerank_factor is not None:
+        base.rerank_factor = args.rerank_factor
+    index_types = [t.strip() for t in args.types.split(",") if t.strip() in INDEX_TYPES]
+
+    rows = run_benchmark(
+        vectors, queries, index_types, args.k,
+        _int_list(args.nprobe), _int_list(args.ef_search), base,
+        filter_sizes=_int_list(args.filtered), exact=not args.no_exact, seed=args.seed
+    )
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
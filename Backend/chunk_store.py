@@ -0,0 +1,83 @@
+# chunk_store.py
+# ============================================
+# ⚾ 청크 임베딩 저장소 (content-addressed, SQLite)
+#  - key = sha256(청크 텍스트) + 임베딩 모델 이름
+#  - 벡터 스토어를 다시 만들 때 바뀌지 않은 청크는 재임베딩하지 않음
+# ============================================
+
+import os
+import sqlite3
+import hashlib
+import threading
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+
+def text_hash(text: str) -> str:
+    """청크 텍스트의 content hash"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class ChunkEmbeddingStore:
+    def __init__(self, path: str, model_name: str):
+        dirname = os.path.dirname(path)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+
+        self.path = path
+        self.model_name = model_name
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS chunk_embeddings (
+                hash TEXT NOT NULL,
+                model TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                PRIMARY KEY (hash, model)
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get_many(self, hashes: Iterable[str]) -> Dict[str, List[float]]:
+        """저장된 임베딩만 {hash: vector}로 반환 (없는 hash는 빠짐)"""
+        hashes = list(dict.fromkeys(hashes))
+        found: Dict[str, List[float]] = {}
+
+        # SQLite 변수 개수 제한 때문에 나눠서 조회
+        step = 500
+        with self._lock:
+            for i in range(0, len(hashes), step):
+                part = hashes[i:i + step]
+                marks = ",".join("?" * len(part))
+                rows = self._conn.execute(
+                    f"SELECT hash, vector FROM chunk_embeddings WHERE model = ? AND hash IN ({marks})",
+                    [self.model_name, *part],
+                ).fetchall()
+                for h, blob in rows:
+                    found[h] = np.frombuffer(blob, dtype="float32").tolist()
+        return found
+
+    def put_many(self, items: Iterable[Tuple[str, List[float]]]):
+        rows = [
+            (h, self.model_name, np.asarray(v, dtype="float32").tobytes())
+            for h, v in items
+        ]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO chunk_embeddings (hash, model, vector) VALUES (?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+
+    def count(self) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM chunk_embeddings WHERE model = ?", (self.model_name,)
+            ).fetchone()
+        return int(row[0])
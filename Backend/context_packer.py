@@ -0,0 +1,194 @@
+# context_packer.py
+# ============================================
+# ⚾ RAG 프롬프트 컨텍스트 조립 (토큰 예산 기준)
+#  - tiktoken으로 토큰 수를 세서 예산 안에서만 청크를 채움
+#  - 500/50 분할기로 생긴 같은 행의 겹치는 청크는 하나로 합침
+#  - 질문에서 파싱한 조건(시즌/선수/핸드/구종)과 메타데이터가 맞는 청크를 먼저
+# ============================================
+
+import os
+import math
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+from logging_setup import get_logger
+
+logger = get_logger("context_packer")
+
+
+# 겹침으로 볼 최소 길이 (분할기 chunk_overlap=50 기준, 우연한 일치는 무시)
+MIN_OVERLAP_CHARS = 20
+
+
+@lru_cache(maxsize=8)
+def _encoding_for(model: str):
+    import tiktoken
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def get_token_counter(model: str) -> Tuple[Callable[[str], int], str]:
+    """
+    (토큰 수 세는 함수, 토크나이저 이름)
+
+    인코딩 파일을 받을 수 없는 환경이면 UTF-8 바이트 수 기반 추정치 사용
+    (한글 1글자 = 3바이트 ≈ 1토큰)
+    """
+    try:
+        encoding = _encoding_for(model)
+        return (lambda text: len(encoding.encode(text))), encoding.name
+    except Exception as e:
+        logger.warning("⚠️ tiktoken 인코딩 로드 실패, 추정치 사용: %s", e)
+        return (lambda text: math.ceil(len(text.encode("utf-8")) / 3)), "estimate"
+
+
+def _truncate(text: str, max_tokens: int, count: Callable[[str], int]) -> str:
+    """토큰 예산에 맞게 앞부분만 남김 (글자 단위 이분 탐색)"""
+    lo, hi = 0, len(text)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if count(text[:mid]) <= max_tokens:
+            lo = mid
+        else:
+            hi = mid - 1
+    return text[:lo]
+
+
+def _overlap(a: str, b: str) -> int:
+    """a의 끝과 b의 앞이 겹치는 길이 (MIN_OVERLAP_CHARS 미만이면 0)"""
+    for size in range(min(len(a), len(b)), MIN_OVERLAP_CHARS - 1, -1):
+        if a.endswith(b[:size]):
+            return size
+    return 0
+
+
+def _source_key(doc: Document) -> Any:
+    """같은 원본 행에서 나온 청크인지 (row_id, 없으면 메타데이터 전체)"""
+    row_id = doc.metadata.get("row_id")
+    if row_id is not None:
+        return ("row", row_id)
+    return ("meta", tuple(sorted((k, str(v)) for k, v in doc.metadata.items())))
+
+
+def dedupe_chunks(docs: List[Document]) -> List[Document]:
+    """
+    같은 원본 행의 청크끼리 중복/포함/겹침 제거
+
+    - 완전히 같거나 다른 청크에 포함되면 제거
+    - A 끝 == B 앞이면 A + B[겹침 이후]로 합침 (검색 순위는 앞선 쪽 기준)
+    """
+    merged: List[Document] = []
+    for doc in docs:
+        text = doc.page_content.strip()
+        key = _source_key(doc)
+        absorbed = False
+
+        for i, kept in enumerate(merged):
+            if _source_key(kept) != key:
+                continue
+            kept_text = kept.page_content
+            if text in kept_text:
+                new_text = kept_text
+            elif kept_text in text:
+                new_text = text
+            else:
+                head = _overlap(kept_text, text)
+                tail = _overlap(text, kept_text)
+                if head:
+                    new_text = kept_text + text[head:]
+                elif tail:
+                    new_text = text + kept_text[tail:]
+                else:
+                    continue
+            merged[i] = Document(page_content=new_text, metadata=kept.metadata)
+            absorbed = True
+            break
+
+        if not absorbed:
+            merged.append(Document(page_content=text, metadata=doc.metadata))
+    return merged
+
+
+def metadata_match_count(doc: Document, filters: Optional[Dict[str, Any]]) -> int:
+    """필터 조건 중 청크 메타데이터와 일치하는 키 수"""
+    matched = 0
+    for key, value in (filters or {}).items():
+        if value is None or key not in doc.metadata:
+            continue
+        values = value if isinstance(value, (list, tuple, set)) else [value]
+        if str(doc.metadata[key]) in {str(v) for v in values}:
+            matched += 1
+    return matched
+
+
+class ContextPacker:
+    def __init__(self, model: str = "gpt-4", max_tokens: int = 1500, separator: str = "\n\n"):
+        """
+        Args:
+            model: 토크나이저를 고를 LLM 모델 이름
+            max_tokens: 컨텍스트(청크들)에 쓸 최대 토큰 수
+        """
+        self.model = model
+        self.max_tokens = max_tokens
+        self.separator = separator
+        self.count, self.tokenizer = get_token_counter(model)
+
+    def pack(
+        self,
+        docs: List[Document],
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[str, List[Document], Dict[str, Any]]:
+        """
+        검색된 청크 → 토큰 예산 안의 컨텍스트
+
+        Returns:
+            (컨텍스트 문자열, 실제로 들어간 청크들, 디버그 정보)
+        """
+        unique = dedupe_chunks(docs)
+
+        # 메타데이터 일치 수가 많은 청크 먼저 (같으면 검색 순위 유지)
+        ranked = sorted(
+            enumerate(unique),
+            key=lambda item: (-metadata_match_count(item[1], filters), item[0])
+        )
+
+        sep_tokens = self.count(self.separator)
+        parts: List[str] = []
+        used: List[Document] = []
+        total = 0
+        truncated = False
+
+        for _, doc in ranked:
+            cost = self.count(doc.page_content) + (sep_tokens if parts else 0)
+            if total + cost <= self.max_tokens:
+                parts.append(doc.page_content)
+                used.append(doc)
+                total += cost
+            elif not parts:
+                # 첫 청크부터 예산 초과면 잘라서라도 넣음
+                text = _truncate(doc.page_content, self.max_tokens, self.count)
+                if text:
+                    parts.append(text)
+                    used.append(Document(page_content=text, metadata=doc.metadata))
+                    total = self.count(text)
+                    truncated = True
+
+        debug = {
+            "tokenizer": self.tokenizer,
+            "budget": self.max_tokens,
+            "context_tokens": total,
+            "chunks_retrieved": len(docs),
+            "chunks_after_dedupe": len(unique),
+            "chunks_used": len(used),
+            "truncated": truncated,
+        }
+        return self.separator.join(parts), used, debug
+
+
+def create_context_packer(model: str) -> ContextPacker:
+    """환경 변수 설정으로 컨텍스트 조립기 생성"""
+    return ContextPacker(model=model, max_tokens=int(os.getenv("RAG_CONTEXT_MAX_TOKENS", "1500")))
@@ -0,0 +1,125 @@
+# embedding_backends.py
+# ============================================
+# ⚾ 임베딩 백엔드 선택 (EMBEDDING_BACKEND)
+#  - openai  : OpenAIEmbeddings (기본)
+#  - hashing : 문자 n-gram 해싱 임베딩 (네트워크/모델 파일 없이 CPU에서, 항상 같은 결과)
+#              → 네트워크 없는 CI에서 인덱스 구축 / 벤치마크 / 검색 회귀 테스트용
+#  - 백엔드 정보(embedding_identity)는 벡터 스토어 매니페스트에 기록
+# ============================================
+
+import os
+import math
+import hashlib
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from embedding_cache import normalize_text
+
+from logging_setup import get_logger
+
+logger = get_logger("embedding_backends")
+
+
+EMBEDDING_BACKENDS = ("openai", "hashing")
+
+
+class HashingEmbeddings(Embeddings):
+    """
+    문자 n-gram 해싱 임베딩
+
+    - n-gram마다 blake2b 해시로 차원/부호를 정함 (파이썬 hash()와 달리 프로세스가 바뀌어도 같음)
+    - 가중치 1 + log(tf), L2 정규화 → 글자가 많이 겹치는 텍스트끼리 가까움
+    """
+
+    backend = "hashing"
+
+    def __init__(self, dim: int = 384, ngram_range: Tuple[int, int] = (2, 3)):
+        self.dim = dim
+        self.ngram_range = ngram_range
+        self.model = f"hashing-char{ngram_range[0]}{ngram_range[1]}-d{dim}"
+
+    def _ngrams(self, text: str) -> Counter:
+        text = f" {normalize_text(text).lower()} "
+        lo, hi = self.ngram_range
+        return Counter(
+            text[i:i + n]
+            for n in range(lo, hi + 1)
+            for i in range(len(text) - n + 1)
+        )
+
+    def _embed(self, text: str) -> List[float]:
+        vector = np.zeros(self.dim, dtype="float32")
+        for gram, count in self._ngrams(text).items():
+            h = int.from_bytes(hashlib.blake2b(gram.encode("utf-8"), digest_size=8).digest(), "little")
+            sign = 1.0 if h >> 63 else -1.0
+            vector[h % self.dim] += sign * (1.0 + math.log(count))
+        norm = float(np.linalg.norm(vector))
+        if norm > 0:
+            vector /= norm
+        return vector.tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+
+def embedding_identity(embeddings: Any) -> Dict[str, Any]:
+    """
+    백엔드 정보 {backend, model, dim} (매니페스트 기록 / 인덱스 호환성 확인용)
+
+    CachedEmbeddings / ResilientEmbeddings로 감싼 것도 가장 안쪽 객체 기준으로
+    """
+    base = embeddings
+    while getattr(base, "base", None) is not None:
+        base = base.base
+    backend = getattr(base, "backend", None) or ("openai" if "OpenAI" in type(base).__name__ else type(base).__name__)
+    return {
+        "backend": backend,
+        "model": str(getattr(base, "model", None) or type(base).__name__),
+        "dim": getattr(base, "dim", None) or getattr(base, "dimensions", None),
+    }
+
+
+def create_embeddings() -> Embeddings:
+    """환경 변수 설정으로 임베딩 백엔드 생성"""
+    backend = os.getenv("EMBEDDING_BACKEND", "openai").lower()
+    if backend not in EMBEDDING_BACKENDS:
+        logger.warning("⚠️ 알 수 없는 EMBEDDING_BACKEND=%s, openai 사용", backend)
+        backend = "openai"
+
+    if backend == "hashing":
+        return HashingEmbeddings(
+            dim=int(os.getenv("HASHING_EMBEDDING_DIM", "384")),
+            ngram_range=(
+                int(os.getenv("HASHING_NGRAM_MIN", "2")),
+                int(os.getenv("HASHING_NGRAM_MAX", "3")),
+            ),
+        )
+
+    from langchain_openai import OpenAIEmbeddings
+
+    # 재시도는 resilience 래퍼 / 임베딩 파이프라인이 담당 (클라이언트 재시도와 겹치지 않게)
+    kwargs = {
+        "openai_api_key": os.getenv("OPENAI_API_KEY"),
+        "max_retries": 0,
+        "request_timeout": float(os.getenv("EMBED_TIMEOUT_SECONDS", "20")),
+    }
+    if os.getenv("OPENAI_EMBEDDING_MODEL"):
+        kwargs["model"] = os.getenv("OPENAI_EMBEDDING_MODEL")
+    return OpenAIEmbeddings(**kwargs)
+
+
+# 테스트 코드 (네트워크 없이 hashing 백엔드 확인)
+if __name__ == "__main__":
+    embeddings = HashingEmbeddings()
+    texts = ["김광현 vs 최정 2024 시즌", "김광현과 최정의 2024년 매치업", "양현종 좌타자 상대 체인지업"]
+    vectors = np.asarray(embeddings.embed_documents(texts))
+    query = np.asarray(embeddings.embed_query("김광현 최정 매치업"))
+    print(embedding_identity(embeddings))
+    for text, score in zip(texts, vectors @ query):
+        print(f"{score:.3f}  {text}")
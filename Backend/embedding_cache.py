@@ -0,0 +1,183 @@
+# embedding_cache.py
+# ============================================
+# ⚾ 질의 임베딩 캐시
+#  - OpenAIEmbeddings 등 임베딩 객체를 감싸서 embed_query 결과 재사용
+#  - 1차: 메모리 LRU / 2차(옵션): SQLite 디스크 저장소
+#  - embed_queries: 여러 질의 중 캐시에 없는 것만 모아서 배치 호출 한 번
+#  - key = 모델 이름 + 정규화한 질의 텍스트
+# ============================================
+
+import os
+import re
+import sqlite3
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+import metrics
+import tracing
+
+
+def normalize_text(text: str) -> str:
+    """유니코드 NFC + 앞뒤 공백 제거 + 연속 공백 하나로"""
+    text = unicodedata.normalize("NFC", text or "")
+    return re.sub(r"\s+", " ", text).strip()
+
+
+class EmbeddingDiskStore:
+    """임베딩 벡터를 SQLite에 float32 바이트로 저장"""
+
+    def __init__(self, path: str):
+        dirname = os.path.dirname(path)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS query_embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[List[float]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT vector FROM query_embeddings WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return np.frombuffer(row[0], dtype="float32").tolist()
+
+    def put(self, key: str, vector: List[float]):
+        blob = np.asarray(vector, dtype="float32").tobytes()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO query_embeddings (key, vector) VALUES (?, ?)", (key, blob)
+            )
+            self._conn.commit()
+
+    def put_many(self, vectors: Dict[str, List[float]]):
+        rows = [(key, np.asarray(v, dtype="float32").tobytes()) for key, v in vectors.items()]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO query_embeddings (key, vector) VALUES (?, ?)", rows
+            )
+            self._conn.commit()
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    임베딩 객체 래퍼
+
+    - embed_query: LRU → 디스크 → 실제 임베딩 호출 순서로 조회
+    - embed_queries: 같은 순서로 조회하고, 못 찾은 질의만 embed_documents 한 번으로
+    - embed_documents: 그대로 위임 (문서 임베딩은 인덱스 빌드 쪽에서 관리)
+    """
+
+    def __init__(self, base: Embeddings, max_entries: int = 10000, disk_path: Optional[str] = None):
+        self.base = base
+        self.model_name = str(getattr(base, "model", None) or type(base).__name__)
+        self.max_entries = max_entries
+        self.disk = EmbeddingDiskStore(disk_path) if disk_path else None
+
+        self._lru: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, text: str) -> str:
+        raw = f"{self.model_name}\x1f{normalize_text(text)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _remember(self, key: str, vector: List[float]):
+        with self._lock:
+            self._lru[key] = vector
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.max_entries:
+                self._lru.popitem(last=False)
+
+    def embed_query(self, text: str) -> List[float]:
+        key = self._key(text)
+
+        with self._lock:
+            vector = self._lru.get(key)
+            if vector is not None:
+                self._lru.move_to_end(key)
+                self.hits += 1
+                metrics.count_cache("query_embedding", True)
+                return vector
+
+        if self.disk:
+            vector = self.disk.get(key)
+            if vector is not None:
+                self._remember(key, vector)
+                self.hits += 1
+                metrics.count_cache("query_embedding", True)
+                return vector
+
+        self.misses += 1
+        metrics.count_cache("query_embedding", False)
+        with metrics.timer("kbo_stage_duration_seconds", stage="embedding"), tracing.span("embeddings.embed", texts=1):
+            vector = self.base.embed_query(normalize_text(text))
+        self._remember(key, vector)
+        if self.disk:
+            self.disk.put(key, vector)
+        return vector
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """여러 질의 임베딩 (결과는 embed_query를 하나씩 부른 것과 같은 캐시를 공유)"""
+        keys = [self._key(text) for text in texts]
+        found: Dict[str, List[float]] = {}
+
+        with self._lock:
+            for key in keys:
+                vector = self._lru.get(key)
+                if vector is not None:
+                    self._lru.move_to_end(key)
+                    found[key] = vector
+
+        # 디스크 조회 후에도 없는 질의만 (같은 질의가 여러 번 있으면 한 번만)
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key in found or key in missing:
+                continue
+            vector = self.disk.get(key) if self.disk else None
+            if vector is not None:
+                self._remember(key, vector)
+                found[key] = vector
+            else:
+                missing[key] = normalize_text(text)
+
+        self.misses += len(missing)
+        self.hits += len(texts) - len(missing)
+        metrics.inc("kbo_cache_requests_total", len(texts) - len(missing), cache="query_embedding", result="hit")
+        metrics.inc("kbo_cache_requests_total", len(missing), cache="query_embedding", result="miss")
+
+        if missing:
+            with metrics.timer("kbo_stage_duration_seconds", stage="embedding"), \
+                    tracing.span("embeddings.embed", texts=len(missing)):
+                vectors = dict(zip(missing, self.base.embed_documents(list(missing.values()))))
+            for key, vector in vectors.items():
+                self._remember(key, vector)
+            if self.disk:
+                self.disk.put_many(vectors)
+            found.update(vectors)
+
+        return [found[key] for key in keys]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.base.embed_documents(texts)
+
+
+def wrap_with_cache(base: Embeddings) -> CachedEmbeddings:
+    """환경 변수 설정으로 임베딩 캐시 래퍼 생성"""
+    max_entries = int(os.getenv("EMBEDDING_CACHE_SIZE", "10000"))
+    disk_path = os.getenv("EMBEDDING_CACHE_PATH") or None
+    return CachedEmbeddings(base, max_entries=max_entries, disk_path=disk_path)
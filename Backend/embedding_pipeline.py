@@ -0,0 +1,238 @@
+# embedding_pipeline.py
+# ============================================
+# ⚾ 병렬 배치 임베딩 파이프라인 (인덱스 최초 구축용)
+#  - 청크를 배치로 묶어 제한된 워커 풀에서 동시에 임베딩
+#  - rate limit(429) 감지 시 지터 포함 지수 백오프 + 전체 워커 잠시 대기
+#  - 일시 오류(429/5xx/연결/타임아웃)만 재시도, 분류는 is_transient_error 한 곳 (resilience도 같이 씀)
+#  - 끝난 배치는 바로 체크포인트(청크 임베딩 저장소)에 기록 → 중단 후 재시작 시 이어서 진행
+# ============================================
+
+import os
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional, Protocol, Iterable, Tuple
+
+from logging_setup import get_logger
+
+logger = get_logger("embedding_pipeline")
+
+
+class Checkpoint(Protocol):
+    """완료된 배치를 저장하는 곳 (ChunkEmbeddingStore가 이 형태)"""
+
+    def get_many(self, hashes: Iterable[str]) -> Dict[str, List[float]]: ...
+
+    def put_many(self, items: Iterable[Tuple[str, List[float]]]): ...
+
+
+# openai / httpx 예외 중 다시 시도할 만한 것 (클래스 이름으로 판단, openai 패키지 없이도 동작)
+TRANSIENT_ERROR_NAMES = {
+    "RateLimitError",
+    "APIConnectionError",
+    "APITimeoutError",
+    "InternalServerError",
+    "ServiceUnavailableError",
+    "TimeoutError",
+    "ConnectionError",
+    "ConnectTimeout",
+    "ReadTimeout",
+}
+
+
+def is_rate_limit_error(e: Exception) -> bool:
+    """openai.RateLimitError / HTTP 429 여부"""
+    if type(e).__name__ == "RateLimitError":
+        return True
+    status = getattr(e, "status_code", None) or getattr(getattr(e, "response", None), "status_code", None)
+    return status == 429
+
+
+def is_transient_error(e: Optional[BaseException]) -> bool:
+    """재시도 / 차단기 실패로 셀 오류인지 (429, 5xx, 연결/타임아웃)"""
+    if e is None:
+        return False
+    if is_rate_limit_error(e) or type(e).__name__ in TRANSIENT_ERROR_NAMES:
+        return True
+    status = getattr(e, "status_code", None) or getattr(getattr(e, "response", None), "status_code", None)
+    return isinstance(status, int) and status >= 500
+
+
+def retry_after_seconds(e: Exception) -> Optional[float]:
+    """응답 헤더의 Retry-After 값 (없으면 None)"""
+    headers = getattr(getattr(e, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class EmbeddingPipeline:
+    def __init__(
+        self,
+        embeddings,
+        batch_size: int = 128,
+        max_workers: int = 4,
+        max_retries: int = 6,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        checkpoint: Optional[Checkpoint] = None,
+    ):
+        """
+        Args:
+            embeddings: embed_documents(texts)를 가진 임베딩 객체 (OpenAI 또는 로컬 대체 구현)
+            batch_size: 한 번에 임베딩할 청크 수
+            max_workers: 동시에 실행할 배치 수
+            max_retries: 배치당 최대 재시도 횟수
+            checkpoint: 완료된 배치를 기록/조회할 저장소 (None이면 메모리에만)
+        """
+        self.embeddings = embeddings
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.checkpoint = checkpoint
+
+        # rate limit에 걸리면 모든 워커가 이 시각까지 새 요청을 보내지 않음
+        self._cooldown_until = 0.0
+        self._lock = threading.Lock()
+
+    # ----------------------------------------
+    # 백오프
+    # ----------------------------------------
+    def _backoff_delay(self, attempt: int, e: Exception) -> float:
+        hinted = retry_after_seconds(e)
+        if hinted is not None:
+            return min(hinted, self.max_delay)
+        # full jitter: 0 ~ base * 2^attempt
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def _wait_for_cooldown(self):
+        while True:
+            with self._lock:
+                remaining = self._cooldown_until - time.monotonic()
+            if remaining <= 0:
+                return
+            time.sleep(remaining)
+
+    def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        for attempt in range(self.max_retries + 1):
+            self._wait_for_cooldown()
+            try:
+                return self.embeddings.embed_documents(texts)
+            except Exception as e:
+                # 429 / 5xx / 연결·타임아웃만 재시도, 400·인증 오류나 코드 버그는 바로 실패
+                if attempt >= self.max_retries or not is_transient_error(e):
+                    raise
+                delay = self._backoff_delay(attempt, e)
+                if is_rate_limit_error(e):
+                    with self._lock:
+                        self._cooldown_until = max(self._cooldown_until, time.monotonic() + delay)
+                    logger.warning("⏳ rate limit, %.1f초 대기 후 재시도 (%s/%s)", delay, attempt + 1, self.max_retries)
+                else:
+                    logger.warning("⚠️ 임베딩 배치 실패, %.1f초 후 재시도 (%s/%s): %s", delay, attempt + 1, self.max_retries, e)
+                    time.sleep(delay)
+        raise RuntimeError("unreachable")
+
+    # ----------------------------------------
+    # 실행
+    # ----------------------------------------
+    def run(self, texts_by_hash: Dict[str, str]) -> Dict[str, List[float]]:
+        """
+        {content_hash: 텍스트} → {content_hash: 벡터}
+
+        체크포인트에 이미 있는 hash는 건너뛰고, 나머지만 배치로 나눠 병렬 임베딩.
+        """
+        done: Dict[str, List[float]] = {}
+        if self.checkpoint:
+            done.update(self.checkpoint.get_many(texts_by_hash.keys()))
+
+        pending = [h for h in texts_by_hash if h not in done]
+        batches = [pending[i:i + self.batch_size] for i in range(0, len(pending), self.batch_size)]
+        if not batches:
+            return done
+
+        logger.info(
+            "🧮 임베딩 파이프라인: 체크포인트 %s개 재사용, %s개를 %s개 배치로 처리 (워커 %s)",
+            len(done), len(pending), len(batches), self.max_workers
+        )
+
+        finished = 0
+        errors: List[Exception] = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {
+                pool.submit(self._embed_batch, [texts_by_hash[h] for h in batch]): batch
+                for batch in batches
+            }
+            # 한 배치가 재시도를 다 써도 나머지 배치는 끝까지 받아서 체크포인트에 기록 → 오류는 마지막에
+            for future in as_completed(futures):
+                batch = futures[future]
+                try:
+                    pairs = list(zip(batch, future.result()))
+                except Exception as e:
+                    errors.append(e)
+                    logger.warning("⚠️ 임베딩 배치 최종 실패 (%s개): %s", len(batch), e)
+                    continue
+                if self.checkpoint:
+                    self.checkpoint.put_many(pairs)
+                done.update(pairs)
+
+                finished += 1
+                logger.info("📦 배치 %s/%s 완료", finished, len(batches))
+
+        if errors:
+            logger.warning("⚠️ 임베딩 배치 %s개 실패 (완료된 %s개 배치는 체크포인트에 저장)", len(errors), finished)
+            raise errors[0]
+        return done
+
+
+def create_embedding_pipeline(embeddings, checkpoint: Optional[Checkpoint] = None) -> EmbeddingPipeline:
+    """환경 변수 설정으로 파이프라인 생성"""
+    return EmbeddingPipeline(
+        embeddings,
+        batch_size=int(os.getenv("EMBED_BATCH_SIZE", "128")),
+        max_workers=int(os.getenv("EMBED_MAX_WORKERS", "4")),
+        max_retries=int(os.getenv("EMBED_MAX_RETRIES", "6")),
+        checkpoint=checkpoint,
+    )
+
+
+# 테스트 코드 (네트워크 없이 로컬 대체 임베딩으로 동작 확인)
+if __name__ == "__main__":
+    import tempfile
+    from langchain_community.embeddings import DeterministicFakeEmbedding
+    from chunk_store import ChunkEmbeddingStore, text_hash
+
+    print("🧪 임베딩 파이프라인 오프라인 테스트")
+
+    class FlakyLocalEmbeddings(DeterministicFakeEmbedding):
+        """가끔 429를 내고, fail_after 배치 이후에는 죽는 로컬 임베딩"""
+        fail_after: int = -1
+        calls: int = 0
+
+        def embed_documents(self, texts):
+            self.calls += 1
+            if self.fail_after >= 0 and self.calls > self.fail_after:
+                raise KeyboardInterrupt("중간에 프로세스 종료 흉내")
+            if random.random() < 0.2:
+                err = Exception("rate limited")
+                err.status_code = 429
+                raise err
+            return super().embed_documents(texts)
+
+    texts = {text_hash(f"문서 {i}"): f"문서 {i}" for i in range(1000)}
+    store = ChunkEmbeddingStore(os.path.join(tempfile.mkdtemp(), "chunks.sqlite"), "local-test")
+
+    # 1차: 몇 배치만 처리하고 중단
+    crashing = FlakyLocalEmbeddings(size=16, fail_after=3)
+    try:
+        EmbeddingPipeline(crashing, batch_size=100, max_workers=1, base_delay=0.01, checkpoint=store).run(texts)
+    except KeyboardInterrupt:
+        print(f"💥 중단됨, 체크포인트에 저장된 청크: {store.count()}개")
+
+    # 2차: 체크포인트부터 이어서
+    local = FlakyLocalEmbeddings(size=16)
+    vectors = EmbeddingPipeline(local, batch_size=100, max_workers=4, base_delay=0.01, checkpoint=store).run(texts)
+    print(f"✅ 완료: {len(vectors)}개 (2차 실행 임베딩 호출 {local.calls}회)")
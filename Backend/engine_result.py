@@ -0,0 +1,61 @@
+# engine_result.py
+# ============================================
+# ⚾ 규칙 기반 엔진 공통 결과 구조
+#  - answer_* / dispatch_to_engine 이 문자열 대신 반환
+#  - 하이브리드 엔진은 status/payload 로 라우팅을 결정
+# ============================================
+
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Dict, Any
+
+
+class AnswerStatus(str, Enum):
+    OK = "ok"                          # 수치가 담긴 정상 답변
+    NO_DATA = "no_data"                # 선수/시즌/매치업 데이터 없음
+    UNRECOGNIZED = "unrecognized"      # 질문에서 이름/구종/카운트 인식 실패
+    UNSUPPORTED = "unsupported"        # 규칙 엔진이 지원하지 않는 질문
+    MISSING_COLUMN = "missing_column"  # 필요한 CSV 컬럼 없음
+
+
+@dataclass
+class EngineResult:
+    status: AnswerStatus
+    text: str
+    payload: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return self.status == AnswerStatus.OK
+
+    def has_numbers(self) -> bool:
+        """payload 에 랭킹(records) 또는 실제 수치(stats 중 None 아닌 값)가 들어있는지."""
+        if self.payload.get("records"):
+            return True
+        stats = self.payload.get("stats") or {}
+        # stats 는 키가 항상 채워지므로 값이 전부 None(N/A)이면 수치 없음으로 본다
+        return any(value is not None for value in stats.values())
+
+    def __str__(self) -> str:
+        # print(answer_xxx(...)) 같은 기존 사용처는 그대로 텍스트 출력
+        return self.text
+
+
+def ok(text: str, **payload) -> EngineResult:
+    return EngineResult(AnswerStatus.OK, text, payload)
+
+
+def no_data(text: str) -> EngineResult:
+    return EngineResult(AnswerStatus.NO_DATA, text)
+
+
+def unrecognized(text: str) -> EngineResult:
+    return EngineResult(AnswerStatus.UNRECOGNIZED, text)
+
+
+def unsupported(text: str) -> EngineResult:
+    return EngineResult(AnswerStatus.UNSUPPORTED, text)
+
+
+def missing_column(text: str) -> EngineResult:
+    return EngineResult(AnswerStatus.MISSING_COLUMN, text)
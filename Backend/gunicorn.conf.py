@@ -0,0 +1,66 @@
+# gunicorn.conf.py
+# ============================================
+# ⚾ 운영 서버 설정 (gunicorn + UvicornWorker, reload 없음)
+#  실행: cd Backend && gunicorn -c gunicorn.conf.py
+#  - preload_app: 마스터에서 main을 한 번 import → 규칙 엔진 DataFrame 등 읽기 전용 데이터를
+#                 fork 전에 올려두고 워커들이 copy-on-write로 공유
+#  - fork 직전 gc.freeze(): 공유 객체를 GC 대상에서 빼서 워커의 GC가 페이지를 건드리지 않게
+#  - RAG 시스템(스레드 / SQLite 연결)은 fork 후 각 워커 startup에서 생성
+#    (벡터 인덱스는 mmap이라 페이지 캐시 공유, 재구축은 파일 락으로 워커 하나만)
+#  - 지표(/metrics)는 워커마다 METRICS_DIR에 스냅샷을 써서 합산
+# ============================================
+
+import gc
+import os
+import tempfile
+import multiprocessing
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# 앱 (python main.py의 개발 서버와 같은 앱)
+wsgi_app = "main:app"
+worker_class = "uvicorn_worker.UvicornWorker"
+
+# 워커 / 소켓
+bind = os.getenv("GUNICORN_BIND", f"0.0.0.0:{os.getenv('PORT', '8000')}")
+
+# 워커별 지표 스냅샷 디렉터리 (/metrics가 전체 워커 합계를 응답하도록, 서버마다 따로)
+os.environ.setdefault(
+    "METRICS_DIR", os.path.join(tempfile.gettempdir(), f"kbo-metrics-{bind.rsplit(':', 1)[-1]}")
+)
+workers = int(os.getenv("GUNICORN_WORKERS", str(multiprocessing.cpu_count())))
+backlog = int(os.getenv("GUNICORN_BACKLOG", "2048"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))  # 초, UvicornWorker의 timeout_keep_alive
+
+# LLM 응답을 기다리는 요청이 있으므로 워커 응답 없음 판정은 넉넉하게
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+
+# 요청 N개마다 워커 재시작 (0 = 끔, 메모리 누수 대비), 워커끼리 동시에 재시작하지 않게 지터
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "0"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "0"))
+
+preload_app = True
+reload = False
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-") or None
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+
+
+def on_starting(server):
+    """마스터 시작 (preload 전): 이전 실행의 지표 스냅샷 정리"""
+    from metrics import clear_snapshots
+    clear_snapshots(os.environ["METRICS_DIR"])
+
+
+def when_ready(server):
+    """preload가 끝난 뒤, 워커 fork 직전 (마스터에서 한 번)"""
+    gc.collect()
+    gc.freeze()
+    server.log.info(
+        "⚾ 워커 %s개 시작 (preload 완료, 공유 객체 %s개 고정, 스레드 풀 %s)",
+        workers, gc.get_freeze_count(), os.getenv("THREAD_POOL_SIZE", "40"),
+    )
+
@@ -3,9 +3,16 @@
 # ⚾ 하이브리드 엔진 (규칙 기반 + RAG)
 # ============================================
 
-from typing import Dict, Any
-from router import route_question, dispatch_to_engine
+import time
+from typing import Dict, Any, Optional
+from router import route_question, dispatch_to_engine, build_rag_filters
 from rag_system import get_rag_system
+from engine_result import EngineResult
+import metrics
+import tracing
+from logging_setup import get_logger
+
+logger = get_logger("hybrid_engine")
 
 class HybridEngine:
     """
@@ -20,10 +27,14 @@ class HybridEngine:
     def __init__(self):
         self.rag_system = get_rag_system()
     
-    def process_query(self, question: str) -> Dict[str, Any]:
+    @tracing.traced("HybridEngine.process_query")
+    def process_query(self, question: str, rerank: Optional[bool] = None) -> Dict[str, Any]:
         """
         질문 처리
         
+        Args:
+            rerank: RAG 검색 결과 로컬 재정렬 여부 (None이면 서버 기본값)
+        
         Returns:
             {
                 "answer": str,
@@ -34,17 +45,33 @@ class HybridEngine:
                 "debug_info": Dict
             }
         """
-        print(f"\n🎯 하이브리드 엔진 시작: {question}")
+        logger.debug("🎯 하이브리드 엔진 시작: %s", question)
+        started = time.perf_counter()
         
         # 1단계: 규칙 기반 엔진 시도
-        rule_result = self._try_rule_engine(question)
+        with metrics.timer("kbo_stage_duration_seconds", stage="rule"):
+            rule_result = self._try_rule_engine(question)
         
+        result = self._answer(question, rule_result, rerank)
+        
+        # 의도(route_question) / 답변 출처별 지표
+        intent = getattr(rule_result.get("route"), "intent", None) or "unknown"
+        tracing.set_attribute("intent", intent)
+        tracing.set_attribute("source", result["source"])
+        metrics.inc("kbo_chat_answers_total", intent=intent, source=result["source"])
+        metrics.observe(
+            "kbo_chat_duration_seconds", time.perf_counter() - started, intent=intent, source=result["source"]
+        )
+        return result
+    
+    def _answer(self, question: str, rule_result: Dict[str, Any], rerank: Optional[bool]) -> Dict[str, Any]:
+        """규칙 기반 결과에 따라 그대로 답변 / RAG 보강 / RAG 전환"""
         # 2단계: 규칙 기반 성공 여부 판단
         if rule_result["success"]:
-            print("✅ 규칙 기반 엔진으로 답변 생성 성공")
+            logger.debug("✅ 규칙 기반 엔진으로 답변 생성 성공")
             
             # 규칙 기반만으로 충분한 경우
-            if self._is_sufficient_answer(rule_result["answer"]):
+            if self._is_sufficient_answer(rule_result["result"]):
                 return {
                     "answer": rule_result["answer"],
                     "source": "rule",
@@ -55,8 +82,8 @@ class HybridEngine:
                 }
             
             # 규칙 기반 답변이 있지만 RAG로 보강 가능
-            print("🔄 RAG로 추가 컨텍스트 검색...")
-            rag_result = self._try_rag_engine(question)
+            logger.debug("🔄 RAG로 추가 컨텍스트 검색...")
+            rag_result = self._try_rag_engine(question, rule_result["route"], rerank=rerank)
             
             if rag_result["success"]:
                 # 하이브리드: 규칙 기반 + RAG 보강
@@ -87,8 +114,8 @@ class HybridEngine:
                 }
         
         # 3단계: 규칙 기반 실패 → RAG로 전환
-        print("⚠️ 규칙 기반 엔진 실패, RAG로 전환")
-        rag_result = self._try_rag_engine(question)
+        logger.debug("⚠️ 규칙 기반 엔진 실패, RAG로 전환")
+        rag_result = self._try_rag_engine(question, rule_result["route"], rerank=rerank)
         
         if rag_result["success"]:
             return {
@@ -122,42 +149,38 @@ class HybridEngine:
     
     def _try_rule_engine(self, question: str) -> Dict[str, Any]:
         """규칙 기반 엔진 시도"""
+        route_result = None
         try:
             route_result = route_question(question)
-            answer = dispatch_to_engine(question, route_result)
-            
-            # 실패 판단 키워드
-            failure_keywords = [
-                "지원하지 않",
-                "인식하지 못했",
-                "데이터가 없습니다",
-                "찾을 수 없습니다",
-                "컬럼이 없습니다",
-                "랜덤 데이터만으로는"
-            ]
-            
-            is_failure = any(kw in answer for kw in failure_keywords)
+            result = dispatch_to_engine(question, route_result)
             
+            # 성공 여부는 엔진이 돌려준 status로만 판단 (답변 문구 검사 X)
             return {
-                "success": not is_failure,
-                "answer": answer,
+                "success": result.ok,
+                "answer": result.text,
+                "result": result,
+                "route": route_result,
                 "debug_info": {
                     "intent": route_result.intent,
-                    "params": route_result.params
+                    "params": route_result.params,
+                    "status": result.status.value
                 }
             }
         except Exception as e:
-            print(f"❌ 규칙 엔진 오류: {e}")
+            logger.exception("❌ 규칙 엔진 오류: %s", e)
             return {
                 "success": False,
                 "answer": str(e),
+                "result": None,
+                "route": route_result,
                 "debug_info": {"error": str(e)}
             }
     
-    def _try_rag_engine(self, question: str) -> Dict[str, Any]:
-        """RAG 엔진 시도"""
+    def _try_rag_engine(self, question: str, route_result=None, rerank: Optional[bool] = None) -> Dict[str, Any]:
+        """RAG 엔진 시도 (route 결과로 만든 메타데이터 필터로 검색 범위 축소)"""
         try:
-            result = self.rag_system.query(question)
+            filters = build_rag_filters(question, route_result)
+            result = self.rag_system.query(question, filters=filters, rerank=rerank)
             
             # RAG 답변이 유효한지 확인
             answer = result.get("answer", "")
@@ -165,7 +188,9 @@ class HybridEngine:
             failure_keywords = [
                 "찾을 수 없습니다",
                 "정보가 없습니다",
-                "오류가 발생했습니다"
+                "오류가 발생했습니다",
+                "초기화되지 않았습니다",
+                "일시적으로 사용할 수 없습니다"
             ]
             
             is_failure = any(kw in answer for kw in failure_keywords)
@@ -175,34 +200,27 @@ class HybridEngine:
                 "answer": answer,
                 "sources": result.get("sources", []),
                 "debug_info": {
-                    "source_count": len(result.get("sources", []))
+                    "source_count": len(result.get("sources", [])),
+                    **result.get("debug_info", {})
                 }
             }
         except Exception as e:
-            print(f"❌ RAG 엔진 오류: {e}")
+            logger.exception("❌ RAG 엔진 오류: %s", e)
             return {
                 "success": False,
                 "answer": str(e),
                 "debug_info": {"error": str(e)}
             }
     
-    def _is_sufficient_answer(self, answer: str) -> bool:
+    def _is_sufficient_answer(self, result: EngineResult) -> bool:
         """
         규칙 기반 답변이 충분한지 판단
         
         기준:
-        - 길이가 충분함
-        - 구체적인 수치 포함
-        - TOP N 리스트 포함
+        - status가 OK
+        - payload에 TOP N 랭킹(records) 또는 수치(stats)가 들어있음
         """
-        if len(answer) < 50:
-            return False
-        
-        # 수치나 리스트가 포함되어 있으면 충분
-        has_numbers = any(char.isdigit() for char in answer)
-        has_ranking = "1)" in answer or "TOP" in answer
-        
-        return has_numbers or has_ranking
+        return result.ok and result.has_numbers()
     
     def _combine_answers(self, rule_answer: str, rag_answer: str) -> str:
         """규칙 기반 답변과 RAG 답변 결합"""
@@ -0,0 +1,131 @@
+# lexical_index.py
+# ============================================
+# ⚾ BM25 역색인 (DOC_TEXT 한글 2-gram + 단어 토큰)
+#  - 선수 이름처럼 임베딩이 약한 고유명사를 정확히 잡기 위한 lexical 검색
+#  - 벡터 검색 결과와 reciprocal rank fusion(RRF)으로 합침
+#  - 전부 로컬 CPU 연산 (추가 임베딩 호출 없음)
+# ============================================
+
+import re
+import math
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple, Iterable
+
+import numpy as np
+
+from vector_store_io import iter_documents
+
+
+_TOKEN_RE = re.compile(r"[가-힣]+|[A-Za-z]+|\d+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    한글은 2글자 n-gram, 영문/숫자는 단어 그대로
+
+    '김광현이' → ['김광', '광현', '현이'] 처럼 조사가 붙어도 이름 n-gram은 일치
+    """
+    tokens: List[str] = []
+    for word in _TOKEN_RE.findall((text or "").lower()):
+        if "가" <= word[0] <= "힣" and len(word) >= 2:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+        else:
+            tokens.append(word)
+    return tokens
+
+
+class BM25Index:
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.size = 0
+        self.doc_len = np.zeros(0, dtype="float32")
+        self.avgdl = 0.0
+        # term → (위치 배열, tf 배열)
+        self.postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self.idf: Dict[str, float] = {}
+
+    @classmethod
+    def from_texts(cls, texts: Iterable[Tuple[int, str]], **kwargs) -> "BM25Index":
+        """(위치, 텍스트) 목록으로 색인 구성"""
+        index = cls(**kwargs)
+        lists: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        lengths: Dict[int, int] = {}
+
+        for position, text in texts:
+            tf = Counter(tokenize(text))
+            lengths[position] = sum(tf.values())
+            for term, count in tf.items():
+                lists[term].append((position, count))
+
+        index.size = (max(lengths) + 1) if lengths else 0
+        index.doc_len = np.zeros(index.size, dtype="float32")
+        for position, length in lengths.items():
+            index.doc_len[position] = length
+        index.avgdl = float(index.doc_len.mean()) if index.size else 0.0
+
+        n = len(lengths)
+        for term, items in lists.items():
+            positions = np.asarray([p for p, _ in items], dtype="int64")
+            tfs = np.asarray([c for _, c in items], dtype="float32")
+            index.postings[term] = (positions, tfs)
+            df = len(items)
+            index.idf[term] = math.log(1 + (n - df + 0.5) / (df + 0.5))
+        return index
+
+    @classmethod
+    def from_vectorstore(cls, vectorstore, **kwargs) -> "BM25Index":
+        """langchain FAISS 벡터 스토어의 docstore 텍스트로 색인 구성"""
+        texts = ((position, doc.page_content) for position, doc in iter_documents(vectorstore))
+        return cls.from_texts(texts, **kwargs)
+
+    def search(
+        self,
+        query: str,
+        k: int,
+        allowed_positions: Optional[np.ndarray] = None,
+    ) -> List[Tuple[int, float]]:
+        """
+        BM25 상위 k개 [(위치, 점수), ...]
+
+        allowed_positions가 있으면 그 위치들 안에서만 (메타데이터 필터와 동일 범위)
+        """
+        if self.size == 0:
+            return []
+
+        scores = np.zeros(self.size, dtype="float32")
+        norm = self.k1 * (1 - self.b + self.b * self.doc_len / (self.avgdl or 1.0))
+
+        for term in set(tokenize(query)):
+            posting = self.postings.get(term)
+            if posting is None:
+                continue
+            positions, tfs = posting
+            scores[positions] += self.idf[term] * tfs * (self.k1 + 1) / (tfs + norm[positions])
+
+        if allowed_positions is not None:
+            mask = np.zeros(self.size, dtype=bool)
+            mask[allowed_positions[allowed_positions < self.size]] = True
+            scores[~mask] = 0.0
+
+        hit = np.flatnonzero(scores > 0)
+        if hit.size == 0:
+            return []
+        if hit.size > k:
+            hit = hit[np.argpartition(-scores[hit], k - 1)[:k]]
+        hit = hit[np.argsort(-scores[hit])]
+        return [(int(p), float(scores[p])) for p in hit]
+
+
+def reciprocal_rank_fusion(rankings: List[List[int]], k: int = 60) -> List[Tuple[int, float]]:
+    """
+    여러 랭킹(위치 리스트)을 RRF로 합침: score = Σ 1 / (k + rank)
+
+    Returns:
+        [(위치, 점수), ...] 점수 높은 순
+    """
+    fused: Dict[int, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, position in enumerate(ranking, start=1):
+            fused[position] += 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
@@ -0,0 +1,162 @@
+# llm_backends.py
+# ============================================
+# ⚾ LLM 백엔드 선택 (LLM_BACKEND)
+#  - openai : ChatOpenAI (기본)
+#  - local  : 부하 테스트용 로컬 대체 구현 (토큰 비용 없음)
+#             · 첫 토큰 지연은 로그정규 분포 (중앙값 / 표준편차 설정), 이후 토큰마다 일정 지연
+#             · 토큰 단위 스트리밍
+#             · 고정 답변 또는 프롬프트의 질문/컨텍스트를 채운 템플릿 답변
+#  - 두 백엔드 모두 generate(prompt) / stream(prompt) 인터페이스
+# ============================================
+
+import os
+import re
+import math
+import time
+import random
+import threading
+from typing import Iterator, Optional
+
+from logging_setup import get_logger
+
+logger = get_logger("llm_backends")
+
+
+LLM_BACKENDS = ("openai", "local")
+
+DEFAULT_LOCAL_TEMPLATE = "[로컬 LLM] '{question}' 질문에 대한 테스트 답변입니다. 참고 데이터: {context}"
+
+
+class OpenAIChatBackend:
+    """ChatOpenAI 래퍼 (predict 대신 invoke(...).content)"""
+
+    backend = "openai"
+
+    def __init__(self, model: str = "gpt-4", temperature: float = 0.3):
+        from langchain_openai import ChatOpenAI
+
+        self.llm = ChatOpenAI(
+            model=model,
+            temperature=temperature,
+            openai_api_key=os.getenv("OPENAI_API_KEY"),
+            # 재시도는 resilience 래퍼가 담당, 응답이 없으면 LLM_TIMEOUT_SECONDS 후 포기
+            max_retries=0,
+            timeout=float(os.getenv("LLM_TIMEOUT_SECONDS", "60")),
+        )
+        self.model_name = self.llm.model_name
+        self.temperature = temperature
+
+    def generate(self, prompt: str) -> str:
+        return self.llm.invoke(prompt).content
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        for chunk in self.llm.stream(prompt):
+            if chunk.content:
+                yield chunk.content
+
+
+class LocalLLMBackend:
+    """
+    로컬 대체 LLM (네트워크 호출 없음)
+
+    우리 파이프라인의 처리량 한계를 공급자 지연과 분리해서 재기 위한 용도
+    """
+
+    backend = "local"
+
+    def __init__(
+        self,
+        model: str = "gpt-4",
+        temperature: float = 0.3,
+        ttft_ms: float = 300.0,
+        latency_sigma: float = 0.5,
+        token_ms: float = 15.0,
+        answer: str = "",
+        template: str = DEFAULT_LOCAL_TEMPLATE,
+        seed: Optional[int] = None,
+    ):
+        """
+        Args:
+            model: 흉내 낼 모델 이름 (캐시 키가 실제 모델과 섞이지 않게 "local:" 접두사)
+            ttft_ms: 첫 토큰까지 지연 중앙값 (로그정규 분포)
+            latency_sigma: 로그정규 분포의 σ (0이면 항상 ttft_ms)
+            token_ms: 이후 토큰당 지연
+            answer: 고정 답변 (비우면 template 사용)
+            template: {question} / {context}를 프롬프트에서 채우는 답변 템플릿
+        """
+        self.model_name = f"local:{model}"
+        self.temperature = temperature
+        self.ttft_ms = ttft_ms
+        self.latency_sigma = latency_sigma
+        self.token_ms = token_ms
+        self.answer = answer
+        self.template = template
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _first_token_delay(self) -> float:
+        if self.ttft_ms <= 0:
+            return 0.0
+        with self._lock:
+            sample = self._rng.lognormvariate(math.log(self.ttft_ms), self.latency_sigma)
+        return sample / 1000
+
+    def render(self, prompt: str) -> str:
+        """고정 답변 또는 프롬프트의 질문/컨텍스트로 채운 템플릿"""
+        if self.answer:
+            return self.answer
+        question = re.search(r"질문:\s*(.+)", prompt)
+        context = re.search(r"컨텍스트:\s*\n(.*?)\n\s*\n", prompt, re.S)
+        return self.template.format(
+            question=question.group(1).strip() if question else prompt.strip().splitlines()[-1][:100],
+            context=(context.group(1).strip()[:200] if context else ""),
+        )
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        """공백 단위 토큰 스트리밍 (첫 토큰 전 ttft, 이후 토큰마다 token_ms)"""
+        time.sleep(self._first_token_delay())
+        for i, token in enumerate(re.findall(r"\S+\s*", self.render(prompt))):
+            if i and self.token_ms > 0:
+                time.sleep(self.token_ms / 1000)
+            yield token
+
+    def generate(self, prompt: str) -> str:
+        return "".join(self.stream(prompt))
+
+
+def create_llm(model: str = "gpt-4", temperature: float = 0.3):
+    """환경 변수 설정으로 LLM 백엔드 생성"""
+    backend = os.getenv("LLM_BACKEND", "openai").lower()
+    if backend not in LLM_BACKENDS:
+        logger.warning("⚠️ 알 수 없는 LLM_BACKEND=%s, openai 사용", backend)
+        backend = "openai"
+
+    if backend == "local":
+        seed = os.getenv("LOCAL_LLM_SEED")
+        return LocalLLMBackend(
+            model=model,
+            temperature=temperature,
+            ttft_ms=float(os.getenv("LOCAL_LLM_TTFT_MS", "300")),
+            latency_sigma=float(os.getenv("LOCAL_LLM_LATENCY_SIGMA", "0.5")),
+            token_ms=float(os.getenv("LOCAL_LLM_TOKEN_MS", "15")),
+            answer=os.getenv("LOCAL_LLM_ANSWER", ""),
+            template=os.getenv("LOCAL_LLM_TEMPLATE") or DEFAULT_LOCAL_TEMPLATE,
+            seed=int(seed) if seed else None,
+        )
+    return OpenAIChatBackend(model=model, temperature=temperature)
+
+
+# 테스트 코드 (네트워크 없이 로컬 백엔드 지연/스트리밍 확인)
+if __name__ == "__main__":
+    llm = LocalLLMBackend(ttft_ms=200, latency_sigma=0.5, token_ms=10, seed=0)
+    prompt = "컨텍스트:\n김광현 vs 최정 2024 타율 0.333\n\n질문: 김광현과 최정의 매치업은?\n\n답변:"
+
+    started = time.perf_counter()
+    for i, token in enumerate(llm.stream(prompt)):
+        if i == 0:
+            print(f"첫 토큰: {(time.perf_counter() - started) * 1000:.0f}ms")
+        print(token, end="", flush=True)
+    print(f"\n전체: {(time.perf_counter() - started) * 1000:.0f}ms")
+
+    samples = sorted(llm._first_token_delay() * 1000 for _ in range(1000))
+    print(f"ttft p50={samples[500]:.0f}ms p99={samples[990]:.0f}ms")
@@ -0,0 +1,100 @@
+# llm_cache.py
+# ============================================
+# ⚾ LLM 응답 디스크 캐시 (SQLite)
+#  - key = sha256(모델 + temperature + 전체 프롬프트)
+#  - WAL 모드라서 여러 워커 프로세스가 같은 파일을 공유 가능
+#  - 재시작/재배포 후에도 캐시 유지
+# ============================================
+
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Optional
+
+from logging_setup import get_logger
+
+logger = get_logger("llm_cache")
+
+
+class CompletionCache:
+    def __init__(self, path: str, ttl_seconds: float = 0):
+        """
+        Args:
+            path: SQLite 파일 경로
+            ttl_seconds: 0이면 만료 없음
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+
+        dirname = os.path.dirname(path)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS completions (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                temperature REAL NOT NULL,
+                answer TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(model: str, temperature: float, prompt: str) -> str:
+        raw = f"{model}\x1f{float(temperature):.4f}\x1f{prompt}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, model: str, temperature: float, prompt: str) -> Optional[str]:
+        key = self.make_key(model, temperature, prompt)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT answer, created_at FROM completions WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+
+        answer, created_at = row
+        if self.ttl_seconds > 0 and time.time() - created_at > self.ttl_seconds:
+            return None
+        return answer
+
+    def put(self, model: str, temperature: float, prompt: str, answer: str):
+        key = self.make_key(model, temperature, prompt)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO completions (key, model, temperature, answer, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, model, float(temperature), answer, time.time()),
+            )
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM completions")
+            self._conn.commit()
+
+
+def create_completion_cache() -> Optional[CompletionCache]:
+    """환경 변수 설정으로 LLM 캐시 생성 (LLM_CACHE_ENABLED=0이면 None)"""
+    if os.getenv("LLM_CACHE_ENABLED", "1") == "0":
+        return None
+
+    data_dir = os.getenv("DATA_DIR", "./data")
+    path = os.getenv("LLM_CACHE_PATH", os.path.join(data_dir, "llm_cache.sqlite"))
+    ttl = float(os.getenv("LLM_CACHE_TTL", "0"))
+
+    try:
+        return CompletionCache(path, ttl_seconds=ttl)
+    except sqlite3.Error as e:
+        logger.warning("⚠️ LLM 캐시 초기화 실패 (캐시 없이 진행): %s", e)
+        return None
@@ -0,0 +1,147 @@
+# logging_setup.py
+# ============================================
+# ⚾ 로깅 설정 (print 대신 레벨 있는 로그)
+#  - "kbo.*" 로거 → QueueHandler(요청 스레드는 큐에 넣기만) → QueueListener 스레드가 stdout에 기록
+#  - LOG_LEVEL(기본 INFO): debug 메시지는 logger.debug("... %s", x) 지연 포맷이라
+#    INFO에서는 문자열을 만들지 않음, 반복문으로 만드는 debug 출력은 debug_enabled()로 감쌈
+#  - 디버그 샘플링(LOG_DEBUG_SAMPLE_RATE): 요청 단위로 정해서 한 요청의 debug 로그는 전부 남기거나 전부 버림
+#  - LOG_FORMAT=json 이면 한 줄 JSON
+#  - gunicorn preload 후 fork된 워커는 큐 / 리스너 스레드를 새로 만듦
+# ============================================
+
+import os
+import sys
+import json
+import queue
+import atexit
+import random
+import logging
+import threading
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+
+ROOT_LOGGER = "kbo"
+
+_debug_sampled: ContextVar[bool] = ContextVar("debug_sampled", default=True)
+_debug_sample_rate = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "1"))
+
+_handler: Optional[QueueHandler] = None
+_listener: Optional[QueueListener] = None
+_setup_lock = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False)
+
+
+class DebugSampleFilter(logging.Filter):
+    """샘플링에서 빠진 요청의 DEBUG 레코드는 큐에 넣기 전에 버림"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno > logging.DEBUG or _debug_sampled.get()
+
+
+def _stream_handler() -> logging.Handler:
+    handler = logging.StreamHandler(sys.stdout)
+    if os.getenv("LOG_FORMAT", "text").lower() == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s [%(name)s] %(message)s"))
+    return handler
+
+
+def _start_listener():
+    """새 큐 + 리스너 스레드 (fork된 자식에서는 부모의 큐/락 상태를 믿을 수 없어서 새로 만듦)"""
+    global _listener
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(int(os.getenv("LOG_QUEUE_SIZE", "10000")))
+    _handler.queue = log_queue
+    _listener = QueueListener(log_queue, _stream_handler(), respect_handler_level=False)
+    _listener.start()
+
+
+def _stop_listener():
+    """남은 로그를 다 쓰고 리스너 종료 (종료 시 atexit)"""
+    global _listener
+    if _listener:
+        _listener.stop()
+        _listener = None
+
+
+class _DroppingQueueHandler(QueueHandler):
+    """큐가 가득 차면 기다리지 않고 버림 (로그 때문에 요청이 막히지 않게)"""
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass
+
+
+def setup_logging():
+    """kbo 로거 설정 (여러 번 불러도 한 번만)"""
+    global _handler
+    with _setup_lock:
+        if _handler is not None:
+            return
+        logger = logging.getLogger(ROOT_LOGGER)
+        logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+        logger.propagate = False
+
+        _handler = _DroppingQueueHandler(queue.Queue())
+        _handler.addFilter(DebugSampleFilter())
+        logger.addHandler(_handler)
+        _start_listener()
+
+        atexit.register(_stop_listener)
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=_start_listener)
+
+
+def get_logger(name: str) -> logging.Logger:
+    """모듈별 로거 (kbo.<name>)"""
+    setup_logging()
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+def sample_debug():
+    """요청 시작 시 호출: 이 요청의 debug 로그를 남길지 정함 (컨텍스트 단위)"""
+    if _debug_sample_rate < 1.0:
+        _debug_sampled.set(random.random() < _debug_sample_rate)
+
+
+def debug_enabled(logger: logging.Logger) -> bool:
+    """반복문 등으로 debug 출력을 만들기 전에 확인 (INFO이거나 샘플링에서 빠지면 False)"""
+    return logger.isEnabledFor(logging.DEBUG) and _debug_sampled.get()
+
+
+# 테스트 코드
+if __name__ == "__main__":
+    import time
+
+    log = get_logger("test")
+    log.info("⚾ 로깅 테스트 (LOG_LEVEL=%s)", logging.getLevelName(log.getEffectiveLevel()))
+
+    class Expensive:
+        calls = 0
+
+        def __str__(self):
+            Expensive.calls += 1
+            return "expensive"
+
+    started = time.perf_counter()
+    for _ in range(100000):
+        log.debug("🔍 [DEBUG] %s", Expensive())
+    elapsed = (time.perf_counter() - started) * 1000
+    log.info("debug 10만 번: %.1fms, 포맷 %s번", elapsed, Expensive.calls)
+    _stop_listener()
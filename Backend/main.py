@@ -3,15 +3,25 @@
 # ⚾ FastAPI 백엔드 메인
 # ============================================
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Union
 import os
+import time
+import anyio
 from dotenv import load_dotenv
 
 from hybrid_engine import get_hybrid_engine
 from rag_system import get_rag_system
+from resilience import breaker_status
+import metrics
+import tracing
+from logging_setup import get_logger, sample_debug
+
+logger = get_logger("main")
 
 # 환경 변수 로드
 load_dotenv()
@@ -32,6 +42,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 요청 수 / 처리 시간 지표 (endpoint는 경로 템플릿 기준, 매칭 안 된 경로는 하나로 묶음)
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        endpoint = getattr(route, "path", None) or "unmatched"
+        metrics.inc("kbo_http_requests_total", endpoint=endpoint, method=request.method, status=status)
+        metrics.observe("kbo_http_request_duration_seconds", time.perf_counter() - started, endpoint=endpoint)
+
 # 전역 엔진 인스턴스
 hybrid_engine = None
 
@@ -39,6 +64,8 @@ hybrid_engine = None
 class ChatRequest(BaseModel):
     question: str
     use_rag: bool = True  # RAG 사용 여부 (디폴트: True)
+    rerank: Optional[bool] = None  # RAG 검색 결과 로컬 재정렬 (None = 서버 기본값, A/B 비교용)
+    trace: bool = False  # True면 단계별 span 타이밍을 debug_info["trace"]로 반환
 
 class ChatResponse(BaseModel):
     answer: str
@@ -48,6 +75,32 @@ class ChatResponse(BaseModel):
     sources: list = []
     debug_info: Optional[Dict[str, Any]] = None
 
+class SearchFilters(BaseModel):
+    season: Optional[Union[int, List[int]]] = None  # 시즌 하나 또는 여러 시즌
+    pitcher: Optional[str] = None
+    batter: Optional[str] = None
+    pitcher_hand: Optional[str] = None
+    batter_hand: Optional[str] = None
+    pitcher_pitch_type: Optional[str] = None
+    batter_pitch_type: Optional[str] = None
+
+class BatchSearchQuery(BaseModel):
+    query: str
+    filters: Optional[SearchFilters] = None  # 없으면 요청 공통 filters 사용
+
+class BatchSearchRequest(BaseModel):
+    queries: List[BatchSearchQuery]
+    k: int = 5
+    filters: Optional[SearchFilters] = None  # 모든 질의에 공통으로 적용할 필터
+
+# 배치 검색 한 번에 받을 최대 질의 수
+SEARCH_BATCH_MAX_QUERIES = int(os.getenv("SEARCH_BATCH_MAX_QUERIES", "1000"))
+
+
+# 블로킹 작업(규칙 엔진 / RAG / 검색)을 돌리는 워커당 스레드 풀 크기
+# 이벤트 루프는 요청 수신만 하고, 동시에 처리하는 요청 수는 이 값까지
+THREAD_POOL_SIZE = int(os.getenv("THREAD_POOL_SIZE", "40"))
+
 
 # 시작 이벤트
 @app.on_event("startup")
@@ -55,14 +108,16 @@ async def startup_event():
     """서버 시작 시 엔진 초기화"""
     global hybrid_engine
     
-    print("🚀 서버 시작 중...")
-    print("📦 하이브리드 엔진 초기화 중...")
+    logger.info("🚀 서버 시작 중...")
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREAD_POOL_SIZE
+    metrics.start_multiprocess()
+    logger.info("📦 하이브리드 엔진 초기화 중...")
     
     try:
         hybrid_engine = get_hybrid_engine()
-        print("✅ 하이브리드 엔진 초기화 완료")
+        logger.info("✅ 하이브리드 엔진 초기화 완료")
     except Exception as e:
-        print(f"❌ 엔진 초기화 실패: {e}")
+        logger.exception("❌ 엔진 초기화 실패: %s", e)
         raise
 
 
@@ -81,16 +136,26 @@ async def health_check():
     """헬스 체크"""
     return {
         "status": "healthy",
-        "engine_initialized": hybrid_engine is not None
+        "engine_initialized": hybrid_engine is not None,
+        # 서빙 중인 벡터 스토어 세대 / 백그라운드 재구축 상태
+        "vector_store": hybrid_engine.rag_system.store_status() if hybrid_engine else None,
+        # 공급자(임베딩 / 채팅) 회로 차단기 상태 (open이면 규칙 기반 답변만)
+        "providers": breaker_status()
     }
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    """Prometheus 지표 (워커가 여러 개면 METRICS_DIR 스냅샷까지 합친 값)"""
+    return PlainTextResponse(metrics.render_latest(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 @app.post("/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest):
+async def chat(request: ChatRequest, http_request: Request):
     """
     채팅 엔드포인트
     
     Args:
-        request: ChatRequest (question, use_rag)
+        request: ChatRequest (question, use_rag, rerank, trace)
+        http_request: traceparent 헤더가 있으면 호출한 쪽 트레이스를 이어감
     
     Returns:
         ChatResponse
@@ -108,10 +173,21 @@ async def chat(request: ChatRequest):
         )
     
     try:
-        print(f"\n📨 질문 수신: {request.question}")
+        # 이 요청의 debug 로그를 남길지 (LOG_DEBUG_SAMPLE_RATE, 스레드 풀로 넘어가도 유지)
+        sample_debug()
+        logger.debug("📨 질문 수신: %s", request.question)
+        
+        # 하이브리드 엔진으로 처리 (샘플링된 요청만 span 기록)
+        with tracing.trace_request(
+            "main.chat", requested=request.trace, traceparent=http_request.headers.get("traceparent")
+        ) as trace:
+            result = await run_in_threadpool(
+                hybrid_engine.process_query, request.question, rerank=request.rerank
+            )
         
-        # 하이브리드 엔진으로 처리
-        result = hybrid_engine.process_query(request.question)
+        debug_info = result.get("debug_info")
+        if trace and request.trace:
+            debug_info = {**(debug_info or {}), "trace": trace.summary()}
         
         return ChatResponse(
             answer=result["answer"],
@@ -119,31 +195,51 @@ async def chat(request: ChatRequest):
             rule_answer=result.get("rule_answer"),
             rag_answer=result.get("rag_answer"),
             sources=result.get("sources", []),
-            debug_info=result.get("debug_info")
+            debug_info=debug_info
         )
         
     except Exception as e:
-        print(f"❌ 처리 중 오류: {e}")
+        logger.exception("❌ 처리 중 오류: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"답변 생성 중 오류가 발생했습니다: {str(e)}"
         )
 
 @app.post("/search")
-async def search_documents(query: str, k: int = 5):
+async def search_documents(
+    query: str,
+    k: int = 5,
+    season: Optional[int] = None,
+    pitcher: Optional[str] = None,
+    batter: Optional[str] = None,
+    pitcher_hand: Optional[str] = None,
+    batter_hand: Optional[str] = None,
+    pitcher_pitch_type: Optional[str] = None,
+    batter_pitch_type: Optional[str] = None
+):
     """
     유사 문서 검색 엔드포인트
     
     Args:
         query: 검색어
         k: 반환할 문서 수
+        season ~ batter_pitch_type: 메타데이터 필터 (지정한 것만 적용)
     
     Returns:
         검색된 문서 리스트
     """
     try:
         rag = get_rag_system()
-        docs = rag.search_similar_documents(query, k=k)
+        filters = {
+            "season": season,
+            "pitcher": pitcher,
+            "batter": batter,
+            "pitcher_hand": pitcher_hand,
+            "batter_hand": batter_hand,
+            "pitcher_pitch_type": pitcher_pitch_type,
+            "batter_pitch_type": batter_pitch_type
+        }
+        docs = await run_in_threadpool(rag.search_similar_documents, query, k=k, filters=filters)
         
         results = []
         for doc in docs:
@@ -165,12 +261,66 @@ async def search_documents(query: str, k: int = 5):
         )
 
 
+@app.post("/search/batch")
+async def search_documents_batch(request: BatchSearchRequest):
+    """
+    여러 질의 유사 문서 검색 (오프라인 분석용)
+    
+    질의 임베딩은 배치 호출 한 번, FAISS 검색은 필터가 같은 질의끼리 행렬 한 번으로 처리
+    
+    Args:
+        request: BatchSearchRequest (queries[{query, filters}], k, 공통 filters)
+    
+    Returns:
+        질의 순서대로 검색된 문서 리스트
+    """
+    if len(request.queries) > SEARCH_BATCH_MAX_QUERIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"한 번에 최대 {SEARCH_BATCH_MAX_QUERIES}개 질의까지 검색할 수 있습니다."
+        )
+    
+    try:
+        rag = get_rag_system()
+        queries = [item.query for item in request.queries]
+        filters = [
+            (item.filters or request.filters or SearchFilters()).model_dump()
+            for item in request.queries
+        ]
+        batch_docs = await run_in_threadpool(
+            rag.search_similar_documents_batch, queries, k=request.k, filters=filters
+        )
+        
+        results = []
+        for query, docs in zip(queries, batch_docs):
+            results.append({
+                "query": query,
+                "count": len(docs),
+                "results": [
+                    {"content": doc.page_content, "metadata": doc.metadata}
+                    for doc in docs
+                ]
+            })
+        
+        return {
+            "count": len(results),
+            "results": results
+        }
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"검색 중 오류가 발생했습니다: {str(e)}"
+        )
+
+
 # 서버 실행
 if __name__ == "__main__":
     import uvicorn
     
     port = int(os.getenv("PORT", 8000))
     
+    # 개발 서버 (reload, 프로세스 하나), 운영은 gunicorn -c gunicorn.conf.py
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
@@ -6,7 +6,12 @@
 import os
 import pandas as pd
 
-print("🔔 matchup_engine.py 실행 시작")
+from engine_result import ok, no_data, unrecognized, missing_column
+from tracing import traced
+from logging_setup import get_logger, debug_enabled
+
+logger = get_logger("matchup_engine")
+logger.info("🔔 matchup_engine.py 실행 시작")
 
 # ============================================
 # 0) 경로 설정
@@ -30,25 +35,25 @@ def load_stats_csv():
     """final.csv -> final_final.csv 순서로 존재하는 파일을 찾아서 로드."""
     last_err = None
     for path in CANDIDATE_STATS:
-        print(f"📂 stats CSV 후보 경로 시도 중: {path}")
+        logger.info("📂 stats CSV 후보 경로 시도 중: %s", path)
         if not os.path.exists(path):
-            print(f"  ❌ 파일 없음: {path}")
+            logger.warning("❌ 파일 없음: %s", path)
             continue
 
         try:
-            print("  🔄 utf-8-sig 인코딩으로 로드 시도...")
+            logger.info("🔄 utf-8-sig 인코딩으로 로드 시도...")
             df = pd.read_csv(path, encoding="utf-8-sig")
-            print(f"  ✅ utf-8-sig 로드 성공! shape={df.shape}")
+            logger.info("✅ utf-8-sig 로드 성공! shape=%s", df.shape)
             return df, path
         except UnicodeDecodeError as e:
-            print("  ⚠️ utf-8-sig 실패, cp949로 재시도...")
+            logger.warning("⚠️ utf-8-sig 실패, cp949로 재시도...")
             last_err = e
             try:
                 df = pd.read_csv(path, encoding="cp949")
-                print(f"  ✅ cp949 로드 성공! shape={df.shape}")
+                logger.info("✅ cp949 로드 성공! shape=%s", df.shape)
                 return df, path
             except Exception as e2:
-                print("  ❌ cp949 로드도 실패:", repr(e2))
+                logger.error("❌ cp949 로드도 실패: %r", e2)
                 last_err = e2
 
     raise FileNotFoundError(
@@ -59,33 +64,32 @@ def load_stats_csv():
 
 def load_docs_csv():
     """DOC_TEXT용 줄글 CSV 로드 (없어도 됨)."""
-    print(f"📂 docs CSV 로드 시도: {DOCS_PATH}")
+    logger.info("📂 docs CSV 로드 시도: %s", DOCS_PATH)
     if not os.path.exists(DOCS_PATH):
-        print("  ⚠️ docs 파일이 존재하지 않습니다. (RAG 줄글 없이도 엔진은 동작)")
+        logger.warning("⚠️ docs 파일이 존재하지 않습니다. (RAG 줄글 없이도 엔진은 동작)")
         return None, None
 
     try:
         df = pd.read_csv(DOCS_PATH, encoding="utf-8-sig")
-        print(f"  ✅ docs_df 로드 성공! shape={df.shape}")
+        logger.info("✅ docs_df 로드 성공! shape=%s", df.shape)
         return df, DOCS_PATH
     except Exception as e:
-        print("  ⚠️ docs_df 로드 실패 (무시하고 진행):", repr(e))
+        logger.warning("⚠️ docs_df 로드 실패 (무시하고 진행): %r", e)
         return None, None
 
 
 try:
     stats_df, STATS_PATH = load_stats_csv()
 except Exception as e:
-    print("🚨 stats_df 로드 중 치명적인 에러 발생:", repr(e))
+    logger.error("🚨 stats_df 로드 중 치명적인 에러 발생: %r", e)
     raise SystemExit(1)
 
 docs_df, _ = load_docs_csv()
 
-print("\n✅ 최종 stats_df shape:", stats_df.shape)
-print("✅ 사용된 stats CSV 경로:", STATS_PATH)
+logger.info("✅ 최종 stats_df shape: %s", stats_df.shape)
+logger.info("✅ 사용된 stats CSV 경로: %s", STATS_PATH)
 if docs_df is not None:
-    print("✅ docs_df shape:", docs_df.shape)
-print("-" * 60)
+    logger.info("✅ docs_df shape: %s", docs_df.shape)
 
 
 # ============================================
@@ -121,6 +125,15 @@ def fmt(x, d=3):
         return "정보 없음"
 
 
+def num(x):
+    """payload용 숫자 변환 (NaN이나 None이면 None)."""
+    try:
+        v = float(x)
+    except Exception:
+        return None
+    return None if v != v else v
+
+
 def pitcher_exists(name_or_id) -> bool:
     """주어진 이름/ID의 투수가 stats_df에 존재하는지 간단 체크."""
     df = stats_df
@@ -189,28 +202,40 @@ def resolve_matchup_row(season, pitcher_name_or_id, batter_name_or_id):
 # ============================================
 # 3) 단일 매치업 요약
 # ============================================
+@traced()
 def answer_basic_matchup(season, pitcher, batter):
-    print(f"\n🔍 [DEBUG] answer_basic_matchup 호출: season={season}, pitcher={pitcher}, batter={batter}")
+    logger.debug("🔍 answer_basic_matchup 호출: season=%s, pitcher=%s, batter=%s", season, pitcher, batter)
 
     if not pitcher_exists(pitcher):
-        return f"{season} 시즌 기준으로 '{pitcher}'에 대한 투수 데이터가 없습니다. (우리 데이터셋에 없는 투수일 수 있어요.)"
+        return no_data(f"{season} 시즌 기준으로 '{pitcher}'에 대한 투수 데이터가 없습니다. (우리 데이터셋에 없는 투수일 수 있어요.)")
 
     if not batter_exists(batter):
-        return f"{season} 시즌 기준으로 '{batter}'에 대한 타자 데이터가 없습니다. (우리 데이터셋에 없는 타자일 수 있어요.)"
+        return no_data(f"{season} 시즌 기준으로 '{batter}'에 대한 타자 데이터가 없습니다. (우리 데이터셋에 없는 타자일 수 있어요.)")
 
     row = resolve_matchup_row(season, pitcher, batter)
     if row is None:
-        return f"{season} 시즌 {pitcher} vs {batter} 매치업 데이터가 없습니다."
+        return no_data(f"{season} 시즌 {pitcher} vs {batter} 매치업 데이터가 없습니다.")
+
+    stats = {
+        "avg":          num(row["FINAL_H2H_AVG_PREDICTED"]),
+        "obp":          num(row["FINAL_ACTUAL_H2H_OBP_PREDICTED"]),
+        "slg":          num(row["FINAL_ACTUAL_H2H_SLG_PREDICTED"]),
+        "so_rate":      num(row["FINAL_ACTUAL_PITCHER_SO_RATE_PREDICTED"]),
+        "risp_avg":     num(row["FINAL_ACTUAL_H2H_RISP_AVG_PREDICTED"]),
+        "vs_slider":    num(row["FINAL_ACTUAL_H2H_VS_SLIDER_AVG_PREDICTED"]),
+        "pitcher_era":  num(row.get("PITCHER_OVERALL_ERA", None)),
+        "batter_avg":   num(row.get("BATTER_OVERALL_AVG", None)),
+    }
 
-    avg       = fmt(row["FINAL_H2H_AVG_PREDICTED"], 3)
-    obp       = fmt(row["FINAL_ACTUAL_H2H_OBP_PREDICTED"], 3)
-    slg       = fmt(row["FINAL_ACTUAL_H2H_SLG_PREDICTED"], 3)
-    so        = fmt(row["FINAL_ACTUAL_PITCHER_SO_RATE_PREDICTED"], 3)
-    risp      = fmt(row["FINAL_ACTUAL_H2H_RISP_AVG_PREDICTED"], 3)
-    vs_slider = fmt(row["FINAL_ACTUAL_H2H_VS_SLIDER_AVG_PREDICTED"], 3)
+    avg       = fmt(stats["avg"], 3)
+    obp       = fmt(stats["obp"], 3)
+    slg       = fmt(stats["slg"], 3)
+    so        = fmt(stats["so_rate"], 3)
+    risp      = fmt(stats["risp_avg"], 3)
+    vs_slider = fmt(stats["vs_slider"], 3)
 
-    p_era        = fmt(row.get("PITCHER_OVERALL_ERA", None), 2)
-    b_season_avg = fmt(row.get("BATTER_OVERALL_AVG", None), 3)
+    p_era        = fmt(stats["pitcher_era"], 2)
+    b_season_avg = fmt(stats["batter_avg"], 3)
 
     pitcher_with_and = add_josa(pitcher, "과/와")
     batter_subject   = add_josa(batter, "이/가")
@@ -225,7 +250,7 @@ def answer_basic_matchup(season, pitcher, batter):
         f"참고로 투수의 시즌 평균자책점(ERA)은 {p_era}, "
         f"타자의 시즌 타율은 {b_season_avg}입니다."
     )
-    return text
+    return ok(text, season=season, pitcher=pitcher, batter=batter, stats=stats)
 
 
 # ============================================
@@ -238,7 +263,7 @@ def pitcher_rank_batters(
     sort_col="FINAL_H2H_AVG_PREDICTED",
     ascending=False,
 ):
-    print(f"\n🔍 [DEBUG] pitcher_rank_batters: season={season}, pitcher={pitcher}, sort_col={sort_col}")
+    logger.debug("🔍 pitcher_rank_batters: season=%s, pitcher=%s, sort_col=%s", season, pitcher, sort_col)
     df = stats_df
 
     if not pitcher_exists(pitcher):
@@ -256,15 +281,16 @@ def pitcher_rank_batters(
     for _, r in sub.iterrows():
         records.append({
             "batter":   r[name_col],
-            "avg":      fmt(r.get("FINAL_H2H_AVG_PREDICTED", None), 3),
-            "obp":      fmt(r.get("FINAL_ACTUAL_H2H_OBP_PREDICTED", None), 3),
-            "slg":      fmt(r.get("FINAL_ACTUAL_H2H_SLG_PREDICTED", None), 3),
-            "so_rate":  fmt(r.get("FINAL_ACTUAL_PITCHER_SO_RATE_PREDICTED", None), 3),
-            "risp_avg": fmt(r.get("FINAL_ACTUAL_H2H_RISP_AVG_PREDICTED", None), 3),
+            "avg":      num(r.get("FINAL_H2H_AVG_PREDICTED", None)),
+            "obp":      num(r.get("FINAL_ACTUAL_H2H_OBP_PREDICTED", None)),
+            "slg":      num(r.get("FINAL_ACTUAL_H2H_SLG_PREDICTED", None)),
+            "so_rate":  num(r.get("FINAL_ACTUAL_PITCHER_SO_RATE_PREDICTED", None)),
+            "risp_avg": num(r.get("FINAL_ACTUAL_H2H_RISP_AVG_PREDICTED", None)),
         })
     return records, ""
 
 
+@traced()
 def answer_pitcher_weak_batters_by_avg(season, pitcher, top_n=3):
     records, msg = pitcher_rank_batters(
         season, pitcher,
@@ -273,19 +299,20 @@ def answer_pitcher_weak_batters_by_avg(season, pitcher, top_n=3):
         ascending=False,
     )
     if msg:
-        return msg
+        return no_data(msg)
     if not records:
-        return f"{season} 시즌 해당 투수의 매치업 데이터가 없습니다."
+        return no_data(f"{season} 시즌 해당 투수의 매치업 데이터가 없습니다.")
 
     lines = [f"{season} 시즌 타율 기준으로 해당 투수가 가장 어려워하는 타자 TOP{top_n}입니다:"]
     for i, r in enumerate(records, start=1):
         lines.append(
-            f"{i}) {r['batter']} - 타율 {r['avg']}, 출루율 {r['obp']}, "
-            f"장타율 {r['slg']}, 득점권 타율 {r['risp_avg']}"
+            f"{i}) {r['batter']} - 타율 {fmt(r['avg'])}, 출루율 {fmt(r['obp'])}, "
+            f"장타율 {fmt(r['slg'])}, 득점권 타율 {fmt(r['risp_avg'])}"
         )
-    return "\n".join(lines)
+    return ok("\n".join(lines), season=season, pitcher=pitcher, records=records)
 
 
+@traced()
 def answer_pitcher_high_so_batters(season, pitcher, top_n=3):
     records, msg = pitcher_rank_batters(
         season, pitcher,
@@ -294,16 +321,16 @@ def answer_pitcher_high_so_batters(season, pitcher, top_n=3):
         ascending=False,
     )
     if msg:
-        return msg
+        return no_data(msg)
     if not records:
-        return f"{season} 시즌 해당 투수의 매치업 데이터가 없습니다."
+        return no_data(f"{season} 시즌 해당 투수의 매치업 데이터가 없습니다.")
 
     lines = [f"{season} 시즌 이 투수가 삼진을 많이 잡을 가능성이 높은 타자 TOP{top_n}입니다:"]
     for i, r in enumerate(records, start=1):
         lines.append(
-            f"{i}) {r['batter']} - 삼진 비율 {r['so_rate']}, 타율 {r['avg']}"
+            f"{i}) {r['batter']} - 삼진 비율 {fmt(r['so_rate'])}, 타율 {fmt(r['avg'])}"
         )
-    return "\n".join(lines)
+    return ok("\n".join(lines), season=season, pitcher=pitcher, records=records)
 
 
 # ============================================
@@ -316,7 +343,7 @@ def batter_rank_pitchers(
     sort_col="FINAL_H2H_AVG_PREDICTED",
     ascending=False,
 ):
-    print(f"\n🔍 [DEBUG] batter_rank_pitchers: season={season}, batter={batter}, sort_col={sort_col}")
+    logger.debug("🔍 batter_rank_pitchers: season=%s, batter=%s, sort_col=%s", season, batter, sort_col)
     df = stats_df
 
     if not batter_exists(batter):
@@ -333,14 +360,15 @@ def batter_rank_pitchers(
     for _, r in sub.iterrows():
         records.append({
             "pitcher":  r[name_col],
-            "avg":      fmt(r.get("FINAL_H2H_AVG_PREDICTED", None), 3),
-            "obp":      fmt(r.get("FINAL_ACTUAL_H2H_OBP_PREDICTED", None), 3),
-            "slg":      fmt(r.get("FINAL_ACTUAL_H2H_SLG_PREDICTED", None), 3),
-            "so_rate":  fmt(r.get("FINAL_ACTUAL_PITCHER_SO_RATE_PREDICTED", None), 3),
+            "avg":      num(r.get("FINAL_H2H_AVG_PREDICTED", None)),
+            "obp":      num(r.get("FINAL_ACTUAL_H2H_OBP_PREDICTED", None)),
+            "slg":      num(r.get("FINAL_ACTUAL_H2H_SLG_PREDICTED", None)),
+            "so_rate":  num(r.get("FINAL_ACTUAL_PITCHER_SO_RATE_PREDICTED", None)),
         })
     return records, ""
 
 
+@traced()
 def answer_batter_best_pitchers(season, batter, top_n=3):
     records, msg = batter_rank_pitchers(
         season, batter,
@@ -349,20 +377,21 @@ def answer_batter_best_pitchers(season, batter, top_n=3):
         ascending=False,
     )
     if msg:
-        return msg
+        return no_data(msg)
     if not records:
-        return f"{season} 시즌 해당 타자의 매치업 데이터가 없습니다."
+        return no_data(f"{season} 시즌 해당 타자의 매치업 데이터가 없습니다.")
 
     batter_subject = add_josa("이 타자", "는/은")
 
     lines = [f"{season} 시즌 {batter_subject} 타율 기준으로 가장 강한 투수 TOP{top_n}입니다:"]
     for i, r in enumerate(records, start=1):
         lines.append(
-            f"{i}) {r['pitcher']} - 타율 {r['avg']}, 출루율 {r['obp']}, 장타율 {r['slg']}"
+            f"{i}) {r['pitcher']} - 타율 {fmt(r['avg'])}, 출루율 {fmt(r['obp'])}, 장타율 {fmt(r['slg'])}"
         )
-    return "\n".join(lines)
+    return ok("\n".join(lines), season=season, batter=batter, records=records)
 
 
+@traced()
 def answer_batter_worst_pitchers(season, batter, top_n=3):
     records, msg = batter_rank_pitchers(
         season, batter,
@@ -371,25 +400,26 @@ def answer_batter_worst_pitchers(season, batter, top_n=3):
         ascending=True,
     )
     if msg:
-        return msg
+        return no_data(msg)
     if not records:
-        return f"{season} 시즌 해당 타자의 매치업 데이터가 없습니다."
+        return no_data(f"{season} 시즌 해당 타자의 매치업 데이터가 없습니다.")
 
     batter_subject = add_josa("이 타자", "는/은")
 
     lines = [f"{season} 시즌 {batter_subject} 타율 기준으로 가장 고전하는 투수 TOP{top_n}입니다:"]
     for i, r in enumerate(records, start=1):
         lines.append(
-            f"{i}) {r['pitcher']} - 타율 {r['avg']}, 출루율 {r['obp']}, 장타율 {r['slg']}"
+            f"{i}) {r['pitcher']} - 타율 {fmt(r['avg'])}, 출루율 {fmt(r['obp'])}, 장타율 {fmt(r['slg'])}"
         )
-    return "\n".join(lines)
+    return ok("\n".join(lines), season=season, batter=batter, records=records)
 
 
 # ============================================
 # 6) 시즌별 추세
 # ============================================
+@traced()
 def answer_matchup_trend(pitcher, batter, season_start, season_end):
-    print(f"\n🔍 [DEBUG] answer_matchup_trend: pitcher={pitcher}, batter={batter}, range={season_start}~{season_end}")
+    logger.debug("🔍 answer_matchup_trend: pitcher=%s, batter=%s, range=%s~%s", pitcher, batter, season_start, season_end)
     df = stats_df
     cond = (df["SEASON_ID"] >= season_start) & (df["SEASON_ID"] <= season_end)
 
@@ -405,23 +435,29 @@ def answer_matchup_trend(pitcher, batter, season_start, season_end):
 
     sub = df[cond].sort_values("SEASON_ID")
     if sub.empty:
-        return f"{season_start}~{season_end} 시즌 사이 해당 매치업 데이터가 없습니다."
+        return no_data(f"{season_start}~{season_end} 시즌 사이 해당 매치업 데이터가 없습니다.")
 
     lines = [f"{pitcher} vs {batter} 매치업의 {season_start}~{season_end} 시즌 예측 추세입니다:"]
+    records = []
     for _, r in sub.iterrows():
         s   = r["SEASON_ID"]
-        avg = fmt(r.get("FINAL_H2H_AVG_PREDICTED", None), 3)
-        obp = fmt(r.get("FINAL_ACTUAL_H2H_OBP_PREDICTED", None), 3)
-        slg = fmt(r.get("FINAL_ACTUAL_H2H_SLG_PREDICTED", None), 3)
-        lines.append(f"- {s} 시즌: 타율 {avg}, 출루율 {obp}, 장타율 {slg}")
+        rec = {
+            "season": int(s),
+            "avg":    num(r.get("FINAL_H2H_AVG_PREDICTED", None)),
+            "obp":    num(r.get("FINAL_ACTUAL_H2H_OBP_PREDICTED", None)),
+            "slg":    num(r.get("FINAL_ACTUAL_H2H_SLG_PREDICTED", None)),
+        }
+        records.append(rec)
+        lines.append(f"- {s} 시즌: 타율 {fmt(rec['avg'])}, 출루율 {fmt(rec['obp'])}, 장타율 {fmt(rec['slg'])}")
 
     lines.append("이 수치를 바탕으로 상승/하락 추세 및 매치업 변화를 해석해 볼 수 있습니다.")
-    return "\n".join(lines)
+    return ok("\n".join(lines), pitcher=pitcher, batter=batter, records=records)
 
 
 # ============================================
 # 6-1) 슬라이더로 상대하기 편한 타자 TOPN
 # ============================================
+@traced()
 def answer_pitcher_slider_friendly_batters(season, pitcher, top_n=3):
     """
     {{season}}년 {{pitcher_name}}이 슬라이더로 상대하기 편한 타자 TOPN
@@ -430,34 +466,41 @@ def answer_pitcher_slider_friendly_batters(season, pitcher, top_n=3):
     df = stats_df
 
     if not pitcher_exists(pitcher):
-        return f"{season} 시즌 해당 투수의 매치업 데이터가 없습니다."
+        return no_data(f"{season} 시즌 해당 투수의 매치업 데이터가 없습니다.")
 
     sub = resolve_pitcher_filter(df, season, pitcher)
     if sub.empty:
-        return f"{season} 시즌 해당 투수의 매치업 데이터가 없습니다."
+        return no_data(f"{season} 시즌 해당 투수의 매치업 데이터가 없습니다.")
 
     col = "FINAL_ACTUAL_H2H_VS_SLIDER_AVG_PREDICTED"
     if col not in sub.columns:
-        return f"슬라이더 상대 타율 컬럼({col})이 데이터에 없습니다."
+        return missing_column(f"슬라이더 상대 타율 컬럼({col})이 데이터에 없습니다.")
 
     sub = sub.sort_values(col, ascending=True).head(top_n)
 
     name_col = "BATTER_NAME" if "BATTER_NAME" in sub.columns else "BATTER_ID"
 
     lines = [f"{season} 시즌 이 투수가 슬라이더로 상대하기 편한 타자 TOP{top_n}입니다:"]
+    records = []
     for i, r in enumerate(sub.itertuples(), start=1):
         batter = getattr(r, name_col)
+        records.append({
+            "batter":    batter,
+            "vs_slider": num(getattr(r, col)),
+            "avg":       num(getattr(r, "FINAL_H2H_AVG_PREDICTED")),
+        })
         vs_slider = fmt(getattr(r, col), 3)
         avg = fmt(getattr(r, "FINAL_H2H_AVG_PREDICTED"), 3)
         lines.append(
             f"{i}) {batter} - 슬라이더 상대 타율 {vs_slider}, 전체 매치업 타율 {avg}"
         )
-    return "\n".join(lines)
+    return ok("\n".join(lines), season=season, pitcher=pitcher, records=records)
 
 
 # ============================================
 # 6-2) 좌/우타자 중에서 약한 타자 TOPN
 # ============================================
+@traced()
 def answer_pitcher_weak_batters_by_hand(season, pitcher, batter_hand="좌", top_n=3):
     """
     {{season}}년 {{pitcher_name}}이 좌/우타자 중에서 약한 타자 TOPN
@@ -475,51 +518,59 @@ def answer_pitcher_weak_batters_by_hand(season, pitcher, batter_hand="좌", top_
     df = stats_df
 
     if not pitcher_exists(pitcher):
-        return f"{season} 시즌 해당 투수의 매치업 데이터가 없습니다."
+        return no_data(f"{season} 시즌 해당 투수의 매치업 데이터가 없습니다.")
 
     sub = resolve_pitcher_filter(df, season, pitcher)
     if sub.empty:
-        return f"{season} 시즌 해당 투수의 매치업 데이터가 없습니다."
+        return no_data(f"{season} 시즌 해당 투수의 매치업 데이터가 없습니다.")
 
     if "BATTER_HAND" in sub.columns:
         sub = sub[sub["BATTER_HAND"].isin(codes_to_match)]
 
     if sub.empty:
-        return f"{season} 시즌 해당 투수의 {hand_label} 상대 매치업 데이터가 없습니다."
+        return no_data(f"{season} 시즌 해당 투수의 {hand_label} 상대 매치업 데이터가 없습니다.")
 
     sub = sub.sort_values("FINAL_H2H_AVG_PREDICTED", ascending=False).head(top_n)
 
     name_col = "BATTER_NAME" if "BATTER_NAME" in sub.columns else "BATTER_ID"
 
     lines = [f"{season} 시즌 이 투수가 {hand_label} 중에서 특히 약한 타자 TOP{top_n}입니다:"]
+    records = []
     for i, r in enumerate(sub.itertuples(), start=1):
         batter = getattr(r, name_col)
+        records.append({
+            "batter": batter,
+            "avg":    num(getattr(r, "FINAL_H2H_AVG_PREDICTED")),
+            "obp":    num(getattr(r, "FINAL_ACTUAL_H2H_OBP_PREDICTED")),
+            "slg":    num(getattr(r, "FINAL_ACTUAL_H2H_SLG_PREDICTED")),
+        })
         avg = fmt(getattr(r, "FINAL_H2H_AVG_PREDICTED"), 3)
         obp = fmt(getattr(r, "FINAL_ACTUAL_H2H_OBP_PREDICTED"), 3)
         slg = fmt(getattr(r, "FINAL_ACTUAL_H2H_SLG_PREDICTED"), 3)
         lines.append(
             f"{i}) {batter} - 타율 {avg}, 출루율 {obp}, 장타율 {slg}"
         )
-    return "\n".join(lines)
+    return ok("\n".join(lines), season=season, pitcher=pitcher, batter_hand=batter_hand, records=records)
 
 
 # ============================================
 # 6-3) 장타 잘 치는 타자 TOPN (거포)
 # ============================================
+@traced()
 def answer_pitcher_power_hitters(season, pitcher, top_n=3, batter_hand=None):
     """
     {{season}}년 {{pitcher_name}}에게 장타를 잘 치는 타자 TOPN
     """
-    print(f"\n🔍 [DEBUG] pitcher_power_hitters: season={season}, pitcher={pitcher}, hand={batter_hand}, top_n={top_n}")
+    logger.debug("🔍 pitcher_power_hitters: season=%s, pitcher=%s, hand=%s, top_n=%s", season, pitcher, batter_hand, top_n)
 
     df = stats_df
 
     if not pitcher_exists(pitcher):
-        return f"{season} 시즌 {pitcher}의 매치업 데이터가 없습니다."
+        return no_data(f"{season} 시즌 {pitcher}의 매치업 데이터가 없습니다.")
 
     sub = resolve_pitcher_filter(df, season, pitcher)
     if sub.empty:
-        return f"{season} 시즌 {pitcher}의 매치업 데이터가 없습니다."
+        return no_data(f"{season} 시즌 {pitcher}의 매치업 데이터가 없습니다.")
 
     hand_label = None
     if batter_hand and "BATTER_HAND" in sub.columns:
@@ -535,7 +586,7 @@ def answer_pitcher_power_hitters(season, pitcher, top_n=3, batter_hand=None):
 
         sub = sub[sub["BATTER_HAND"].isin(codes_to_match)]
         if sub.empty:
-            return f"{season} 시즌 {pitcher}의 {hand_label} 상대 매치업 데이터가 없습니다."
+            return no_data(f"{season} 시즌 {pitcher}의 {hand_label} 상대 매치업 데이터가 없습니다.")
 
     slg_col = "FINAL_ACTUAL_H2H_SLG_PREDICTED"
     obp_col = "FINAL_ACTUAL_H2H_OBP_PREDICTED"
@@ -543,14 +594,14 @@ def answer_pitcher_power_hitters(season, pitcher, top_n=3, batter_hand=None):
 
     for col in [slg_col, obp_col, avg_col]:
         if col not in sub.columns:
-            return f"장타 TOP 매치업을 계산하는 데 필요한 컬럼({col})이 데이터에 없습니다."
+            return missing_column(f"장타 TOP 매치업을 계산하는 데 필요한 컬럼({col})이 데이터에 없습니다.")
 
     sub = sub.sort_values(slg_col, ascending=False).head(top_n)
     if sub.empty:
         if hand_label:
-            return f"{season} 시즌 {pitcher} 상대로 {hand_label} 중 장타를 잘 치는 타자를 찾지 못했습니다."
+            return no_data(f"{season} 시즌 {pitcher} 상대로 {hand_label} 중 장타를 잘 치는 타자를 찾지 못했습니다.")
         else:
-            return f"{season} 시즌 {pitcher} 상대로 장타를 잘 치는 타자를 찾지 못했습니다."
+            return no_data(f"{season} 시즌 {pitcher} 상대로 장타를 잘 치는 타자를 찾지 못했습니다.")
 
     name_col = "BATTER_NAME" if "BATTER_NAME" in sub.columns else "BATTER_ID"
 
@@ -562,20 +613,28 @@ def answer_pitcher_power_hitters(season, pitcher, top_n=3, batter_hand=None):
         title = f"{season} 시즌 {pitcher_dative} 장타를 잘 치는 타자 TOP{top_n}입니다:"
 
     lines = [title]
+    records = []
     for i, r in enumerate(sub.itertuples(), start=1):
         batter = getattr(r, name_col)
+        records.append({
+            "batter": batter,
+            "avg":    num(getattr(r, avg_col)),
+            "obp":    num(getattr(r, obp_col)),
+            "slg":    num(getattr(r, slg_col)),
+        })
         avg = fmt(getattr(r, avg_col), 3)
         obp = fmt(getattr(r, obp_col), 3)
         slg = fmt(getattr(r, slg_col), 3)
         lines.append(
             f"{i}) {batter} - 타율 {avg}, 출루율 {obp}, 장타율 {slg}"
         )
-    return "\n".join(lines)
+    return ok("\n".join(lines), season=season, pitcher=pitcher, batter_hand=batter_hand, records=records)
 
 
 # ============================================
 # 6-4) 득점권에서 약한 타자 TOPN
 # ============================================
+@traced()
 def answer_pitcher_weak_batters_in_risp(season, pitcher, top_n=3):
     """
     {{season}}년 {{pitcher_name}}이 득점권에서 특히 약한 타자 TOPN
@@ -583,33 +642,40 @@ def answer_pitcher_weak_batters_in_risp(season, pitcher, top_n=3):
     df = stats_df
 
     if not pitcher_exists(pitcher):
-        return f"{season} 시즌 해당 투수의 매치업 데이터가 없습니다."
+        return no_data(f"{season} 시즌 해당 투수의 매치업 데이터가 없습니다.")
 
     sub = resolve_pitcher_filter(df, season, pitcher)
     if sub.empty:
-        return f"{season} 시즌 해당 투수의 매치업 데이터가 없습니다."
+        return no_data(f"{season} 시즌 해당 투수의 매치업 데이터가 없습니다.")
 
     col = "FINAL_ACTUAL_H2H_RISP_AVG_PREDICTED"
     if col not in sub.columns:
-        return f"득점권 타율 컬럼({col})이 데이터에 없습니다."
+        return missing_column(f"득점권 타율 컬럼({col})이 데이터에 없습니다.")
 
     sub = sub.sort_values(col, ascending=False).head(top_n)
     name_col = "BATTER_NAME" if "BATTER_NAME" in sub.columns else "BATTER_ID"
 
     lines = [f"{season} 시즌 이 투수가 득점권에서 특히 약한 타자 TOP{top_n}입니다:"]
+    records = []
     for i, r in enumerate(sub.itertuples(), start=1):
         batter = getattr(r, name_col)
+        records.append({
+            "batter":   batter,
+            "risp_avg": num(getattr(r, col)),
+            "avg":      num(getattr(r, "FINAL_H2H_AVG_PREDICTED")),
+        })
         risp = fmt(getattr(r, col), 3)
         avg = fmt(getattr(r, "FINAL_H2H_AVG_PREDICTED"), 3)
         lines.append(
             f"{i}) {batter} - 득점권 타율 {risp}, 전체 매치업 타율 {avg}"
         )
-    return "\n".join(lines)
+    return ok("\n".join(lines), season=season, pitcher=pitcher, records=records)
 
 
 # ============================================
 # 6-5) 장타는 약하지만 출루는 잘 하는 타자
 # ============================================
+@traced()
 def answer_pitcher_low_slg_high_obp_hitters(
     season,
     pitcher,
@@ -624,24 +690,24 @@ def answer_pitcher_low_slg_high_obp_hitters(
     df = stats_df
 
     if not pitcher_exists(pitcher):
-        return f"{season} 시즌 해당 투수의 매치업 데이터가 없습니다."
+        return no_data(f"{season} 시즌 해당 투수의 매치업 데이터가 없습니다.")
 
     sub = resolve_pitcher_filter(df, season, pitcher)
     if sub.empty:
-        return f"{season} 시즌 해당 투수의 매치업 데이터가 없습니다."
+        return no_data(f"{season} 시즌 해당 투수의 매치업 데이터가 없습니다.")
 
     slg_col = "FINAL_ACTUAL_H2H_SLG_PREDICTED"
     obp_col = "FINAL_ACTUAL_H2H_OBP_PREDICTED"
 
     if slg_col not in sub.columns or obp_col not in sub.columns:
-        return "SLG/OBP 컬럼이 데이터에 없습니다."
+        return missing_column("SLG/OBP 컬럼이 데이터에 없습니다.")
 
     slg_cut = sub[slg_col].quantile(slg_quantile)
     obp_cut = sub[obp_col].quantile(obp_quantile)
 
     cand = sub[(sub[slg_col] <= slg_cut) & (sub[obp_col] >= obp_cut)]
     if cand.empty:
-        return (
+        return no_data(
             f"{season} 시즌 이 투수 상대로 '장타는 약하지만 출루는 잘 하는' "
             "타자를 찾지 못했습니다."
         )
@@ -650,25 +716,33 @@ def answer_pitcher_low_slg_high_obp_hitters(
     name_col = "BATTER_NAME" if "BATTER_NAME" in cand.columns else "BATTER_ID"
 
     lines = [f"{season} 시즌 이 투수 상대로 장타력은 약하지만 출루는 잘 하는 타자 예시입니다:"]
+    records = []
     for i, r in enumerate(cand.itertuples(), start=1):
         batter = getattr(r, name_col)
+        records.append({
+            "batter": batter,
+            "avg":    num(getattr(r, "FINAL_H2H_AVG_PREDICTED")),
+            "obp":    num(getattr(r, obp_col)),
+            "slg":    num(getattr(r, slg_col)),
+        })
         avg = fmt(getattr(r, "FINAL_H2H_AVG_PREDICTED"), 3)
         obp = fmt(getattr(r, obp_col), 3)
         slg = fmt(getattr(r, slg_col), 3)
         lines.append(
             f"{i}) {batter} - 타율 {avg}, 출루율 {obp}, 장타율 {slg}"
         )
-    return "\n".join(lines)
+    return ok("\n".join(lines), season=season, pitcher=pitcher, records=records)
 
 
 # ============================================
 # ✨ 신규 추가 1: 출루율 기준 약한 타자
 # ============================================
+@traced()
 def answer_pitcher_weak_batters_by_obp(season, pitcher, top_n=3):
     """
     {{season}}년 {{pitcher_name}} 상대로 출루율이 높은 타자 TOPN
     """
-    print(f"\n🔍 [DEBUG] pitcher_weak_batters_by_obp: season={season}, pitcher={pitcher}, top_n={top_n}")
+    logger.debug("🔍 pitcher_weak_batters_by_obp: season=%s, pitcher=%s, top_n=%s", season, pitcher, top_n)
     
     records, msg = pitcher_rank_batters(
         season, pitcher,
@@ -677,42 +751,43 @@ def answer_pitcher_weak_batters_by_obp(season, pitcher, top_n=3):
         ascending=False,
     )
     if msg:
-        return msg
+        return no_data(msg)
     if not records:
-        return f"{season} 시즌 해당 투수의 매치업 데이터가 없습니다."
+        return no_data(f"{season} 시즌 해당 투수의 매치업 데이터가 없습니다.")
 
     lines = [f"{season} 시즌 출루율 기준으로 해당 투수가 가장 어려워하는 타자 TOP{top_n}입니다:"]
     for i, r in enumerate(records, start=1):
         lines.append(
-            f"{i}) {r['batter']} - 출루율 {r['obp']}, 타율 {r['avg']}, 장타율 {r['slg']}"
+            f"{i}) {r['batter']} - 출루율 {fmt(r['obp'])}, 타율 {fmt(r['avg'])}, 장타율 {fmt(r['slg'])}"
         )
-    return "\n".join(lines)
+    return ok("\n".join(lines), season=season, pitcher=pitcher, records=records)
 
 
 # ============================================
 # ✨ 신규 추가 2: OPS 높은 타자
 # ============================================
+@traced()
 def answer_pitcher_high_ops_batters(season, pitcher, top_n=3):
     """
     {{season}}년 {{pitcher_name}} 상대로 OPS가 가장 높은 타자 TOPN
     OPS = 출루율(OBP) + 장타율(SLG)
     """
-    print(f"\n🔍 [DEBUG] pitcher_high_ops_batters: season={season}, pitcher={pitcher}, top_n={top_n}")
+    logger.debug("🔍 pitcher_high_ops_batters: season=%s, pitcher=%s, top_n=%s", season, pitcher, top_n)
     
     df = stats_df
 
     if not pitcher_exists(pitcher):
-        return f"{season} 시즌 해당 투수의 매치업 데이터가 없습니다."
+        return no_data(f"{season} 시즌 해당 투수의 매치업 데이터가 없습니다.")
 
     sub = resolve_pitcher_filter(df, season, pitcher)
     if sub.empty:
-        return f"{season} 시즌 해당 투수의 매치업 데이터가 없습니다."
+        return no_data(f"{season} 시즌 해당 투수의 매치업 데이터가 없습니다.")
 
     obp_col = "FINAL_ACTUAL_H2H_OBP_PREDICTED"
     slg_col = "FINAL_ACTUAL_H2H_SLG_PREDICTED"
     
     if obp_col not in sub.columns or slg_col not in sub.columns:
-        return "OPS 계산에 필요한 컬럼(OBP, SLG)이 데이터에 없습니다."
+        return missing_column("OPS 계산에 필요한 컬럼(OBP, SLG)이 데이터에 없습니다.")
 
     # OPS 계산
     sub = sub.copy()
@@ -722,15 +797,23 @@ def answer_pitcher_high_ops_batters(season, pitcher, top_n=3):
     sub = sub.sort_values('OPS', ascending=False).head(top_n)
     
     if sub.empty:
-        return f"{season} 시즌 {pitcher} 상대로 OPS 데이터를 찾지 못했습니다."
+        return no_data(f"{season} 시즌 {pitcher} 상대로 OPS 데이터를 찾지 못했습니다.")
 
     name_col = "BATTER_NAME" if "BATTER_NAME" in sub.columns else "BATTER_ID"
     
     pitcher_dative = add_josa(str(pitcher), "에게/에게")
     
     lines = [f"{season} 시즌 {pitcher_dative} OPS가 가장 높은 타자 TOP{top_n}입니다:"]
+    records = []
     for i, r in enumerate(sub.itertuples(), start=1):
         batter = getattr(r, name_col)
+        records.append({
+            "batter": batter,
+            "ops":    num(getattr(r, "OPS")),
+            "avg":    num(getattr(r, "FINAL_H2H_AVG_PREDICTED")),
+            "obp":    num(getattr(r, obp_col)),
+            "slg":    num(getattr(r, slg_col)),
+        })
         avg = fmt(getattr(r, "FINAL_H2H_AVG_PREDICTED"), 3)
         obp = fmt(getattr(r, obp_col), 3)
         slg = fmt(getattr(r, slg_col), 3)
@@ -738,7 +821,7 @@ def answer_pitcher_high_ops_batters(season, pitcher, top_n=3):
         lines.append(
             f"{i}) {batter} - OPS {ops} (타율 {avg}, 출루율 {obp}, 장타율 {slg})"
         )
-    return "\n".join(lines)
+    return ok("\n".join(lines), season=season, pitcher=pitcher, records=records)
 
 
 # ============================================
@@ -750,27 +833,28 @@ def answer_pitcher_high_ops_batters(season, pitcher, top_n=3):
 # ============================================
 # ✨ 신규 추가 4: 득점권 클러치 히터
 # ============================================
+@traced()
 def answer_pitcher_clutch_hitters(season, pitcher, top_n=3):
     """
     {{season}}년 {{pitcher_name}} 상대로 득점권에서 더 강해지는 타자 TOPN
     클러치 히터 = 득점권 타율이 일반 타율보다 높은 타자
     """
-    print(f"\n🔍 [DEBUG] pitcher_clutch_hitters: season={season}, pitcher={pitcher}, top_n={top_n}")
+    logger.debug("🔍 pitcher_clutch_hitters: season=%s, pitcher=%s, top_n=%s", season, pitcher, top_n)
     
     df = stats_df
 
     if not pitcher_exists(pitcher):
-        return f"{season} 시즌 해당 투수의 매치업 데이터가 없습니다."
+        return no_data(f"{season} 시즌 해당 투수의 매치업 데이터가 없습니다.")
 
     sub = resolve_pitcher_filter(df, season, pitcher)
     if sub.empty:
-        return f"{season} 시즌 해당 투수의 매치업 데이터가 없습니다."
+        return no_data(f"{season} 시즌 해당 투수의 매치업 데이터가 없습니다.")
 
     risp_col = "FINAL_ACTUAL_H2H_RISP_AVG_PREDICTED"
     avg_col = "FINAL_H2H_AVG_PREDICTED"
     
     if risp_col not in sub.columns or avg_col not in sub.columns:
-        return "득점권/일반 타율 컬럼이 데이터에 없습니다."
+        return missing_column("득점권/일반 타율 컬럼이 데이터에 없습니다.")
 
     # 득점권 부스트 계산
     sub = sub.copy()
@@ -780,91 +864,109 @@ def answer_pitcher_clutch_hitters(season, pitcher, top_n=3):
     sub = sub.sort_values('RISP_BOOST', ascending=False).head(top_n)
     
     if sub.empty:
-        return f"{season} 시즌 {pitcher} 상대로 클러치 히터를 찾지 못했습니다."
+        return no_data(f"{season} 시즌 {pitcher} 상대로 클러치 히터를 찾지 못했습니다.")
 
     name_col = "BATTER_NAME" if "BATTER_NAME" in sub.columns else "BATTER_ID"
     
     lines = [f"{season} 시즌 이 투수 상대로 득점권에서 더 강해지는 타자 TOP{top_n}입니다:"]
+    records = []
     for i, r in enumerate(sub.itertuples(), start=1):
         batter = getattr(r, name_col)
+        records.append({
+            "batter":     batter,
+            "avg":        num(getattr(r, avg_col)),
+            "risp_avg":   num(getattr(r, risp_col)),
+            "risp_boost": num(getattr(r, "RISP_BOOST")),
+        })
         avg = fmt(getattr(r, avg_col), 3)
         risp = fmt(getattr(r, risp_col), 3)
         boost = fmt(getattr(r, "RISP_BOOST"), 3)
         lines.append(
             f"{i}) {batter} - 평소 타율 {avg}, 득점권 타율 {risp} (+{boost} 상승)"
         )
-    return "\n".join(lines)
+    return ok("\n".join(lines), season=season, pitcher=pitcher, records=records)
 
 
 # ============================================
 # ✨ 신규 추가 5: 특정 구종 잘 던지는 투수 중 타자 매칭
 # ============================================
+
+# ✨ 한글 구종 → CSV 영문 코드 매핑 (PITCHER/BATTER_BEST_PITCH_TYPE 값)
+#    RAG 메타데이터 필터(router.build_rag_filters)에서도 사용
+PITCH_TYPE_CODE_MAP = {
+    # 한글명 → CSV 컬럼값
+    "포심": "4Seam",
+    "포심패스트볼": "4Seam",
+    "투심": "2Seam",
+    "투심패스트볼": "2Seam",
+    "커브": "Curv",
+    "슬라이더": "Slid",
+    "체인지업": "Chan",
+    "체인지": "Chan",
+    "포크볼": "Fork",
+    "포크": "Fork",
+    "커터": "Cut",
+    # 영문도 그대로 통과
+    "4SEAM": "4Seam",
+    "2SEAM": "2Seam",
+    "CHAN": "Chan",
+    "SLID": "Slid",
+    "CURV": "Curv",
+    "FORK": "Fork",
+    "CUT": "Cut",
+}
+
+# CSV 컬럼값 → 안내 문구용 한글명 (맵에서 처음 나오는 한글명)
+PITCH_TYPE_NAME_MAP = {code: name for name, code in reversed(list(PITCH_TYPE_CODE_MAP.items()))}
+
+@traced()
 def answer_batter_vs_pitch_type(season, batter, pitch_type, top_n=3):
     """
     {{season}}년 {{pitch_type}} 잘 던지는 투수들 중 {{batter}}이 잘 치는 투수 TOPN
     """
-    print(f"\n🔍 [DEBUG] batter_vs_pitch_type: season={season}, batter={batter}, pitch_type={pitch_type}, top_n={top_n}")
-    
-    # ✨ 한글 구종 → CSV 영문 코드 매핑
-    PITCH_TYPE_MAPPING = {
-        # 한글명 → CSV 컬럼값
-        "포심": "4Seam",
-        "포심패스트볼": "4Seam",
-        "투심": "2Seam",
-        "투심패스트볼": "2Seam",
-        "커브": "Curv",
-        "슬라이더": "Slid",
-        "체인지업": "Chan",
-        "체인지": "Chan",
-        "포크볼": "Fork",
-        "포크": "Fork",
-        "커터": "Cut",
-        # 영문도 그대로 통과
-        "4SEAM": "4Seam",
-        "2SEAM": "2Seam",
-        "CHAN": "Chan",
-        "SLID": "Slid",
-        "CURV": "Curv",
-        "FORK": "Fork",
-        "CUT": "Cut",
-    }
+    logger.debug("🔍 batter_vs_pitch_type: season=%s, batter=%s, pitch_type=%s, top_n=%s", season, batter, pitch_type, top_n)
     
     df = stats_df
 
     if not batter_exists(batter):
-        return f"{season} 시즌 해당 타자의 매치업 데이터가 없습니다."
+        return no_data(f"{season} 시즌 해당 타자의 매치업 데이터가 없습니다.")
 
     sub = resolve_batter_filter(df, season, batter)
     if sub.empty:
-        return f"{season} 시즌 해당 타자의 매치업 데이터가 없습니다."
-
-    # 🔍 디버그: 이 타자와 매치업되는 투수들의 구종 분포 확인
-    if "PITCHER_BEST_PITCH_TYPE" in sub.columns:
-        pitch_counts = sub["PITCHER_BEST_PITCH_TYPE"].value_counts()
-        print(f"  📊 {batter} 상대 투수들의 구종 분포:")
-        for pitch, count in pitch_counts.items():
-            print(f"     - {pitch}: {count}명")
-    else:
-        return "투수 특기 구종 컬럼(PITCHER_BEST_PITCH_TYPE)이 데이터에 없습니다."
+        return no_data(f"{season} 시즌 해당 타자의 매치업 데이터가 없습니다.")
+
+    if "PITCHER_BEST_PITCH_TYPE" not in sub.columns:
+        return missing_column("투수 특기 구종 컬럼(PITCHER_BEST_PITCH_TYPE)이 데이터에 없습니다.")
+
+    # 이 타자와 매치업되는 투수들의 특기 구종 분포 (데이터 없을 때 안내에도 사용)
+    pitch_counts = sub["PITCHER_BEST_PITCH_TYPE"].value_counts()
+    if debug_enabled(logger):
+        logger.debug(
+            "📊 %s 상대 투수들의 구종 분포: %s",
+            batter, ", ".join(f"{pitch} {count}명" for pitch, count in pitch_counts.items()),
+        )
 
     # 한글 → 영문 변환
-    pitch_code = PITCH_TYPE_MAPPING.get(pitch_type)
+    pitch_code = PITCH_TYPE_CODE_MAP.get(pitch_type)
     
     if not pitch_code:
-        return f"'{pitch_type}' 구종을 인식하지 못했습니다. 지원 구종: 포심, 투심, 커브, 슬라이더, 체인지업, 포크볼, 커터"
+        return unrecognized(f"'{pitch_type}' 구종을 인식하지 못했습니다. 지원 구종: 포심, 투심, 커브, 슬라이더, 체인지업, 포크볼, 커터")
     
-    print(f"  🔄 구종 변환: '{pitch_type}' → '{pitch_code}'")
+    logger.debug("🔄 구종 변환: '%s' → '%s'", pitch_type, pitch_code)
     
     # 변환된 영문 코드로 필터링
-    print(f"  🔍 필터링 전 행 수: {len(sub)}")
+    logger.debug("🔍 필터링 전 행 수: %s", len(sub))
     sub = sub[sub["PITCHER_BEST_PITCH_TYPE"] == pitch_code]
-    print(f"  🔍 필터링 후 행 수: {len(sub)}")
+    logger.debug("🔍 필터링 후 행 수: %s", len(sub))
 
     if sub.empty:
-        return (
-            f"{season} 시즌 {pitch_type}(영문코드: {pitch_code})을(를) 특기로 하는 투수 상대 데이터가 없습니다.\n"
-            f"위의 구종 분포를 참고해서 다른 구종으로 질문해보세요."
+        available = ", ".join(
+            f"{PITCH_TYPE_NAME_MAP.get(pitch, pitch)} {count}명" for pitch, count in pitch_counts.items()
         )
+        text = f"{season} 시즌 {pitch_type}(영문코드: {pitch_code})을(를) 특기로 하는 투수 상대 데이터가 없습니다."
+        if available:
+            text += f"\n{batter} 상대 투수들의 특기 구종: {available}\n이 중 다른 구종으로 질문해보세요."
+        return no_data(text)
 
     # 타율 높은 순
     sub = sub.sort_values("FINAL_H2H_AVG_PREDICTED", ascending=False).head(top_n)
@@ -874,24 +976,32 @@ def answer_batter_vs_pitch_type(season, batter, pitch_type, top_n=3):
     batter_subject = add_josa(batter, "이/가")
     
     lines = [f"{season} 시즌 {pitch_type}을(를) 특기로 하는 투수들 중 {batter_subject} 잘 치는 투수 TOP{top_n}입니다:"]
+    records = []
     for i, r in enumerate(sub.itertuples(), start=1):
         pitcher = getattr(r, name_col)
+        records.append({
+            "pitcher": pitcher,
+            "avg":     num(getattr(r, "FINAL_H2H_AVG_PREDICTED")),
+            "obp":     num(getattr(r, "FINAL_ACTUAL_H2H_OBP_PREDICTED")),
+            "slg":     num(getattr(r, "FINAL_ACTUAL_H2H_SLG_PREDICTED")),
+        })
         avg = fmt(getattr(r, "FINAL_H2H_AVG_PREDICTED"), 3)
         obp = fmt(getattr(r, "FINAL_ACTUAL_H2H_OBP_PREDICTED"), 3)
         slg = fmt(getattr(r, "FINAL_ACTUAL_H2H_SLG_PREDICTED"), 3)
         lines.append(
             f"{i}) {pitcher} - 타율 {avg}, 출루율 {obp}, 장타율 {slg}"
         )
-    return "\n".join(lines)
+    return ok("\n".join(lines), season=season, batter=batter, pitch_type=pitch_type, records=records)
 
 # ============================================
 # ✨ 신규 추가 6: 좌/우투수 기준 타자 약점 분석
 # ============================================
+@traced()
 def answer_batter_vs_pitcher_hand(season, batter, pitcher_hand="좌", top_n=3):
     """
     {{season}}년 좌/우투수 중에서 {{batter}}이 가장 약한 투수 TOPN
     """
-    print(f"\n🔍 [DEBUG] batter_vs_pitcher_hand: season={season}, batter={batter}, pitcher_hand={pitcher_hand}, top_n={top_n}")
+    logger.debug("🔍 batter_vs_pitcher_hand: season=%s, batter=%s, pitcher_hand=%s, top_n=%s", season, batter, pitcher_hand, top_n)
     
     # 좌/우 투수 코드 매칭
     if pitcher_hand in ["좌", "L"]:
@@ -907,20 +1017,20 @@ def answer_batter_vs_pitcher_hand(season, batter, pitcher_hand="좌", top_n=3):
     df = stats_df
 
     if not batter_exists(batter):
-        return f"{season} 시즌 해당 타자의 매치업 데이터가 없습니다."
+        return no_data(f"{season} 시즌 해당 타자의 매치업 데이터가 없습니다.")
 
     sub = resolve_batter_filter(df, season, batter)
     if sub.empty:
-        return f"{season} 시즌 해당 타자의 매치업 데이터가 없습니다."
+        return no_data(f"{season} 시즌 해당 타자의 매치업 데이터가 없습니다.")
 
     # 투수 핸드 필터링
     if "PITCHER_HAND" in sub.columns:
         sub = sub[sub["PITCHER_HAND"].isin(codes_to_match)]
     else:
-        return "투수 핸드 컬럼(PITCHER_HAND)이 데이터에 없습니다."
+        return missing_column("투수 핸드 컬럼(PITCHER_HAND)이 데이터에 없습니다.")
 
     if sub.empty:
-        return f"{season} 시즌 해당 타자의 {hand_label} 상대 매치업 데이터가 없습니다."
+        return no_data(f"{season} 시즌 해당 타자의 {hand_label} 상대 매치업 데이터가 없습니다.")
 
     # 타율 낮은 순 (타자가 약한 = 타율이 낮은)
     sub = sub.sort_values("FINAL_H2H_AVG_PREDICTED", ascending=True).head(top_n)
@@ -930,15 +1040,22 @@ def answer_batter_vs_pitcher_hand(season, batter, pitcher_hand="좌", top_n=3):
     batter_subject = add_josa(batter, "이/가")
 
     lines = [f"{season} 시즌 {hand_label} 중에서 {batter_subject} 가장 약한 투수 TOP{top_n}입니다:"]
+    records = []
     for i, r in enumerate(sub.itertuples(), start=1):
         pitcher = getattr(r, name_col)
+        records.append({
+            "pitcher": pitcher,
+            "avg":     num(getattr(r, "FINAL_H2H_AVG_PREDICTED")),
+            "obp":     num(getattr(r, "FINAL_ACTUAL_H2H_OBP_PREDICTED")),
+            "slg":     num(getattr(r, "FINAL_ACTUAL_H2H_SLG_PREDICTED")),
+        })
         avg = fmt(getattr(r, "FINAL_H2H_AVG_PREDICTED"), 3)
         obp = fmt(getattr(r, "FINAL_ACTUAL_H2H_OBP_PREDICTED"), 3)
         slg = fmt(getattr(r, "FINAL_ACTUAL_H2H_SLG_PREDICTED"), 3)
         lines.append(
             f"{i}) {pitcher} - 타율 {avg}, 출루율 {obp}, 장타율 {slg}"
         )
-    return "\n".join(lines)
+    return ok("\n".join(lines), season=season, batter=batter, pitcher_hand=pitcher_hand, records=records)
 
 
 # ============================================
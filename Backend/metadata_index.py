@@ -0,0 +1,162 @@
+# metadata_index.py
+# ============================================
+# ⚾ 메타데이터 역색인 (시즌/선수/핸드/구종 → FAISS 위치 목록)
+#  - 질문에서 파싱한 조건에 맞는 문서 위치만 골라서
+#    FAISS IDSelector 검색으로 후보 공간을 줄임
+# ============================================
+
+from collections import defaultdict
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+import faiss
+from langchain_core.documents import Document
+
+from vector_index import IndexConfig, search_parameters, supports_selector
+from vector_store_io import fetch_documents, iter_documents
+
+
+# 필터로 쓸 수 있는 메타데이터 키 (rag_system._load_documents_from_csv 기준)
+FILTER_KEYS = (
+    "season",
+    "pitcher",
+    "batter",
+    "pitcher_hand",
+    "batter_hand",
+    "pitcher_pitch_type",
+    "batter_pitch_type",
+)
+
+
+class MetadataIndex:
+    def __init__(self, size: int = 0):
+        self.size = size
+        # key → value(str) → 정렬된 위치 배열
+        self.postings: Dict[str, Dict[str, np.ndarray]] = {}
+
+    @classmethod
+    def from_vectorstore(cls, vectorstore) -> "MetadataIndex":
+        """langchain FAISS 벡터 스토어의 docstore 메타데이터로 역색인 구성"""
+        lists: Dict[str, Dict[str, List[int]]] = {key: defaultdict(list) for key in FILTER_KEYS}
+
+        for position, doc in iter_documents(vectorstore):
+            for key in FILTER_KEYS:
+                value = doc.metadata.get(key)
+                if value is None or value == "":
+                    continue
+                lists[key][str(value)].append(position)
+
+        index = cls(size=len(vectorstore.index_to_docstore_id))
+        index.postings = {
+            key: {value: np.asarray(sorted(pos), dtype="int64") for value, pos in values.items()}
+            for key, values in lists.items()
+        }
+        return index
+
+    def candidates(self, filters: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        """
+        조건에 맞는 위치 배열 반환
+
+        - 같은 키 안의 여러 값(리스트)은 OR, 서로 다른 키는 AND
+        - 적용할 조건이 하나도 없으면 None (= 전체 검색)
+        """
+        result = None
+        for key, value in (filters or {}).items():
+            if key not in self.postings or value is None:
+                continue
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+
+            parts = [self.postings[key].get(str(v)) for v in values]
+            parts = [p for p in parts if p is not None]
+            matched = np.unique(np.concatenate(parts)) if parts else np.empty(0, dtype="int64")
+
+            result = matched if result is None else np.intersect1d(result, matched, assume_unique=True)
+            if result.size == 0:
+                break
+        return result
+
+
+def relaxed_filters(filters: Optional[Dict[str, Any]]):
+    """
+    조건에 맞는 문서가 없을 때 점점 느슨하게 다시 시도할 필터 목록
+
+    전체 → (구종/핸드 제외) → 시즌만 → 필터 없음
+    """
+    filters = {k: v for k, v in (filters or {}).items() if v is not None}
+    yield filters
+
+    names_only = {k: v for k, v in filters.items() if k in ("season", "pitcher", "batter")}
+    if names_only != filters:
+        yield names_only
+
+    season_only = {k: v for k, v in filters.items() if k == "season"}
+    if season_only != names_only:
+        yield season_only
+
+    if season_only:
+        yield {}
+
+
+def search_with_selector(
+    vectorstore,
+    query_vector: List[float],
+    k: int,
+    positions: Optional[np.ndarray] = None,
+    index: Optional[faiss.Index] = None,
+    config: Optional[IndexConfig] = None,
+) -> List[Tuple[int, Document, float]]:
+    """
+    FAISS 검색 (positions가 있으면 그 위치들 안에서만)
+
+    index를 주면 벡터 스토어의 flat 인덱스 대신 그 인덱스(IVF/HNSW 등)로 검색.
+    위치 번호는 벡터 스토어와 같아야 함 (vector_index.build_index)
+
+    Returns:
+        [(위치, Document, L2 거리), ...] 가까운 순
+    """
+    return search_batch_with_selector(vectorstore, [query_vector], k, positions, index, config)[0]
+
+
+def search_batch_with_selector(
+    vectorstore,
+    query_vectors,
+    k: int,
+    positions: Optional[np.ndarray] = None,
+    index: Optional[faiss.Index] = None,
+    config: Optional[IndexConfig] = None,
+) -> List[List[Tuple[int, Document, float]]]:
+    """
+    여러 질의를 n×d 행렬 하나로 FAISS 검색 (같은 후보 위치 / 검색 파라미터 공유)
+
+    문서도 전체 결과 위치를 모아서 한 번에 조회
+
+    Returns:
+        질의별 [(위치, Document, L2 거리), ...]
+    """
+    x = np.ascontiguousarray(query_vectors, dtype="float32")
+    if x.shape[0] == 0:
+        return []
+    index = index if index is not None else vectorstore.index
+
+    selector = None
+    if positions is not None:
+        if positions.size == 0:
+            return [[] for _ in range(x.shape[0])]
+        if not supports_selector(index):
+            # IndexPQ는 IDSelector를 못 받음 → 무시하고 전체 검색하면 필터가 빠진 결과가 나옴
+            raise ValueError(f"{type(index).__name__}는 필터 검색을 지원하지 않습니다 (후보 정확 검색 사용)")
+        k = min(k, int(positions.size))
+        selector = faiss.IDSelectorBatch(positions)
+
+    params = search_parameters(index, config, selector)
+    if params is not None:
+        distances, indices = index.search(x, k, params=params)
+    else:
+        distances, indices = index.search(x, k)
+
+    rows = [
+        [(int(p), float(d)) for p, d in zip(row_indices, row_distances) if p != -1]
+        for row_indices, row_distances in zip(indices, distances)
+    ]
+    docs = fetch_documents(vectorstore, {p for row in rows for p, _ in row})
+    return [[(p, docs[p], d) for p, d in row if p in docs] for row in rows]
@@ -0,0 +1,279 @@
+# metrics.py
+# ============================================
+# ⚾ Prometheus 형식 지표 (/metrics)
+#  - 기록은 스레드마다 자기 dict에만 씀 (락 없음, 더하기 한 번) → 운영에서 켜둬도 부담 없음
+#    스레드가 처음 기록할 때만 목록 등록용 락, 합치기는 /metrics 요청 때만
+#  - 카운터 / 히스토그램 두 종류, 이름과 버킷은 아래 METRICS에 모아서 선언
+#  - 워커가 여러 개면(gunicorn) METRICS_DIR에 워커별 스냅샷을 주기적으로 써서
+#    어느 워커가 /metrics를 받아도 전체 합계를 응답
+# ============================================
+
+import os
+import json
+import time
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from logging_setup import get_logger
+
+logger = get_logger("metrics")
+
+
+# 초 단위 지연시간 버킷 (규칙 엔진 ms ~ LLM 수십 초)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# 이름 → (종류, 설명, 버킷)
+METRICS: Dict[str, Tuple[str, str, Tuple[float, ...]]] = {
+    "kbo_http_requests_total": ("counter", "HTTP 요청 수 (endpoint, method, status)", ()),
+    "kbo_http_request_duration_seconds": ("histogram", "HTTP 요청 처리 시간 (endpoint)", LATENCY_BUCKETS),
+    "kbo_chat_answers_total": ("counter", "챗봇 답변 수 (intent, source)", ()),
+    "kbo_chat_duration_seconds": ("histogram", "하이브리드 엔진 처리 시간 (intent, source)", LATENCY_BUCKETS),
+    "kbo_stage_duration_seconds": (
+        "histogram", "단계별 처리 시간 (stage=rule / retrieval / embedding / llm)", LATENCY_BUCKETS
+    ),
+    "kbo_cache_requests_total": (
+        "counter", "캐시 조회 수 (cache=semantic / completion / query_embedding, result=hit / miss)", ()
+    ),
+    "kbo_llm_tokens_total": ("counter", "LLM 호출 토큰 수 (model, kind=prompt / completion)", ()),
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._local = threading.local()
+        self._shards: List[Tuple[threading.Thread, Dict[Tuple[str, Labels], Any]]] = []
+        # 끝난 스레드(스레드 풀이 줄어들 때 등)의 값은 여기로 합쳐서 목록이 계속 늘지 않게
+        self._retired: Dict[Tuple[str, Labels], Any] = {}
+        self._shards_lock = threading.Lock()
+
+    def _shard(self) -> Dict[Tuple[str, Labels], Any]:
+        shard = getattr(self._local, "values", None)
+        if shard is None:
+            shard = self._local.values = {}
+            with self._shards_lock:
+                self._shards.append((threading.current_thread(), shard))
+        return shard
+
+    def inc(self, name: str, amount: float = 1.0, **labels: Any):
+        key = (name, tuple((k, str(v)) for k, v in labels.items()))
+        shard = self._shard()
+        shard[key] = shard.get(key, 0.0) + amount
+
+    def observe(self, name: str, value: float, **labels: Any):
+        """히스토그램 기록: [버킷별 개수..., +Inf 개수, 합계]"""
+        buckets = METRICS[name][2]
+        key = (name, tuple((k, str(v)) for k, v in labels.items()))
+        shard = self._shard()
+        hist = shard.get(key)
+        if hist is None:
+            hist = shard[key] = [0] * (len(buckets) + 1) + [0.0]
+        hist[bisect_left(buckets, value)] += 1
+        hist[-1] += value
+
+    @contextmanager
+    def timer(self, name: str, **labels: Any) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def collect(self) -> Dict[Tuple[str, Labels], Any]:
+        """모든 스레드 값 합치기 (dict.copy()는 GIL 안에서 한 번에 끝남)"""
+        with self._shards_lock:
+            for thread, shard in self._shards:
+                if not thread.is_alive():
+                    _merge(self._retired, shard)
+            self._shards = [(thread, shard) for thread, shard in self._shards if thread.is_alive()]
+            shards = [shard for _, shard in self._shards]
+            merged: Dict[Tuple[str, Labels], Any] = {}
+            _merge(merged, self._retired)
+        for shard in shards:
+            _merge(merged, shard.copy())
+        return merged
+
+
+def _merge(into: Dict[Tuple[str, Labels], Any], values: Dict[Tuple[str, Labels], Any]):
+    for key, value in values.items():
+        if isinstance(value, list):
+            current = into.get(key)
+            into[key] = [a + b for a, b in zip(current, value)] if current else list(value)
+        else:
+            into[key] = into.get(key, 0.0) + value
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def render(values: Dict[Tuple[str, Labels], Any]) -> str:
+    """Prometheus 텍스트 형식 (0.0.4)"""
+    by_name: Dict[str, List[Tuple[Labels, Any]]] = {}
+    for (name, labels), value in values.items():
+        by_name.setdefault(name, []).append((labels, value))
+
+    lines = []
+    for name, (kind, help_text, buckets) in METRICS.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in sorted(by_name.get(name, [])):
+            if kind == "counter":
+                lines.append(f"{name}{_format_labels(labels)} {value:g}")
+                continue
+            cumulative = 0
+            for bound, count in zip(list(buckets) + ["+Inf"], value[:-1]):
+                cumulative += count
+                le = bound if isinstance(bound, str) else f"{bound:g}"
+                lines.append(f"{name}_bucket{_format_labels(labels, ('le', le))} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {value[-1]:.6f}")
+            lines.append(f"{name}_count{_format_labels(labels)} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+class MultiprocessSnapshots:
+    """
+    워커별 스냅샷 파일 (METRICS_DIR/metrics-<pid>.json)
+
+    죽은 워커의 파일도 남겨둬서 카운터가 줄어들지 않음 (마스터 시작 시 clear_snapshots로 비움)
+    """
+
+    def __init__(self, directory: str, registry: MetricsRegistry, flush_seconds: float = 5.0):
+        self.directory = directory
+        self.registry = registry
+        self.flush_seconds = flush_seconds
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+
+    def _path(self, pid: int) -> str:
+        return os.path.join(self.directory, f"metrics-{pid}.json")
+
+    def flush(self):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(os.getpid())
+        tmp_path = f"{path}.tmp"
+        rows = [[name, list(labels), value] for (name, labels), value in self.registry.collect().items()]
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(rows, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def start(self):
+        """워커(fork 후)마다 한 번, 주기적으로 스냅샷 기록"""
+        if self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+
+        def run():
+            while True:
+                time.sleep(self.flush_seconds)
+                try:
+                    self.flush()
+                except OSError as e:
+                    logger.warning("⚠️ 지표 스냅샷 기록 실패: %s", e)
+
+        self._thread = threading.Thread(target=run, name="metrics-snapshot", daemon=True)
+        self._thread.start()
+
+    def collect_all(self) -> Dict[Tuple[str, Labels], Any]:
+        """다른 워커 스냅샷 + 이 워커의 현재 값"""
+        merged = self.registry.collect()
+        own = os.path.basename(self._path(os.getpid()))
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return merged
+        for file_name in names:
+            if file_name == own or not (file_name.startswith("metrics-") and file_name.endswith(".json")):
+                continue
+            try:
+                with open(os.path.join(self.directory, file_name), encoding="utf-8") as f:
+                    rows = json.load(f)
+            except (OSError, ValueError):
+                continue
+            _merge(merged, {(name, tuple(tuple(pair) for pair in labels)): value for name, labels, value in rows})
+        return merged
+
+
+def clear_snapshots(directory: str):
+    """이전 실행의 스냅샷 삭제 (gunicorn 마스터 시작 시)"""
+    if not os.path.isdir(directory):
+        return
+    for file_name in os.listdir(directory):
+        if file_name.startswith("metrics-"):
+            try:
+                os.remove(os.path.join(directory, file_name))
+            except OSError:
+                pass
+
+
+_registry = MetricsRegistry()
+_snapshots: Optional[MultiprocessSnapshots] = None
+_enabled = os.getenv("METRICS_ENABLED", "1") != "0"
+
+
+def inc(name: str, amount: float = 1.0, **labels: Any):
+    if _enabled:
+        _registry.inc(name, amount, **labels)
+
+
+def observe(name: str, value: float, **labels: Any):
+    if _enabled:
+        _registry.observe(name, value, **labels)
+
+
+@contextmanager
+def timer(name: str, **labels: Any) -> Iterator[None]:
+    if not _enabled:
+        yield
+        return
+    with _registry.timer(name, **labels):
+        yield
+
+
+def count_cache(cache: str, hit: bool):
+    inc("kbo_cache_requests_total", cache=cache, result="hit" if hit else "miss")
+
+
+def start_multiprocess():
+    """METRICS_DIR가 있으면 워커별 스냅샷 기록 시작 (앱 startup에서 호출)"""
+    global _snapshots
+    directory = os.getenv("METRICS_DIR")
+    if not _enabled or not directory:
+        return
+    if _snapshots is None:
+        _snapshots = MultiprocessSnapshots(
+            directory, _registry, float(os.getenv("METRICS_FLUSH_SECONDS", "5"))
+        )
+    _snapshots.start()
+
+
+def render_latest() -> str:
+    """/metrics 응답 본문"""
+    values = _snapshots.collect_all() if _snapshots else _registry.collect()
+    return render(values)
+
+
+# 테스트 코드
+if __name__ == "__main__":
+    from concurrent.futures import ThreadPoolExecutor
+
+    def work(i: int):
+        inc("kbo_chat_answers_total", intent="matchup", source="rule" if i % 3 else "rag")
+        observe("kbo_stage_duration_seconds", 0.003 * (i % 10), stage="rule")
+        count_cache("semantic", i % 2 == 0)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(work, range(100000)))
+    print(f"기록 30만 건: {time.perf_counter() - started:.2f}초")
+    print(render_latest())
@@ -0,0 +1,132 @@
+# model_policy.py
+# ============================================
+# ⚾ RAG 답변 생성 모델 선택 (작은 모델 / 큰 모델)
+#  - 작은 모델: 짧고, 대상이 하나(투수 1 + 타자 1 매치업까지)이고,
+#               검색된 1위 문서가 질문의 조건/선수와 정확히 맞는 단순 조회
+#  - 큰 모델: 여러 선수 / 비교·순위·이유 질문 / 검색 신뢰도가 낮은 경우
+#  - 선택 결과와 이유는 debug_info["generation"]에 기록
+# ============================================
+
+import os
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from langchain_core.documents import Document
+
+from context_packer import metadata_match_count
+
+
+# 비교 / 순위 / 이유 질문 ('김광현 vs 최정' 같은 매치업 한 건은 비교로 보지 않음)
+COMPARATIVE_PATTERN = re.compile(
+    r"비교|대비|차이|누가 더|어느 쪽|중에 누가|중 누가|보다 (?:잘|더|못)|순위|랭킹|가장|제일|최고|왜|이유|전략|추천"
+)
+
+_NAME_KEYS = ("pitcher", "batter")
+
+
+@dataclass
+class ModelTierConfig:
+    enabled: bool = True
+    large_model: str = "gpt-4"
+    small_model: str = "gpt-4o-mini"
+    max_question_chars: int = 40   # 이보다 길면 큰 모델
+    max_entities: int = 2          # 질문에 나온 선수 수 (매치업 한 건 = 2명)
+
+    @classmethod
+    def from_env(cls) -> "ModelTierConfig":
+        """환경 변수 설정으로 모델 선택 설정 생성"""
+        return cls(
+            enabled=os.getenv("MODEL_TIERING_ENABLED", "1") != "0",
+            large_model=os.getenv("RAG_LLM_MODEL", "gpt-4"),
+            small_model=os.getenv("RAG_SMALL_LLM_MODEL", "gpt-4o-mini"),
+            max_question_chars=int(os.getenv("SMALL_MODEL_MAX_QUESTION_CHARS", "40")),
+            max_entities=int(os.getenv("SMALL_MODEL_MAX_ENTITIES", "2")),
+        )
+
+
+def mentioned_players(question: str, docs: List[Document], filters: Optional[Dict[str, Any]] = None) -> List[str]:
+    """질문에 이름이 나온 선수 (필터의 선수 + 검색된 문서 메타데이터 중 질문에 있는 이름)"""
+    names = []
+    for key in _NAME_KEYS:
+        value = (filters or {}).get(key)
+        values = value if isinstance(value, (list, tuple, set)) else [value]
+        names.extend(str(v) for v in values if v)
+    for doc in docs:
+        for key in _NAME_KEYS:
+            name = str(doc.metadata.get(key) or "")
+            if len(name) >= 2 and name in question:
+                names.append(name)
+    return list(dict.fromkeys(names))
+
+
+class ModelTierPolicy:
+    def __init__(self, config: Optional[ModelTierConfig] = None):
+        self.config = config or ModelTierConfig()
+
+    def choose(
+        self,
+        question: str,
+        filters: Optional[Dict[str, Any]],
+        docs: List[Document],
+    ) -> Dict[str, Any]:
+        """
+        답변 생성 모델 선택
+
+        Returns:
+            {"tier": "small" | "large", "model": 모델 이름, "reasons": [이유...], "entities": [선수...]}
+        """
+        c = self.config
+        entities = mentioned_players(question, docs, filters)
+        if not c.enabled:
+            return {"tier": "large", "model": c.large_model, "reasons": ["모델 선택 꺼짐"], "entities": entities}
+
+        reasons = []
+        if len(question.strip()) > c.max_question_chars:
+            reasons.append(f"긴 질문 ({len(question.strip())}자)")
+        if COMPARATIVE_PATTERN.search(question):
+            reasons.append("비교/순위/이유 질문")
+        if len(entities) > c.max_entities:
+            reasons.append(f"선수 {len(entities)}명 언급")
+        if any(isinstance((filters or {}).get(key), (list, tuple, set)) for key in ("season", *_NAME_KEYS)):
+            reasons.append("여러 시즌/선수 조건")
+        if not self._confident(docs, filters, entities):
+            reasons.append("검색 신뢰도 낮음")
+
+        if reasons:
+            return {"tier": "large", "model": c.large_model, "reasons": reasons, "entities": entities}
+        return {
+            "tier": "small",
+            "model": c.small_model,
+            "reasons": ["짧은 단일 대상 질문, 1위 문서가 조건과 일치"],
+            "entities": entities,
+        }
+
+    @staticmethod
+    def _confident(docs: List[Document], filters: Optional[Dict[str, Any]], entities: List[str]) -> bool:
+        """1위 문서가 질문 조건을 전부 만족하고 질문에 나온 선수를 포함하는지"""
+        if not docs or not entities:
+            return False
+        top = docs[0]
+        active = {k: v for k, v in (filters or {}).items() if v is not None}
+        if metadata_match_count(top, active) < len(active):
+            return False
+        top_names = {str(top.metadata.get(key) or "") for key in _NAME_KEYS}
+        return all(name in top_names for name in entities)
+
+
+def create_model_policy() -> ModelTierPolicy:
+    """환경 변수 설정으로 모델 선택 정책 생성"""
+    return ModelTierPolicy(ModelTierConfig.from_env())
+
+
+# 테스트 코드
+if __name__ == "__main__":
+    docs = [Document(page_content="김광현 vs 최정 2024", metadata={"season": 2024, "pitcher": "김광현", "batter": "최정"})]
+    policy = ModelTierPolicy()
+    for q, f in [
+        ("2024년 김광현과 최정의 매치업은?", {"season": 2024, "pitcher": "김광현", "batter": "최정"}),
+        ("김광현과 양현종 중 누가 최정을 더 잘 잡아?", {"batter": "최정"}),
+        ("체인지업을 잘 던지는 투수는 누가 있어?", {}),
+    ]:
+        print(q, policy.choose(q, f, docs))
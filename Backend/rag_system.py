@@ -4,17 +4,47 @@
 # ============================================
 
 import os
+import json
+import time
+import shutil
+import hashlib
+import threading
+import numpy as np
 import pandas as pd
-from typing import List, Dict
+from collections import defaultdict
+from typing import List, Dict, Tuple, Any, Optional, Iterator, Set
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_community.vectorstores import FAISS
-from langchain_openai import OpenAIEmbeddings, ChatOpenAI
 from langchain_core.documents import Document
 from langchain_core.prompts import PromptTemplate
 from dotenv import load_dotenv
 
+from semantic_cache import create_semantic_cache
+from llm_cache import create_completion_cache
+from embedding_cache import wrap_with_cache
+from embedding_backends import create_embeddings, embedding_identity
+from llm_backends import create_llm
+from resilience import CircuitOpenError, with_embedding_resilience, with_llm_resilience
+from model_policy import create_model_policy
+from chunk_store import ChunkEmbeddingStore, text_hash
+from embedding_pipeline import create_embedding_pipeline
+from metadata_index import relaxed_filters
+from lexical_index import reciprocal_rank_fusion
+from vector_store_io import has_vector_store, is_legacy_store
+from vector_index import IndexConfig
+from context_packer import create_context_packer
+from reranker import create_reranker
+import metrics
+import tracing
+from logging_setup import get_logger
+from vector_shard import VectorShard, ALL_SHARD, shard_name_for_season, is_season_shard, link_shard_files
+from store_manifest import (
+    GENERATION_PREFIX, ChunkSetDigest, RebuildLock, csv_fingerprint, new_generation_name, read_manifest, write_manifest
+)
+
 load_dotenv()
 
+logger = get_logger("rag_system")
+
 class RAGSystem:
     def __init__(self, csv_path: str, vector_store_path: str = None):
         """
@@ -26,133 +56,923 @@ class RAGSystem:
         """
         self.csv_path = csv_path
         self.vector_store_path = vector_store_path
-        self.embeddings = OpenAIEmbeddings(
-            openai_api_key=os.getenv("OPENAI_API_KEY")
-        )
-        self.llm = ChatOpenAI(
-            model="gpt-4",
-            temperature=0.3,
-            openai_api_key=os.getenv("OPENAI_API_KEY")
+        # 임베딩 백엔드 (EMBEDDING_BACKEND=openai / hashing)
+        # 질의 임베딩 캐시로 감싸서 query / search_similar_documents 모두 재사용
+        # 질의 경로는 재시도 + 회로 차단기(resilience), 인덱스 구축은 파이프라인 자체 백오프
+        self.document_embeddings = create_embeddings()
+        self.embeddings = wrap_with_cache(with_embedding_resilience(self.document_embeddings))
+        # LLM 백엔드 (LLM_BACKEND=openai / local, local은 부하 테스트용 대체 구현)
+        # 단순 조회는 작은 모델, 여러 선수/비교 질문은 큰 모델 (model_policy)
+        self.model_policy = create_model_policy()
+        self.llm = with_llm_resilience(create_llm(model=self.model_policy.config.large_model, temperature=0.3))
+        self.small_llm = (
+            with_llm_resilience(create_llm(model=self.model_policy.config.small_model, temperature=0.3))
+            if self.model_policy.config.enabled else None
         )
-        self.vectorstore = None
-        self.retriever = None
+        
+        # 시즌별 샤드 (샤드 이름 → VectorShard), 검색 시 질문의 시즌으로 샤드 선택
+        self.shards: Dict[str, VectorShard] = {}
+        self.shard_by_season = os.getenv("RAG_SHARD_BY_SEASON", "1") != "0"
+        # 시즌 없는 질문용 전체 샤드 (메모리 2배, 끄면 시즌 샤드 전부 검색 후 병합)
+        self.keep_all_shard = os.getenv("RAG_ALL_SHARD", "0") != "0"
+        self._retriever_ready = False
+        
+        # 저장 구조: vector_store_path/manifest.json → 현재 세대 디렉터리(gen-...)/샤드들
+        self.manifest: Dict[str, Any] = {}
+        self.store_dir = vector_store_path
+        
+        # 재구축은 백그라운드 스레드에서 (그동안 기존 인덱스로 응답, 다 만들면 교체)
+        # 0이면 시작할 때 동기로 구축 (개발/스크립트용)
+        self.background_rebuild = os.getenv("RAG_BACKGROUND_REBUILD", "1") != "0"
+        self.store_poll_seconds = float(os.getenv("RAG_STORE_POLL_SECONDS", "60"))
+        self.rebuild_lock_ttl = float(os.getenv("RAG_REBUILD_LOCK_TTL", "3600"))
+        self.rebuild_status: Dict[str, Any] = {"state": "idle"}
+        self._rebuild_mutex = threading.RLock()
+        self._ready = threading.Event()
+        self._maintenance_thread: Optional[threading.Thread] = None
+        
+        # CSV 스트리밍 수집 설정 (행 묶음 크기 / 임베딩 단계로 넘길 청크 묶음 크기)
+        self.csv_chunk_rows = int(os.getenv("INGEST_CSV_CHUNK_ROWS", "5000"))
+        self.ingest_batch_size = int(os.getenv("INGEST_BATCH_SIZE", "2000"))
+        self.chunk_size = 500
+        
+        # 검색용 FAISS 인덱스 종류 (flat / ivf_flat / hnsw / ivf_pq / sq8 / pq)
+        self.index_config = IndexConfig.from_env()
+        
+        # 저장된 인덱스를 memory-map으로 열기 (워커끼리 페이지 캐시 공유)
+        self.vector_store_mmap = os.getenv("VECTOR_STORE_MMAP", "1") != "0"
+        
+        # 하이브리드(BM25 + 벡터) 검색 설정
+        self.hybrid_search = os.getenv("HYBRID_SEARCH_ENABLED", "1") != "0"
+        self.rrf_k = int(os.getenv("RRF_K", "60"))
+        
+        # 청크 임베딩 저장소 (바뀌지 않은 청크는 재임베딩하지 않음)
+        self.chunk_store = None
+        if vector_store_path:
+            chunk_store_path = os.getenv(
+                "CHUNK_EMBEDDING_STORE_PATH",
+                os.path.join(os.path.dirname(vector_store_path) or ".", "chunk_embeddings.sqlite")
+            )
+            self.chunk_store = ChunkEmbeddingStore(chunk_store_path, self.embeddings.model_name)
         
         # 벡터 스토어 초기화
         self._initialize_vectorstore()
+        
+        # 시맨틱 답변 캐시 (원본 CSV 버전이 바뀌면 무효화)
+        self.semantic_cache = create_semantic_cache(self._data_version())
+        
+        # LLM 응답 디스크 캐시 (프롬프트 해시 기준, 재시작 후에도 유지)
+        self.completion_cache = create_completion_cache()
+        
+        # 토큰 예산 기준 컨텍스트 조립 (중복 청크 제거 + 조건 일치 청크 우선)
+        self.context_packer = create_context_packer(self.llm.model_name)
+        
+        # 로컬 재정렬 (후보를 넉넉히 뽑아 메타데이터/어휘/최신성으로 다시 점수, 요청마다 켜고 끌 수 있음)
+        self.reranker = create_reranker()
+        
+        # 재구축 감시 스레드 (원본 변경 감지 / 다른 워커가 만든 새 세대 로드)
+        if self.background_rebuild and self.vector_store_path:
+            self._start_store_maintenance()
     
-    def _load_documents_from_csv(self) -> List[Document]:
-        """CSV에서 문서 로드"""
-        print(f"📂 CSV 로드 중: {self.csv_path}")
+    def _data_version(self) -> str:
+        """
+        현재 서빙 중인 인덱스의 데이터 버전 문자열 (세대 + 갱신 횟수 + CSV 해시)
+        
+        CSV가 바뀌어도 새 인덱스로 교체되기 전까지는 같은 버전 → 교체 시점에 캐시 무효화
+        """
+        if self.manifest.get("csv"):
+            return "{}:{}:{}".format(
+                self.manifest.get("generation") or "",
+                self.manifest.get("revision", 0),
+                self.manifest["csv"].get("sha256", "")[:16]
+            )
+        try:
+            st = os.stat(self.csv_path)
+        except OSError:
+            return ""
+        return f"{st.st_size}-{st.st_mtime_ns}"
+    
+    # CSV 컬럼 → 메타데이터 키 (문자열 컬럼)
+    _METADATA_COLUMNS = {
+        "pitcher": "PITCHER_NAME",
+        "batter": "BATTER_NAME",
+        "pitcher_hand": "PITCHER_HAND",
+        "batter_hand": "BATTER_HAND",
+        "pitcher_pitch_type": "PITCHER_BEST_PITCH_TYPE",
+        "batter_pitch_type": "BATTER_BEST_PITCH_TYPE",
+    }
+    
+    def _iter_documents_from_csv(self) -> Iterator[Document]:
+        """
+        CSV에서 문서를 행 묶음 단위로 읽어서 하나씩 생성 (전체를 메모리에 올리지 않음)
         
-        df = pd.read_csv(self.csv_path, encoding="utf-8-sig")
-        print(f"✅ 로드 완료: {len(df)} 행")
+        메타데이터는 묶음마다 컬럼 단위로 변환 (iterrows 대신)
+        """
+        logger.info("📂 CSV 로드 중: %s (묶음 %s행)", self.csv_path, self.csv_chunk_rows)
         
-        documents = []
-        for idx, row in df.iterrows():
+        total = 0
+        for frame in pd.read_csv(self.csv_path, encoding="utf-8-sig", chunksize=self.csv_chunk_rows):
+            n = len(frame)
+            
+            def text_column(name: str) -> List[str]:
+                if name not in frame:
+                    return [""] * n
+                return frame[name].fillna("").astype(str).tolist()
+            
             # DOC_TEXT를 content로
-            content = str(row.get("DOC_TEXT", ""))
-            
-            # 메타데이터 구성
-            metadata = {
-                "season": int(row.get("SEASON_ID", 0)),
-                "pitcher": str(row.get("PITCHER_NAME", "")),
-                "batter": str(row.get("BATTER_NAME", "")),
-                "pitcher_hand": str(row.get("PITCHER_HAND", "")),
-                "batter_hand": str(row.get("BATTER_HAND", "")),
-                "pitcher_pitch_type": str(row.get("PITCHER_BEST_PITCH_TYPE", "")),
-                "batter_pitch_type": str(row.get("BATTER_BEST_PITCH_TYPE", "")),
-                "row_id": idx
-            }
+            contents = text_column("DOC_TEXT")
+            seasons = (
+                pd.to_numeric(frame["SEASON_ID"], errors="coerce").fillna(0).astype(int).tolist()
+                if "SEASON_ID" in frame else [0] * n
+            )
+            columns = {key: text_column(col) for key, col in self._METADATA_COLUMNS.items()}
             
-            doc = Document(page_content=content, metadata=metadata)
-            documents.append(doc)
-        
-        return documents
+            for i, row_id in enumerate(frame.index.tolist()):
+                metadata = {"season": seasons[i]}
+                metadata.update({key: values[i] for key, values in columns.items()})
+                metadata["row_id"] = row_id
+                yield Document(page_content=contents[i], metadata=metadata)
+            
+            total += n
+        logger.info("✅ 로드 완료: %s 행", total)
     
     def _initialize_vectorstore(self):
-        """벡터 스토어 초기화 (저장된 것 로드 or 새로 생성)"""
+        """
+        벡터 스토어 초기화
+        
+        매니페스트가 가리키는 현재 세대의 샤드를 로드해서 바로 사용.
+        원본 CSV 지문 / 임베딩 모델 / 샤드 구성이 달라졌거나 저장된 인덱스가 없으면 다시 구성하는데,
+        백그라운드 모드(기본)에서는 시작을 막지 않고 재구축 스레드에 맡김 (그동안 기존 인덱스로 응답)
+        """
+        if self.vector_store_path:
+            self.manifest = read_manifest(self.vector_store_path)
+            self.store_dir = self._generation_dir(self.manifest.get("generation"))
+        
+        # 임베딩 백엔드/모델이 바뀌면 기존 벡터는 쓸 수 없음 (질의 벡터와 공간이 다름)
+        if self.manifest and self._embedding_changed(self.manifest):
+            logger.warning("⚠️ 임베딩 백엔드 변경 (%s → %s), 기존 인덱스 사용 안 함", self.manifest.get('embedding_model'), self._embedding_model())
+        else:
+            self.shards = self._load_shards(self.store_dir)
+            if self.shards:
+                self._setup_retriever()
         
-        # 기존 벡터 스토어가 있으면 로드
-        if self.vector_store_path and os.path.exists(self.vector_store_path):
-            print(f"📦 기존 벡터 스토어 로드 중: {self.vector_store_path}")
+        if self.background_rebuild and self.vector_store_path:
+            if not self.shards:
+                logger.info("🕒 사용할 벡터 스토어가 없어 백그라운드에서 구성합니다 (완료 전까지 RAG 응답 불가)")
+            return
+        
+        reason = self._stale_reason() if self.shards else "저장된 벡터 스토어 없음"
+        if reason:
+            logger.info("🆕 벡터 스토어 구성: %s", reason)
+            self._rebuild_generation()
+    
+    def _wants_shard(self, name: str) -> bool:
+        """현재 설정에서 쓰는 샤드인지 (시즌 샤드 / 전체 샤드)"""
+        if name == ALL_SHARD:
+            return self.keep_all_shard or not self.shard_by_season
+        return self.shard_by_season and is_season_shard(name)
+    
+    def _generation_dir(self, generation: Optional[str]) -> Optional[str]:
+        """세대 이름 → 디렉터리 (세대가 없으면 예전처럼 vector_store_path 바로 아래 샤드)"""
+        if not self.vector_store_path:
+            return None
+        return os.path.join(self.vector_store_path, generation) if generation else self.vector_store_path
+    
+    def _new_shard(self, name: str, base_dir: Optional[str] = None) -> VectorShard:
+        base_dir = base_dir or self.store_dir
+        path = os.path.join(base_dir, name) if base_dir else None
+        return VectorShard(
+            name,
+            path,
+            self.embeddings,
+            self._embed_chunks,
+            self.index_config,
+            hybrid_search=self.hybrid_search,
+            mmap=self.vector_store_mmap
+        )
+    
+    def _load_shards(self, base_dir: Optional[str]) -> Dict[str, VectorShard]:
+        """저장된 샤드 디렉터리 로드 (하나라도 실패하면 빈 dict → 전체를 새로 구성)"""
+        if not base_dir or not os.path.isdir(base_dir):
+            return {}
+        
+        shards: Dict[str, VectorShard] = {}
+        for name in sorted(os.listdir(base_dir)):
+            path = os.path.join(base_dir, name)
+            if not self._wants_shard(name) or not has_vector_store(path):
+                continue
+            shard = self._new_shard(name, base_dir)
             try:
-                self.vectorstore = FAISS.load_local(
-                    self.vector_store_path,
-                    self.embeddings,
-                    allow_dangerous_deserialization=True
-                )
-                print("✅ 벡터 스토어 로드 완료")
+                shard.load()
             except Exception as e:
-                print(f"⚠️ 벡터 스토어 로드 실패: {e}")
-                print("🔄 새로 생성합니다...")
-                self._create_new_vectorstore()
-        else:
-            print("🆕 새 벡터 스토어 생성 중...")
-            self._create_new_vectorstore()
+                logger.warning("⚠️ 샤드 로드 실패 (%s): %s", name, e)
+                return {}
+            shards[name] = shard
+        
+        if not shards:
+            if is_legacy_store(base_dir):
+                # 예전 pickle(index.pkl) 형식은 읽지 않음 → 청크 임베딩 저장소로 다시 구성
+                logger.warning("⚠️ 이전 pickle 형식 벡터 스토어는 사용하지 않습니다. 샤드로 다시 구성합니다.")
+            return {}
+        logger.info("📦 벡터 스토어 샤드 로드 완료: %s (mmap: %s)", ', '.join(shards), self.vector_store_mmap)
+        return shards
+    
+    # ----------------------------------------
+    # 매니페스트 / 백그라운드 재구축
+    # ----------------------------------------
+    def _embedding_model(self) -> str:
+        return getattr(self.embeddings, "model_name", "") or ""
+    
+    def _embedding_changed(self, manifest: Dict[str, Any]) -> bool:
+        """매니페스트의 임베딩 백엔드 정보가 현재 설정과 다른지 (백엔드 정보가 없던 매니페스트는 모델 이름만)"""
+        recorded = manifest.get("embedding_backend") or {"model": manifest.get("embedding_model")}
+        current = embedding_identity(self.embeddings)
+        return any(recorded.get(key) != current.get(key) for key in recorded)
+    
+    def _sharding(self) -> Dict[str, bool]:
+        return {"by_season": self.shard_by_season, "all": self._wants_shard(ALL_SHARD)}
+    
+    def _manifest_for(
+        self,
+        generation: Optional[str],
+        fingerprint: Optional[Dict[str, Any]],
+        shards: Dict[str, VectorShard],
+        digests: Optional[Dict[str, str]] = None,
+        revision: int = 0
+    ) -> Dict[str, Any]:
+        return {
+            "generation": generation,
+            "revision": revision,
+            "csv": fingerprint,
+            "embedding_model": self._embedding_model(),
+            "embedding_backend": embedding_identity(self.embeddings),
+            "sharding": self._sharding(),
+            "search_index": self.index_config.build_signature(),
+            "shards": {name: shard.size for name, shard in shards.items()},
+            # 샤드별 청크 ID 지문 → 원본 CSV가 바뀌면 지문이 달라진 샤드만 다시 구성
+            "shard_digests": {name: digests[name] for name in shards if digests and name in digests},
+            "built_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+    
+    def _commit_manifest(self, manifest: Dict[str, Any]):
+        """manifest.json 교체 = 커밋 지점 (중간에 죽으면 이전 세대가 그대로 현재 세대)"""
+        if self.vector_store_path:
+            write_manifest(self.vector_store_path, manifest)
+        self.manifest = manifest
+    
+    def _config_change(self, manifest: Dict[str, Any]) -> Optional[str]:
+        """샤드 전체를 다시 만들어야 하는 설정 변경 (임베딩 / 샤드 구성 / 검색 인덱스)"""
+        if self._embedding_changed(manifest):
+            return "임베딩 백엔드 변경"
+        if manifest.get("sharding") != self._sharding():
+            return "샤드 구성 변경"
+        if (manifest.get("search_index") or {"index_type": "flat"}) != self.index_config.build_signature():
+            return "검색 인덱스 설정 변경"
+        return None
+    
+    def _stale_reason(self) -> Optional[str]:
+        """현재 인덱스를 다시 만들어야 하는 이유 (최신이면 None)"""
+        manifest = self.manifest
+        if not manifest:
+            return "매니페스트 없음"
+        reason = self._config_change(manifest)
+        if reason:
+            return reason
+        
+        recorded = manifest.get("csv") or {}
+        try:
+            fingerprint = csv_fingerprint(self.csv_path, recorded)
+        except OSError:
+            # 원본 CSV가 없으면 기존 인덱스 유지
+            return None
+        if fingerprint.get("sha256") != recorded.get("sha256"):
+            return "원본 CSV 변경"
+        # 내용은 같고 수정 시각만 바뀐 경우 → 다음 점검에서 해시 생략
+        manifest["csv"] = fingerprint
+        return None
+    
+    def _swap_shards(self, shards: Dict[str, VectorShard], base_dir: Optional[str]):
+        """샤드 목록 참조를 한 번에 교체 (검색 중인 요청은 이전 목록으로 끝까지 진행)"""
+        self.shards = shards
+        self.store_dir = base_dir
+        self._retriever_ready = True
+        if shards:
+            self._ready.set()
+    
+    def _rebuild_generation(self, reason: str = "", names: Optional[Set[str]] = None) -> Optional[str]:
+        """
+        새 세대 디렉터리에 샤드를 구성한 뒤 원자적으로 교체
+        
+        - names를 주면 그 샤드만 새로 구성하고, 나머지는 현재 세대에서 링크 (rebuild_shard)
+        - names가 없고 설정은 그대로면(원본 CSV만 변경) 청크 지문이 달라진 샤드만 새로 구성
+        - 바뀌지 않은 청크는 청크 임베딩 저장소에서 재사용 (재임베딩 없음)
+        - 검색 구조까지 다 만든 뒤 매니페스트 → 샤드 목록 순서로 교체
+        - 지문은 CSV를 읽기 전에 계산 (구축 중 CSV가 또 바뀌면 다음 점검에서 다시 구성)
+        
+        Returns:
+            새 세대 이름
+        """
+        with self._rebuild_mutex:
+            started = time.time()
+            generation = new_generation_name() if self.vector_store_path else None
+            self.rebuild_status = {"state": "building", "reason": reason, "generation": generation}
+            try:
+                if names is None:
+                    fingerprint = csv_fingerprint(self.csv_path, (self.manifest or {}).get("csv"))
+                    if self._can_reuse_shards():
+                        names = self._changed_shards()
+                else:
+                    # 일부 샤드만 요청 → 나머지 샤드가 최신인지는 다음 점검에서 판단하도록 지문은 그대로
+                    fingerprint = self.manifest.get("csv")
+                base_dir = self._generation_dir(generation)
+                kept = self._carry_over_shards(base_dir, names) if names is not None else {}
+                built, built_digests = self._build_shards(base_dir, only=names)
+                shards = dict(sorted({**kept, **built}.items()))
+                digests = {
+                    **{n: d for n, d in (self.manifest.get("shard_digests") or {}).items() if n in kept},
+                    **built_digests,
+                }
+                for name, shard in built.items():
+                    shard.setup()
+                for name, shard in kept.items():
+                    if shard is not self.shards.get(name):
+                        shard.setup(reuse=self.shards.get(name))
+            except Exception as e:
+                self.rebuild_status = {"state": "failed", "reason": reason, "error": str(e)}
+                if generation:
+                    shutil.rmtree(self._generation_dir(generation), ignore_errors=True)
+                raise
+            
+            previous_dir = self.store_dir
+            self._commit_manifest(self._manifest_for(generation, fingerprint, shards, digests))
+            self._swap_shards(shards, base_dir)
+            self._remove_old_generations(keep={base_dir, previous_dir})
+            
+            elapsed = time.time() - started
+            self.rebuild_status = {"state": "idle", "last_generation": generation, "last_build_s": round(elapsed, 1)}
+            sizes = ", ".join(f"{name} {shard.size}" for name, shard in shards.items())
+            logger.info(
+                "🔁 벡터 스토어 교체 완료: %s (%.1f초, 새로 구성 %s / 재사용 %s, 샤드별 문서 수: %s)",
+                generation, elapsed, len(built), len(kept), sizes
+            )
+            return generation
+    
+    def _can_reuse_shards(self) -> bool:
+        """현재 세대 샤드를 새 세대로 가져갈 수 있는지 (설정은 그대로, 청크 지문이 기록된 세대)"""
+        manifest = self.manifest
+        return bool(
+            self.shards and manifest.get("shard_digests") and self._config_change(manifest) is None
+        )
+    
+    def _changed_shards(self) -> Set[str]:
+        """
+        CSV를 한 번 훑어서(임베딩 없이) 청크 지문이 달라진 샤드 이름
+        
+        새로 생긴 시즌 샤드 포함, CSV에서 사라진 시즌 샤드도 포함 (새 세대에 넣지 않음)
+        """
+        digests: Dict[str, ChunkSetDigest] = defaultdict(ChunkSetDigest)
+        for cid, doc in self._iter_unique_chunks():
+            for name in self._shard_names_for(doc):
+                digests[name].add(cid)
+        
+        recorded = self.manifest.get("shard_digests") or {}
+        changed = {
+            name for name, digest in digests.items()
+            if name not in self.shards or recorded.get(name) != digest.hexdigest()
+        }
+        changed |= set(self.shards) - set(digests)
+        logger.info("🔍 바뀐 샤드: %s", ", ".join(sorted(changed)) or "없음")
+        return changed
+    
+    def _carry_over_shards(self, base_dir: Optional[str], exclude: Set[str]) -> Dict[str, VectorShard]:
+        """
+        현재 세대에서 exclude 밖의 샤드를 새 세대로 (재구성 없이)
+        
+        저장 경로가 있으면 파일을 새 세대 디렉터리로 링크한 뒤 새로 로드 (이전 세대는 나중에 지워지므로),
+        메모리 전용이면 현재 샤드 객체를 그대로 사용
+        """
+        kept: Dict[str, VectorShard] = {}
+        for name, current in self.shards.items():
+            if name in exclude:
+                continue
+            if not base_dir:
+                kept[name] = current
+                continue
+            link_shard_files(current.path, os.path.join(base_dir, name))
+            shard = self._new_shard(name, base_dir)
+            shard.load()
+            kept[name] = shard
+        return kept
+    
+    def rebuild_shard(self, season: Any) -> int:
+        """
+        시즌 하나의 샤드만 CSV 기준으로 새로 구성해서 새 세대로 교체 (다른 샤드는 링크만)
+        
+        교체는 전체 재구축과 같은 매니페스트 → 샤드 목록 순서라서
+        검색 중인 요청은 이전 샤드로 끝까지 진행하고, 다른 워커는 매니페스트를 보고 새 세대를 로드
+        
+        Args:
+            season: 시즌 (2024) 또는 샤드 이름 ("season_2024" / "all")
+            
+        Returns:
+            새 샤드의 청크 수 (CSV에 해당 시즌이 없으면 샤드 제거 후 0)
+        """
+        name = season if isinstance(season, str) else shard_name_for_season(season)
+        if not self._wants_shard(name):
+            raise ValueError(f"현재 설정에서 쓰지 않는 샤드: {name}")
+        
+        lock = RebuildLock(self.vector_store_path, ttl_seconds=self.rebuild_lock_ttl) if self.vector_store_path else None
+        if lock is not None and not lock.acquire():
+            raise RuntimeError("다른 워커가 벡터 스토어를 재구축 중입니다")
+        try:
+            # 다른 워커가 만든 더 새 세대가 있으면 그걸 기준으로 (이전 세대에서 링크하지 않도록)
+            if lock is not None:
+                manifest = read_manifest(self.vector_store_path)
+                if manifest and manifest.get("generation") != self.manifest.get("generation"):
+                    self._load_generation(manifest)
+            if self.shards and self._config_change(self.manifest) is None:
+                self._rebuild_generation(f"샤드 재구성: {name}", names={name})
+            else:
+                self._rebuild_generation(f"샤드 재구성: {name} (현재 세대를 쓸 수 없어 전체 구성)")
+        finally:
+            if lock is not None:
+                lock.release()
+        
+        shard = self.shards.get(name)
+        return shard.size if shard else 0
+    
+    def _remove_old_generations(self, keep: set):
+        """
+        이전 세대 디렉터리 정리
+        
+        바로 전 세대는 남겨 둠 (다른 워커가 아직 새 매니페스트를 못 읽고 검색 중일 수 있음)
+        """
+        root = self.vector_store_path
+        if not root or not os.path.isdir(root):
+            return
+        keep = {os.path.abspath(p) for p in keep if p}
+        for name in os.listdir(root):
+            path = os.path.join(root, name)
+            if os.path.abspath(path) in keep or not os.path.isdir(path):
+                continue
+            # 세대 디렉터리 + 세대 도입 전 vector_store_path 바로 아래 샤드
+            if name.startswith(GENERATION_PREFIX) or (
+                os.path.abspath(root) not in keep and (name == ALL_SHARD or is_season_shard(name))
+            ):
+                shutil.rmtree(path, ignore_errors=True)
+    
+    def _load_generation(self, manifest: Dict[str, Any]) -> bool:
+        """다른 워커가 만든 세대(또는 갱신)를 로드해서 교체"""
+        base_dir = self._generation_dir(manifest.get("generation"))
+        with self._rebuild_mutex:
+            shards = self._load_shards(base_dir)
+            if not shards:
+                return False
+            # 새 세대로 링크만 된 샤드는 현재 샤드의 역색인을 그대로 사용
+            for name, shard in shards.items():
+                shard.setup(reuse=self.shards.get(name))
+            self.manifest = manifest
+            self._swap_shards(shards, base_dir)
+        logger.info("🔁 새 벡터 스토어 세대 로드: %s (revision %s)", manifest.get('generation'), manifest.get('revision', 0))
+        return True
+    
+    def check_vector_store(self) -> Optional[str]:
+        """
+        재구축 스레드의 점검 한 번
+        
+        1. 다른 워커가 매니페스트를 바꿨으면 그 세대를 로드
+        2. 원본 CSV / 임베딩 모델 / 샤드 구성이 바뀌었으면 락을 잡은 워커 하나만 재구축
+        
+        Returns:
+            새로 구성한 세대 이름 (재구축하지 않았으면 None)
+        """
+        manifest = read_manifest(self.vector_store_path)
+        current = (self.manifest.get("generation"), self.manifest.get("revision", 0))
+        if manifest and (manifest.get("generation"), manifest.get("revision", 0)) != current:
+            if not self._embedding_changed(manifest) and self._load_generation(manifest):
+                return None
+        
+        reason = self._stale_reason() if self.shards else "저장된 벡터 스토어 없음"
+        if not reason:
+            return None
         
-        # Retriever 구성
-        self._setup_retriever()
+        lock = RebuildLock(self.vector_store_path, ttl_seconds=self.rebuild_lock_ttl)
+        if not lock.acquire():
+            self.rebuild_status = {"state": "waiting", "reason": "다른 워커가 재구축 중"}
+            return None
+        try:
+            # 락을 기다리는 사이 다른 워커가 끝냈으면 다음 점검에서 로드
+            if read_manifest(self.vector_store_path).get("generation") != self.manifest.get("generation"):
+                return None
+            logger.info("🔄 벡터 스토어 백그라운드 재구축 시작: %s", reason)
+            return self._rebuild_generation(reason)
+        finally:
+            lock.release()
     
-    def _create_new_vectorstore(self):
-        """새 벡터 스토어 생성"""
-        # 문서 로드
-        documents = self._load_documents_from_csv()
+    def _start_store_maintenance(self):
+        def run():
+            while True:
+                try:
+                    self.check_vector_store()
+                except Exception as e:
+                    logger.exception("❌ 벡터 스토어 재구축 실패 (기존 인덱스 유지): %s", e)
+                time.sleep(self.store_poll_seconds)
         
+        self._maintenance_thread = threading.Thread(target=run, name="rag-store-maintenance", daemon=True)
+        self._maintenance_thread.start()
+    
+    def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        """검색 가능한 인덱스가 준비될 때까지 대기 (스크립트/테스트용)"""
+        if self.shards:
+            return True
+        return self._ready.wait(timeout)
+    
+    def store_status(self) -> Dict[str, Any]:
+        """현재 서빙 중인 세대 / 재구축 상태"""
+        return {
+            "ready": bool(self.shards),
+            "generation": self.manifest.get("generation"),
+            "revision": self.manifest.get("revision", 0),
+            "built_at": self.manifest.get("built_at"),
+            "embedding_model": self.manifest.get("embedding_model"),
+            "embedding_backend": self.manifest.get("embedding_backend"),
+            "shards": {name: shard.size for name, shard in self.shards.items()},
+            "rebuild": dict(self.rebuild_status),
+        }
+    
+    def _iter_chunks(self) -> Iterator[Document]:
+        """CSV 문서 스트림 → 청크 스트림 (청크 크기 이하 문서는 분할기를 거치지 않음)"""
         # 텍스트 분할 (한글 최적화)
         text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=500,
+            chunk_size=self.chunk_size,
             chunk_overlap=50,
             separators=["\n\n", "\n", ".", ",", " ", ""]
         )
-        split_docs = text_splitter.split_documents(documents)
-        print(f"📄 분할된 문서 수: {len(split_docs)}")
         
-        # 벡터 스토어 생성
-        print("🔄 임베딩 생성 중... (시간이 걸릴 수 있습니다)")
-        self.vectorstore = FAISS.from_documents(split_docs, self.embeddings)
-        print("✅ 벡터 스토어 생성 완료")
+        count = 0
+        for doc in self._iter_documents_from_csv():
+            if len(doc.page_content) <= self.chunk_size:
+                # 분할기와 같은 결과 (앞뒤 공백 제거, 빈 문서는 버림)
+                text = doc.page_content.strip()
+                if text:
+                    count += 1
+                    yield Document(page_content=text, metadata=doc.metadata)
+                continue
+            for chunk in text_splitter.split_documents([doc]):
+                count += 1
+                yield chunk
+        logger.info("📄 분할된 문서 수: %s", count)
+    
+    @staticmethod
+    def _chunk_id(doc: Document) -> str:
+        """
+        청크의 docstore ID (내용 + 메타데이터 기반)
         
-        # 저장
-        if self.vector_store_path:
-            os.makedirs(os.path.dirname(self.vector_store_path), exist_ok=True)
-            self.vectorstore.save_local(self.vector_store_path)
-            print(f"💾 벡터 스토어 저장 완료: {self.vector_store_path}")
+        row_id는 CSV 행 위치라서 행이 추가/삭제되면 바뀌므로 제외
+        """
+        meta = {k: v for k, v in doc.metadata.items() if k != "row_id"}
+        raw = doc.page_content + "\x1f" + json.dumps(meta, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+    
+    def _iter_unique_chunks(self) -> Iterator[Tuple[str, Document]]:
+        """(chunk_id, Document) 스트림 (같은 ID는 첫 번째만, 기억하는 건 ID뿐)"""
+        seen = set()
+        for doc in self._iter_chunks():
+            cid = self._chunk_id(doc)
+            if cid not in seen:
+                seen.add(cid)
+                yield cid, doc
+    
+    def _iter_chunk_batches(self) -> Iterator[Dict[str, Document]]:
+        """청크 스트림을 {chunk_id: Document} 묶음으로 (임베딩 단계 입력)"""
+        batch: Dict[str, Document] = {}
+        for cid, doc in self._iter_unique_chunks():
+            batch[cid] = doc
+            if len(batch) >= self.ingest_batch_size:
+                yield batch
+                batch = {}
+        if batch:
+            yield batch
+    
+    def _embed_chunks(self, docs: List[Document]) -> List[List[float]]:
+        """
+        청크 임베딩 (content hash 기준으로 저장된 것은 재사용, 나머지만 임베딩)
+        
+        병렬 배치 파이프라인이 끝난 배치를 청크 저장소에 바로 기록하므로
+        빌드가 중간에 죽어도 다음 실행에서 이어서 진행됨
+        """
+        hashes = [text_hash(doc.page_content) for doc in docs]
+        text_by_hash = {h: doc.page_content for h, doc in zip(hashes, docs)}
+        
+        pipeline = create_embedding_pipeline(self.document_embeddings, checkpoint=self.chunk_store)
+        vectors = pipeline.run(text_by_hash)
+        
+        return [vectors[h] for h in hashes]
+    
+    def _shard_names_for(self, doc: Document) -> List[str]:
+        """청크가 들어갈 샤드 이름들 (시즌 샤드 + 설정 시 전체 샤드)"""
+        names = []
+        if self.shard_by_season:
+            names.append(shard_name_for_season(doc.metadata.get("season", 0)))
+        if self._wants_shard(ALL_SHARD):
+            names.append(ALL_SHARD)
+        return names
+    
+    def _build_shards(
+        self,
+        base_dir: Optional[str],
+        only: Optional[Set[str]] = None
+    ) -> Tuple[Dict[str, VectorShard], Dict[str, str]]:
+        """
+        base_dir 아래에 샤드 생성 (저장된 청크 임베딩 재사용)
+        
+        청크 묶음마다 한 번 임베딩해서 해당 샤드들에 바로 추가 → 구축 중 메모리는 묶음 크기만큼
+        
+        Args:
+            only: 이 샤드들만 구성 (None이면 전체)
+            
+        Returns:
+            (샤드 목록, 샤드별 청크 ID 지문)
+        """
+        logger.info("🔄 임베딩 생성 중... (시간이 걸릴 수 있습니다)")
+        shards: Dict[str, VectorShard] = {}
+        digests: Dict[str, ChunkSetDigest] = defaultdict(ChunkSetDigest)
+        
+        for batch in self._iter_chunk_batches():
+            groups: Dict[str, Dict[str, Document]] = defaultdict(dict)
+            for cid, doc in batch.items():
+                for name in self._shard_names_for(doc):
+                    if only is None or name in only:
+                        groups[name][cid] = doc
+                        digests[name].add(cid)
+            if not groups:
+                continue
+            
+            needed = {cid: doc for group in groups.values() for cid, doc in group.items()}
+            vectors = dict(zip(needed, self._embed_chunks(list(needed.values()))))
+            for name, group in groups.items():
+                if name not in shards:
+                    shards[name] = self._new_shard(name, base_dir)
+                shards[name].add(group, vectors)
+        
+        # 검색 인덱스(IVF / HNSW / PQ ...) 학습 + 저장도 여기서 한 번 (워커들은 로드 시 열기만)
+        for shard in shards.values():
+            shard.save()
+            shard.build_search_index()
+        logger.info("✅ 벡터 스토어 생성 완료 (샤드 %s개)", len(shards))
+        return dict(sorted(shards.items())), {name: digest.hexdigest() for name, digest in digests.items()}
     
     def _setup_retriever(self):
-        """Retriever 구성"""
-        self.retriever = self.vectorstore.as_retriever(
-            search_type="similarity",
-            search_kwargs={"k": 5}  # 상위 5개 문서 검색
-        )
-        print("✅ Retriever 구성 완료")
+        """샤드별 Retriever 구성 (검색 인덱스 + 메타데이터 역색인 + BM25 역색인)"""
+        for shard in self.shards.values():
+            shard.setup()
+        self._retriever_ready = True
+        self._ready.set()
+        sizes = ", ".join(f"{name} {shard.size}" for name, shard in self.shards.items())
+        logger.info("✅ Retriever 구성 완료 (샤드별 문서 수: %s)", sizes)
     
-    def query(self, question: str) -> Dict:
+    def _route_shards(self, filters: Optional[Dict[str, Any]]) -> List[VectorShard]:
+        """
+        필터의 시즌(단일/범위)에 해당하는 샤드만 선택
+        
+        시즌이 없으면 전체 샤드("all")가 있으면 그것 하나, 없으면 시즌 샤드 전부
+        """
+        shards = self.shards
+        season = (filters or {}).get("season")
+        
+        if self.shard_by_season and season is not None:
+            seasons = season if isinstance(season, (list, tuple, set)) else [season]
+            names = [shard_name_for_season(s) for s in seasons]
+            return [shards[name] for name in names if name in shards]
+        
+        if ALL_SHARD in shards:
+            return [shards[ALL_SHARD]]
+        return [shard for name, shard in sorted(shards.items())]
+    
+    def _resolve_targets(
+        self,
+        filters: Optional[Dict[str, Any]]
+    ) -> Tuple[Dict[str, Any], List[Tuple[VectorShard, Optional[np.ndarray]]]]:
+        """
+        필터 → (실제 적용된 필터, [(샤드, 후보 위치 or None), ...])
+        
+        맞는 문서가 없으면 조건을 점점 완화
+        """
+        for attempt in relaxed_filters(filters):
+            targets = [(shard, shard.candidates(attempt)) for shard in self._route_shards(attempt)]
+            targets = [(shard, p) for shard, p in targets if p is None or p.size > 0]
+            if targets:
+                return attempt, targets
+        return {}, []
+    
+    def retrieve(
+        self,
+        question: str,
+        k: int = 5,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> Tuple[List[Document], Dict[str, Any]]:
+        """
+        관련 문서 검색
+        
+        filters의 시즌으로 검색할 샤드를 고르고, 나머지 조건(선수/핸드/구종)은
+        샤드별 역색인으로 해당 문서 위치만 골라 그 안에서만 FAISS + BM25 검색.
+        샤드별 결과를 거리/점수 순으로 합친 뒤 RRF로 합침. 맞는 문서가 없으면 조건을 점점 완화.
+        
+        Returns:
+            (문서 리스트, 검색 디버그 정보)
+        """
+        return self.retrieve_many([question], k=k, filters=[filters])[0]
+    
+    def retrieve_many(
+        self,
+        questions: List[str],
+        k: int = 5,
+        filters: Optional[List[Optional[Dict[str, Any]]]] = None
+    ) -> List[Tuple[List[Document], Dict[str, Any]]]:
+        """
+        여러 질문을 한 번에 검색 (오프라인 분석용 배치)
+        
+        - 질의 임베딩: 캐시에 없는 질문만 모아서 임베딩 호출 한 번
+        - FAISS: 필터가 같은 질문끼리 샤드마다 n×d 행렬로 검색 한 번
+        
+        Args:
+            filters: 질문별 메타데이터 필터 (None이면 전부 필터 없음)
+            
+        Returns:
+            질문 순서대로 (문서 리스트, 검색 디버그 정보)
+        """
+        if not questions:
+            return []
+        with metrics.timer("kbo_stage_duration_seconds", stage="retrieval"), \
+                tracing.span("RAGSystem.retrieve", queries=len(questions), k=k):
+            return self._retrieve_many(questions, k, filters)
+    
+    def _retrieve_many(
+        self,
+        questions: List[str],
+        k: int,
+        filters: Optional[List[Optional[Dict[str, Any]]]]
+    ) -> List[Tuple[List[Document], Dict[str, Any]]]:
+        filters = filters or [None] * len(questions)
+        query_vectors = np.asarray(self.embeddings.embed_queries(questions), dtype="float32")
+        
+        # 같은 필터는 한 번만 해석하고, 그 필터의 질문들을 한 묶음으로
+        resolved: Dict[str, Tuple[Dict[str, Any], List[Tuple[VectorShard, Optional[np.ndarray]]]]] = {}
+        groups: Dict[str, List[int]] = defaultdict(list)
+        for i, f in enumerate(filters):
+            key = json.dumps(f or {}, sort_keys=True, ensure_ascii=False, default=str)
+            if key not in resolved:
+                resolved[key] = self._resolve_targets(f)
+            groups[key].append(i)
+        
+        # BM25를 같이 쓰면 양쪽에서 넉넉히 뽑아서 RRF로 합침
+        fetch_k = max(k * 4, 20) if self.hybrid_search else k
+        
+        # 샤드별 top-k를 모아 전체 top-k로 (키 = (샤드 이름, 위치))
+        vector_hits: List[list] = [[] for _ in questions]
+        exact_fallback = [False] * len(questions)
+        for key, indices in groups.items():
+            for shard, positions in resolved[key][1]:
+                rows = shard.vector_search_batch(query_vectors[indices], fetch_k, positions)
+                if positions is not None:
+                    # 근사 인덱스(IVF / HNSW)가 후보를 다 못 만나서 결과가 모자란 질의는
+                    # 후보가 있는데도 0건이 되지 않게 후보 안에서 정확 검색으로 다시
+                    expected = min(fetch_k, int(positions.size))
+                    short = [j for j, hits in enumerate(rows) if len(hits) < expected]
+                    if short:
+                        exact_rows = shard.exact_search_batch(
+                            query_vectors[[indices[j] for j in short]], fetch_k, positions
+                        )
+                        for j, hits in zip(short, exact_rows):
+                            rows[j] = hits
+                            exact_fallback[indices[j]] = True
+                for i, hits in zip(indices, rows):
+                    vector_hits[i].extend(
+                        ((shard.name, position), doc, distance) for position, doc, distance in hits
+                    )
+        
+        results = [None] * len(questions)
+        for key, indices in groups.items():
+            applied, targets = resolved[key]
+            for i in indices:
+                results[i] = self._fuse_hits(
+                    questions[i], k, fetch_k, applied, targets, vector_hits[i], exact_fallback[i]
+                )
+        return results
+    
+    def _fuse_hits(
+        self,
+        question: str,
+        k: int,
+        fetch_k: int,
+        applied: Dict[str, Any],
+        targets: List[Tuple[VectorShard, Optional[np.ndarray]]],
+        vector_hits: list,
+        exact_fallback: bool = False
+    ) -> Tuple[List[Document], Dict[str, Any]]:
+        """샤드별 벡터 결과 + BM25 결과 → RRF로 합친 top-k"""
+        lexical_hits = []
+        for shard, positions in targets:
+            lexical_hits.extend(
+                ((shard.name, position), score)
+                for position, score in shard.lexical_search(question, fetch_k, positions)
+            )
+        vector_hits = sorted(vector_hits, key=lambda hit: hit[2])[:fetch_k]
+        lexical_hits = sorted(lexical_hits, key=lambda hit: hit[1], reverse=True)[:fetch_k]
+        docs_by_key = {key: doc for key, doc, _ in vector_hits}
+        
+        debug = {
+            "filters": applied,
+            "shards": [shard.name for shard, _ in targets],
+            "candidate_count": sum(shard.size if p is None else int(p.size) for shard, p in targets),
+            "vector_hits": len(vector_hits),
+            "index_type": self.index_config.index_type,
+            "exact_rerank": self.index_config.compressed and self.index_config.rerank_factor > 0,
+            "exact_fallback": exact_fallback
+        }
+        
+        if self.hybrid_search:
+            fused = reciprocal_rank_fusion(
+                [[key for key, _, _ in vector_hits],
+                 [key for key, _ in lexical_hits]],
+                k=self.rrf_k
+            )
+            top_keys = [key for key, _ in fused[:k]]
+            debug["lexical_hits"] = len(lexical_hits)
+        else:
+            top_keys = [key for key, _, _ in vector_hits[:k]]
+        
+        shards = {shard.name: shard for shard, _ in targets}
+        docs = [docs_by_key.get(key) or shards[key[0]].doc_at(key[1]) for key in top_keys]
+        return [doc for doc in docs if doc is not None], debug
+    
+    @tracing.traced("RAGSystem.query")
+    def query(
+        self,
+        question: str,
+        filters: Optional[Dict[str, Any]] = None,
+        rerank: Optional[bool] = None
+    ) -> Dict:
         """
         질문에 대한 답변 생성
         
         Args:
             question: 사용자 질문
+            filters: 메타데이터 필터 (router.build_rag_filters)
+            rerank: 로컬 재정렬 사용 여부 (None이면 RERANK_ENABLED 기본값, A/B 비교용)
             
         Returns:
             {
                 "answer": "답변 텍스트",
-                "sources": [관련 문서 메타데이터 리스트]
+                "sources": [관련 문서 메타데이터 리스트],
+                "debug_info": {캐시 적중 여부 등}
             }
         """
-        if not self.retriever:
+        if not self.shards:
             return {
                 "answer": "RAG 시스템이 초기화되지 않았습니다.",
-                "sources": []
+                "sources": [],
+                "debug_info": {"vector_store": self.store_status()}
             }
         
+        use_rerank = self.reranker.config.enabled if rerank is None else rerank
+        # 기본값과 다른 쪽(A/B 비교)으로 요청하면 시맨틱 캐시는 건너뜀 (다른 쪽 답변이 섞이지 않게)
+        semantic_cache = self.semantic_cache if use_rerank == self.reranker.config.enabled else None
+        
         try:
-            print(f"\n🔍 RAG 질의: {question}")
+            logger.debug("🔍 RAG 질의: %s", question)
+            
+            # 시맨틱 캐시 조회 (비슷한 질문에 대한 이전 답변 재사용)
+            question_vector = None
+            if semantic_cache:
+                semantic_cache.set_data_version(self._data_version())
+                question_vector = self.embeddings.embed_query(question)
+                # 같은 질문 표현이라도 시즌/선수 등 필터가 다르면 다른 답 → 필터가 같은 항목만 비교
+                cached = semantic_cache.lookup(question_vector, filters)
+                metrics.count_cache("semantic", cached is not None)
+                if cached:
+                    logger.debug("⚡ 시맨틱 캐시 적중 (유사도 %.3f): %s", cached['similarity'], cached['question'])
+                    return {
+                        **cached["result"],
+                        "debug_info": {
+                            "semantic_cache": {
+                                "hit": True,
+                                "similarity": cached["similarity"],
+                                "cached_question": cached["question"]
+                            }
+                        }
+                    }
             
-            # 관련 문서 검색
-            docs = self.retriever.get_relevant_documents(question)
+            # 관련 문서 검색 (메타데이터 필터 → 후보 안에서만 벡터 검색)
+            # 재정렬을 쓰면 후보를 넉넉히 뽑아서 로컬 점수로 상위만 남김
+            k = self.reranker.config.candidates if use_rerank else 5
+            docs, retrieval_debug = self.retrieve(question, k=k, filters=filters)
+            rerank_debug = {"enabled": False}
+            if use_rerank:
+                docs, rerank_debug = self.reranker.rerank(question, docs, filters)
             
-            # 컨텍스트 구성
-            context = "\n\n".join([doc.page_content for doc in docs])
+            # 컨텍스트 구성 (토큰 예산 안에서, 겹치는 청크는 합치고 조건 일치 청크 먼저)
+            context, docs, packing_debug = self.context_packer.pack(docs, filters)
             
             # 프롬프트 구성
             prompt = f"""당신은 KBO(한국프로야구) 매치업 분석 전문가입니다.
@@ -171,8 +991,15 @@ class RAGSystem:
 
 답변:"""
             
-            # LLM 호출
-            answer = self.llm.predict(prompt)
+            packing_debug["prompt_tokens"] = self.context_packer.count(prompt)
+            
+            # 생성 모델 선택 (짧은 단일 대상 + 검색 신뢰도 높음 → 작은 모델)
+            generation_debug = self.model_policy.choose(question, filters, docs)
+            llm = self.small_llm if generation_debug["tier"] == "small" and self.small_llm else self.llm
+            generation_debug["model"] = llm.model_name
+            
+            # LLM 호출 (같은 모델/temperature/프롬프트면 디스크 캐시 사용)
+            answer = self._generate(prompt, llm)
             
             # 소스 문서 메타데이터 추출
             sources = []
@@ -184,26 +1011,87 @@ class RAGSystem:
                     "content_preview": doc.page_content[:100] + "..."
                 })
             
-            print(f"✅ 답변 생성 완료 (소스: {len(sources)}개)")
+            logger.debug("✅ 답변 생성 완료 (소스: %s개)", len(sources))
             
-            return {
+            result = {
                 "answer": answer,
                 "sources": sources
             }
+            if semantic_cache:
+                semantic_cache.put(question, question_vector, result, filters)
             
+            return {
+                **result,
+                "debug_info": {
+                    "semantic_cache": {"hit": False},
+                    "retrieval": retrieval_debug,
+                    "rerank": rerank_debug,
+                    "context": packing_debug,
+                    "generation": generation_debug
+                }
+            }
+            
+        except CircuitOpenError as e:
+            # 공급자 장애 중: 재시도 없이 바로 포기 → 하이브리드 엔진이 규칙 기반 답변 사용
+            logger.warning("🚫 RAG 건너뜀: %s", e)
+            return {
+                "answer": "RAG 시스템을 일시적으로 사용할 수 없습니다.",
+                "sources": [],
+                "debug_info": {"circuit_open": str(e)}
+            }
         except Exception as e:
-            print(f"❌ RAG 질의 오류: {e}")
+            logger.exception("❌ RAG 질의 오류: %s", e)
             return {
                 "answer": f"죄송합니다. 답변 생성 중 오류가 발생했습니다: {str(e)}",
                 "sources": []
             }
     
-    def search_similar_documents(self, query: str, k: int = 5) -> List[Document]:
+    def _generate(self, prompt: str, llm=None) -> str:
+        """LLM 호출 (completion 캐시 적중 시 호출 생략)"""
+        llm = llm or self.llm
+        model = llm.model_name
+        temperature = llm.temperature
+        
+        if self.completion_cache:
+            cached = self.completion_cache.get(model, temperature, prompt)
+            metrics.count_cache("completion", cached is not None)
+            if cached is not None:
+                logger.debug("⚡ LLM 캐시 적중")
+                return cached
+        
+        with metrics.timer("kbo_stage_duration_seconds", stage="llm"), tracing.span("llm.generate", model=model):
+            answer = llm.generate(prompt)
+        metrics.inc("kbo_llm_tokens_total", self.context_packer.count(prompt), model=model, kind="prompt")
+        metrics.inc("kbo_llm_tokens_total", self.context_packer.count(answer), model=model, kind="completion")
+        
+        if self.completion_cache:
+            self.completion_cache.put(model, temperature, prompt, answer)
+        return answer
+    
+    def search_similar_documents(
+        self,
+        query: str,
+        k: int = 5,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Document]:
         """유사 문서 검색"""
-        if not self.vectorstore:
+        if not self.shards:
             return []
         
-        return self.vectorstore.similarity_search(query, k=k)
+        docs, _ = self.retrieve(query, k=k, filters=filters)
+        return docs
+    
+    def search_similar_documents_batch(
+        self,
+        queries: List[str],
+        k: int = 5,
+        filters: Optional[List[Optional[Dict[str, Any]]]] = None
+    ) -> List[List[Document]]:
+        """여러 질의 유사 문서 검색 (질의 순서대로)"""
+        if not self.shards:
+            return [[] for _ in queries]
+        
+        return [docs for docs, _ in self.retrieve_many(queries, k=k, filters=filters)]
 
 
 # 전역 인스턴스 (싱글톤)
@@ -227,8 +1115,9 @@ def get_rag_system() -> RAGSystem:
 if __name__ == "__main__":
     print("🧪 RAG 시스템 테스트")
     
-    # 시스템 초기화
+    # 시스템 초기화 (백그라운드 구축 중이면 끝날 때까지 대기)
     rag = get_rag_system()
+    rag.wait_until_ready()
     
     # 테스트 질의
     test_questions = [
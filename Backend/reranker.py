@@ -0,0 +1,147 @@
+# reranker.py
+# ============================================
+# ⚾ 검색 결과 로컬 재정렬 (LLM / 임베딩 호출 없음, CPU 몇 ms)
+#  - 후보를 넉넉히(기본 50개) 뽑은 뒤 값싼 특징으로 다시 점수 매김
+#    · 메타데이터 일치: 질문에서 파싱한 시즌 / 선수 / 핸드 / 구종
+#    · 어휘 겹침: 질문 토큰(한글 2-gram) 중 청크에 나온 비율
+#    · 최신성: 후보 중 최근 시즌일수록
+#    · 원래 검색 순위 (RRF 순위)
+#  - 1위 점수의 일정 비율 미만인 청크는 버려서 프롬프트에 더 적고 나은 청크만
+# ============================================
+
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+from lexical_index import tokenize
+from context_packer import metadata_match_count
+
+
+@dataclass
+class RerankConfig:
+    enabled: bool = False        # 요청에서 지정하지 않았을 때 기본값
+    candidates: int = 50         # 재정렬할 후보 수 (검색 k)
+    top_n: int = 5               # 재정렬 후 남길 최대 청크 수
+    min_score_ratio: float = 0.5  # 1위 점수 × 비율 미만은 버림 (0 = 끔)
+    w_metadata: float = 0.4
+    w_lexical: float = 0.3
+    w_recency: float = 0.1
+    w_rank: float = 0.2
+
+    @classmethod
+    def from_env(cls) -> "RerankConfig":
+        """환경 변수 설정으로 재정렬 설정 생성"""
+        return cls(
+            enabled=os.getenv("RERANK_ENABLED", "0") != "0",
+            candidates=int(os.getenv("RERANK_CANDIDATES", "50")),
+            top_n=int(os.getenv("RERANK_TOP_N", "5")),
+            min_score_ratio=float(os.getenv("RERANK_MIN_SCORE_RATIO", "0.5")),
+            w_metadata=float(os.getenv("RERANK_W_METADATA", "0.4")),
+            w_lexical=float(os.getenv("RERANK_W_LEXICAL", "0.3")),
+            w_recency=float(os.getenv("RERANK_W_RECENCY", "0.1")),
+            w_rank=float(os.getenv("RERANK_W_RANK", "0.2")),
+        )
+
+
+def _season(doc: Document) -> Optional[int]:
+    try:
+        return int(doc.metadata.get("season"))
+    except (TypeError, ValueError):
+        return None
+
+
+class LocalReranker:
+    def __init__(self, config: Optional[RerankConfig] = None):
+        self.config = config or RerankConfig()
+
+    def score(
+        self,
+        question: str,
+        docs: List[Document],
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, float]]:
+        """후보별 특징 값(0~1)과 가중합 점수"""
+        c = self.config
+        active_filters = {k: v for k, v in (filters or {}).items() if v is not None}
+        question_tokens = set(tokenize(question))
+
+        seasons = [s for s in (_season(doc) for doc in docs) if s]
+        oldest, newest = (min(seasons), max(seasons)) if seasons else (0, 0)
+
+        scored = []
+        for rank, doc in enumerate(docs):
+            metadata = (
+                metadata_match_count(doc, active_filters) / len(active_filters) if active_filters else 0.0
+            )
+            lexical = (
+                len(question_tokens & set(tokenize(doc.page_content))) / len(question_tokens)
+                if question_tokens else 0.0
+            )
+            season = _season(doc)
+            recency = (season - oldest) / (newest - oldest) if season and newest > oldest else 0.0
+            prior = 1.0 - rank / len(docs)
+
+            scored.append({
+                "metadata": metadata,
+                "lexical": lexical,
+                "recency": recency,
+                "rank": prior,
+                "score": (
+                    c.w_metadata * metadata + c.w_lexical * lexical
+                    + c.w_recency * recency + c.w_rank * prior
+                ),
+            })
+        return scored
+
+    def rerank(
+        self,
+        question: str,
+        docs: List[Document],
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[List[Document], Dict[str, Any]]:
+        """
+        후보 재정렬 → 상위 top_n (1위 대비 점수가 낮은 청크는 제외)
+
+        Returns:
+            (남긴 청크들, 디버그 정보)
+        """
+        started = time.perf_counter()
+        scored = self.score(question, docs, filters)
+        order = sorted(range(len(docs)), key=lambda i: (-scored[i]["score"], i))[:self.config.top_n]
+
+        if order and self.config.min_score_ratio > 0:
+            floor = scored[order[0]]["score"] * self.config.min_score_ratio
+            order = [i for i in order if scored[i]["score"] >= floor]
+
+        debug = {
+            "enabled": True,
+            "candidates": len(docs),
+            "kept": len(order),
+            "original_ranks": order,
+            "scores": [round(scored[i]["score"], 3) for i in order],
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+        return [docs[i] for i in order], debug
+
+
+def create_reranker() -> LocalReranker:
+    """환경 변수 설정으로 재정렬기 생성"""
+    return LocalReranker(RerankConfig.from_env())
+
+
+# 테스트 코드
+if __name__ == "__main__":
+    docs = [
+        Document(page_content="양현종 vs 최정 2022 시즌 타율 0.250", metadata={"season": 2022, "pitcher": "양현종", "batter": "최정"}),
+        Document(page_content="김광현 vs 최정 2023 시즌 타율 0.300", metadata={"season": 2023, "pitcher": "김광현", "batter": "최정"}),
+        Document(page_content="김광현 vs 최정 2024 시즌 타율 0.333", metadata={"season": 2024, "pitcher": "김광현", "batter": "최정"}),
+    ]
+    reranked, info = create_reranker().rerank(
+        "2024년 김광현과 최정의 매치업은?", docs, {"season": 2024, "pitcher": "김광현", "batter": "최정"}
+    )
+    for doc in reranked:
+        print(doc.page_content)
+    print(info)
@@ -0,0 +1,332 @@
+# resilience.py
+# ============================================
+# ⚾ 외부 공급자(OpenAI 임베딩 / 채팅) 호출 보호
+#  - 재시도: 일시적 오류(429, 5xx, 연결/타임아웃)만, 횟수 제한 + full jitter 백오프
+#  - 헤징: 첫 요청이 일정 시간 안에 안 끝나면 같은 요청을 하나 더 보내고 먼저 끝난 쪽 사용 (기본 끔)
+#  - 회로 차단기: 연속 실패가 쌓이면 일정 시간 호출 없이 바로 실패
+#                → RAG는 즉시 포기하고 하이브리드 엔진이 규칙 기반 답변만 사용
+#  - 차단기는 공급자 종류(embeddings / chat)별로 프로세스당 하나
+# ============================================
+
+import os
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, TimeoutError as FutureTimeoutError, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+from embedding_pipeline import is_transient_error, retry_after_seconds
+
+from logging_setup import get_logger
+
+logger = get_logger("resilience")
+
+
+class CircuitOpenError(Exception):
+    """회로 차단 중이라 공급자를 호출하지 않고 바로 실패"""
+
+
+@dataclass
+class ResilienceConfig:
+    enabled: bool = True
+    max_retries: int = 2             # 첫 시도 이후 추가 시도 횟수
+    base_delay: float = 0.2          # 백오프 기본값 (초), full jitter: 0 ~ base * 2^attempt
+    max_delay: float = 2.0
+    embed_hedge_after: float = 0.0   # 초, 0이면 헤징 안 함
+    llm_hedge_after: float = 0.0
+    failure_threshold: int = 5       # 연속 실패 몇 번이면 차단
+    reset_seconds: float = 30.0      # 차단 후 시험 호출까지 대기
+
+    @classmethod
+    def from_env(cls) -> "ResilienceConfig":
+        """환경 변수 설정으로 공급자 호출 보호 설정 생성"""
+        return cls(
+            enabled=os.getenv("PROVIDER_RESILIENCE_ENABLED", "1") != "0",
+            max_retries=int(os.getenv("PROVIDER_MAX_RETRIES", "2")),
+            base_delay=float(os.getenv("PROVIDER_RETRY_BASE_MS", "200")) / 1000,
+            max_delay=float(os.getenv("PROVIDER_RETRY_MAX_MS", "2000")) / 1000,
+            embed_hedge_after=float(os.getenv("EMBED_HEDGE_AFTER_MS", "0")) / 1000,
+            llm_hedge_after=float(os.getenv("LLM_HEDGE_AFTER_MS", "0")) / 1000,
+            failure_threshold=int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5")),
+            reset_seconds=float(os.getenv("BREAKER_RESET_SECONDS", "30")),
+        )
+
+
+class CircuitBreaker:
+    """
+    closed → (연속 실패 failure_threshold번) → open → (reset_seconds 후) → half_open
+    half_open에서는 시험 호출 하나만 보내고, 성공하면 closed / 실패하면 다시 open
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "open":
+                if time.monotonic() - self.opened_at < self.reset_seconds:
+                    self.rejected += 1
+                    return False
+                self.state = "half_open"
+                self._probe_in_flight = False
+            if self.state == "half_open":
+                if self._probe_in_flight:
+                    self.rejected += 1
+                    return False
+                self._probe_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            if self.state != "closed":
+                logger.warning("✅ 회로 복구: %s", self.name)
+            self.state = "closed"
+            self.failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probe_in_flight = False
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    logger.warning("🚫 회로 차단: %s (연속 실패 %s번, %.0f초)", self.name, self.failures, self.reset_seconds)
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            retry_in = (
+                max(0.0, self.reset_seconds - (time.monotonic() - self.opened_at))
+                if self.state == "open" else 0.0
+            )
+            return {
+                "state": self.state,
+                "failures": self.failures,
+                "rejected": self.rejected,
+                "retry_in_seconds": round(retry_in, 1),
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+# 헤징용 스레드 풀 (헤징을 켰을 때만 사용)
+_hedge_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_breaker(name: str, config: Optional[ResilienceConfig] = None) -> CircuitBreaker:
+    """공급자 종류별 차단기 (싱글톤, 작은/큰 모델이 같은 chat 차단기 공유)"""
+    with _breakers_lock:
+        if name not in _breakers:
+            c = config or ResilienceConfig.from_env()
+            _breakers[name] = CircuitBreaker(name, c.failure_threshold, c.reset_seconds)
+        return _breakers[name]
+
+
+def breaker_status() -> Dict[str, Dict[str, Any]]:
+    """전체 차단기 상태 (/health 용)"""
+    with _breakers_lock:
+        breakers = dict(_breakers)
+    return {name: breaker.status() for name, breaker in breakers.items()}
+
+
+def _get_hedge_executor() -> ThreadPoolExecutor:
+    global _hedge_executor
+    with _breakers_lock:
+        if _hedge_executor is None:
+            _hedge_executor = ThreadPoolExecutor(
+                max_workers=int(os.getenv("HEDGE_MAX_WORKERS", "16")),
+                thread_name_prefix="provider-hedge",
+            )
+        return _hedge_executor
+
+
+def hedged_call(fn: Callable[[], Any], hedge_after: float) -> Any:
+    """
+    fn 실행, hedge_after초 안에 안 끝나면 한 번 더 보내고 먼저 성공한 결과 반환
+
+    둘 다 실패하면 첫 요청의 오류를 올림 (늦게 끝난 쪽 결과는 버림)
+    """
+    executor = _get_hedge_executor()
+    first = executor.submit(fn)
+    try:
+        return first.result(timeout=hedge_after)
+    except FutureTimeoutError:
+        pass
+
+    pending = {first, executor.submit(fn)}
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                return future.result()
+    return first.result()
+
+
+class ResilientCaller:
+    """재시도 + (선택) 헤징 + 회로 차단기로 감싼 호출"""
+
+    def __init__(self, breaker: CircuitBreaker, config: ResilienceConfig, hedge_after: float = 0.0):
+        self.breaker = breaker
+        self.config = config
+        self.hedge_after = hedge_after
+
+    def _backoff_delay(self, attempt: int, e: Exception) -> float:
+        hinted = retry_after_seconds(e)
+        if hinted is not None:
+            return min(hinted, self.config.max_delay)
+        return random.uniform(0, min(self.config.max_delay, self.config.base_delay * (2 ** attempt)))
+
+    def call(self, fn: Callable[[], Any], hedge: bool = True) -> Any:
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"{self.breaker.name} 공급자 호출 차단 중")
+
+        last_error: Optional[Exception] = None
+        for attempt in range(self.config.max_retries + 1):
+            try:
+                if hedge and self.hedge_after > 0:
+                    result = hedged_call(fn, self.hedge_after)
+                else:
+                    result = fn()
+            except Exception as e:
+                last_error = e
+                if not is_transient_error(e) or attempt >= self.config.max_retries:
+                    break
+                delay = self._backoff_delay(attempt, e)
+                logger.warning("⚠️ %s 일시 오류, %.2f초 후 재시도 (%s/%s): %s", self.breaker.name, delay, attempt + 1, self.config.max_retries, e)
+                time.sleep(delay)
+                continue
+            self.breaker.record_success()
+            return result
+
+        # 공급자가 응답은 한 오류(400 등)는 장애로 세지 않음
+        if is_transient_error(last_error):
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        raise last_error
+
+
+class ResilientEmbeddings(Embeddings):
+    """
+    임베딩 백엔드 래퍼 (질의 임베딩 경로용)
+
+    embed_query: 재시도 + 헤징 + 차단기 / embed_documents: 재시도 + 차단기 (배치는 헤징 안 함)
+    그 밖의 속성(model, backend, dim ...)은 안쪽 객체 그대로
+    """
+
+    def __init__(self, base: Embeddings, caller: ResilientCaller):
+        self.base = base
+        self.caller = caller
+
+    def __getattr__(self, name: str) -> Any:
+        if name in ("base", "caller"):
+            raise AttributeError(name)
+        return getattr(self.base, name)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.caller.call(lambda: self.base.embed_query(text))
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.caller.call(lambda: self.base.embed_documents(texts), hedge=False)
+
+
+class ResilientLLM:
+    """
+    LLM 백엔드 래퍼 (generate: 재시도 + 헤징 + 차단기)
+
+    stream은 이미 보낸 토큰을 되돌릴 수 없으니 차단기 확인만 하고 그대로 전달
+    """
+
+    def __init__(self, base: Any, caller: ResilientCaller):
+        self.base = base
+        self.caller = caller
+
+    def __getattr__(self, name: str) -> Any:
+        if name in ("base", "caller"):
+            raise AttributeError(name)
+        return getattr(self.base, name)
+
+    def generate(self, prompt: str) -> str:
+        return self.caller.call(lambda: self.base.generate(prompt))
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        if not self.caller.breaker.allow():
+            raise CircuitOpenError(f"{self.caller.breaker.name} 공급자 호출 차단 중")
+        try:
+            yield from self.base.stream(prompt)
+        except GeneratorExit:
+            # 받는 쪽이 중간에 끊음 → 공급자는 정상
+            self.caller.breaker.record_success()
+            raise
+        except Exception as e:
+            if is_transient_error(e):
+                self.caller.breaker.record_failure()
+            else:
+                self.caller.breaker.record_success()
+            raise
+        self.caller.breaker.record_success()
+
+
+def with_embedding_resilience(embeddings: Embeddings, config: Optional[ResilienceConfig] = None) -> Embeddings:
+    """네트워크 임베딩 백엔드만 감쌈 (hashing 같은 로컬 백엔드는 그대로)"""
+    config = config or ResilienceConfig.from_env()
+    if not config.enabled or getattr(embeddings, "backend", None) == "hashing":
+        return embeddings
+    caller = ResilientCaller(get_breaker("embeddings", config), config, config.embed_hedge_after)
+    return ResilientEmbeddings(embeddings, caller)
+
+
+def with_llm_resilience(llm: Any, config: Optional[ResilienceConfig] = None) -> Any:
+    """네트워크 LLM 백엔드만 감쌈 (local 대체 구현은 그대로)"""
+    config = config or ResilienceConfig.from_env()
+    if not config.enabled or getattr(llm, "backend", None) == "local":
+        return llm
+    caller = ResilientCaller(get_breaker("chat", config), config, config.llm_hedge_after)
+    return ResilientLLM(llm, caller)
+
+
+# 테스트 코드 (네트워크 없이 재시도 / 헤징 / 차단 확인)
+if __name__ == "__main__":
+    class FlakyError(Exception):
+        status_code = 503
+
+    calls = {"n": 0}
+
+    def flaky():
+        calls["n"] += 1
+        if calls["n"] % 3:
+            raise FlakyError("일시 오류")
+        return "ok"
+
+    config = ResilienceConfig(max_retries=2, base_delay=0.01, failure_threshold=2, reset_seconds=0.5)
+    caller = ResilientCaller(CircuitBreaker("test", 2, 0.5), config)
+    print("재시도:", caller.call(flaky), f"(호출 {calls['n']}번)")
+
+    def always_down():
+        raise FlakyError("장애")
+
+    for _ in range(3):
+        try:
+            caller.call(always_down)
+        except Exception as e:
+            print(type(e).__name__, caller.breaker.status())
+
+    def slow_then_fast(delays=iter([0.5, 0.01])):
+        time.sleep(next(delays))
+        return "hedged"
+
+    started = time.perf_counter()
+    print(hedged_call(slow_then_fast, 0.05), f"{(time.perf_counter() - started) * 1000:.0f}ms")
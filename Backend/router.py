@@ -24,6 +24,7 @@ from matchup_engine import (
     answer_pitcher_clutch_hitters,
     answer_batter_vs_pitch_type,
     answer_batter_vs_pitcher_hand,
+    PITCH_TYPE_CODE_MAP,
 )
 
 from situation_engine import (
@@ -33,6 +34,12 @@ from situation_engine import (
     answer_hand_pitchtype_only,
 )
 
+from engine_result import EngineResult, unrecognized, unsupported
+from tracing import traced
+from logging_setup import get_logger
+
+logger = get_logger("router")
+
 
 # --------------------------------------------
 # 0. 공통 데이터 구조
@@ -326,6 +333,7 @@ def infer_two_names_general(q: str):
 #    - 나머지는 매치업/랭킹 intent
 # --------------------------------------------
 
+@traced()
 def route_question(q: str) -> RouteResult:
     q = q.strip()
     season, season_range = parse_season_range(q)
@@ -464,13 +472,93 @@ def route_question(q: str) -> RouteResult:
     elif contains_any(q, ["가장 약한 타자", "피하고 싶은 타자", "타율 잘 나오는 타자", "타율이 잘 나오는 타자"]):
         intent = "pitcher_weak_batters_by_avg"
 
-    print(f"\n🧩 [DEBUG] route_question 입력: {q}")
-    print(f"   → season={season}, season_range={season_range}, top_n={top_n}")
-    print(f"   → batter_hand={hand}, pitcher_hand={pitcher_hand}, pitch_type={pitch_type}, count_str={count_str}")
-    print(f"   → intent={intent}")
+    logger.debug(
+        "🧩 route_question 입력: %s | season=%s, season_range=%s, top_n=%s | "
+        "batter_hand=%s, pitcher_hand=%s, pitch_type=%s, count_str=%s | intent=%s",
+        q, season, season_range, top_n, hand, pitcher_hand, pitch_type, count_str, intent,
+    )
     return RouteResult(intent=intent, params=params)
 
 
+# --------------------------------------------
+# 4-1. RAG 메타데이터 필터
+#    - route 결과 + 이름 추론으로 검색 대상 문서를 좁힘
+#    - 질문에 명시된 조건만 넣음 (기본 시즌 2024 같은 값은 제외)
+# --------------------------------------------
+
+HAND_CODES = {"L": ["L", "좌"], "R": ["R", "우"]}
+
+PITCHER_NAME_INTENTS = {
+    "pitcher_weak_batters_by_obp",
+    "pitcher_high_ops_batters",
+    "pitcher_slider_friendly_batters",
+    "pitcher_clutch_hitters",
+    "pitcher_high_so_batters",
+    "pitcher_weak_batters_in_risp",
+    "pitcher_weak_batters_by_hand",
+    "pitcher_power_hitters",
+    "pitcher_weak_batters_by_avg",
+}
+
+BATTER_NAME_INTENTS = {
+    "batter_best_pitchers",
+    "batter_worst_pitchers",
+    "batter_vs_pitch_type",
+    "batter_vs_pitcher_hand",
+}
+
+
+def build_rag_filters(question: str, route_result: Optional[RouteResult]) -> Dict[str, Any]:
+    """
+    RAG 검색용 메타데이터 필터
+    (키는 metadata_index.FILTER_KEYS 기준, 리스트 값은 OR 조건)
+    """
+    if route_result is None:
+        return {}
+
+    intent = route_result.intent
+    params = route_result.params or {}
+    filters: Dict[str, Any] = {}
+
+    # 시즌: 질문에 연도가 적혀 있을 때만
+    if re.search(r"\d{4}", question):
+        y1, y2 = params.get("year_from"), params.get("year_to")
+        if y1 is not None and y2 is not None:
+            filters["season"] = list(range(y1, y2 + 1)) if y2 > y1 else y1
+
+    # 선수 이름: intent에 맞는 추론 함수 사용
+    pitcher = batter = None
+    if intent in ("basic_matchup", "matchup_trend"):
+        pitcher, batter = infer_vs_names_from_question(question)
+    elif intent.startswith("situation_"):
+        pitcher, batter = infer_two_names_general(question)
+    elif intent in PITCHER_NAME_INTENTS:
+        pitcher = infer_pitcher_from_question(question)
+    elif intent in BATTER_NAME_INTENTS:
+        batter = infer_batter_from_question(question)
+
+    if pitcher:
+        filters["pitcher"] = pitcher
+    if batter:
+        filters["batter"] = batter
+
+    # 좌/우 핸드
+    batter_hand = parse_batter_hand(question)
+    pitcher_hand = parse_pitcher_hand(question)
+    if batter_hand:
+        filters["batter_hand"] = HAND_CODES[batter_hand]
+    if pitcher_hand:
+        filters["pitcher_hand"] = HAND_CODES[pitcher_hand]
+
+    # 구종: '슬라이더 잘 던지는 투수' 같은 특기 구종 질문일 때만
+    if intent == "batter_vs_pitch_type" and params.get("pitch_type"):
+        code = PITCH_TYPE_CODE_MAP.get(params["pitch_type"])
+        if code:
+            filters["pitcher_pitch_type"] = code
+
+    return filters
+
+
 # --------------------------------------------
 # 5. intent별 엔진 호출
 # --------------------------------------------
@@ -486,7 +574,8 @@ def ensure_season(year_from, year_to, question: str) -> int:
     return 2024
 
 
-def dispatch_to_engine(question: str, route_result: RouteResult) -> str:
+@traced()
+def dispatch_to_engine(question: str, route_result: RouteResult) -> EngineResult:
     intent = route_result.intent
     params = route_result.params or {}
 
@@ -497,7 +586,7 @@ def dispatch_to_engine(question: str, route_result: RouteResult) -> str:
 
     # ---------- 0) 미지원 generic 상황 ----------
     if intent == "situation_generic_pitchtype_unsupported":
-        return (
+        return unsupported(
             "‘슬라이더에 약한 타자에게 슬라이더를 던지면?’처럼 이름 없는 집단 질문은\n"
             "현재 랜덤 데이터만으로는 정의가 애매해서 아직 지원하지 않고 있어요 🥲\n"
             "구체적인 매치업으로 물어봐 주세요.\n"
@@ -509,7 +598,7 @@ def dispatch_to_engine(question: str, route_result: RouteResult) -> str:
     if intent == "situation_twoout_basesloaded":
         pitch_type = params.get("pitch_type")
         if not pitch_type:
-            return "2사 만루 질문에서 구종을 인식하지 못했어요. 예: '슬라이더' 같이 구체적으로 적어주세요."
+            return unrecognized("2사 만루 질문에서 구종을 인식하지 못했어요. 예: '슬라이더' 같이 구체적으로 적어주세요.")
         # 이름/핸드는 situation_engine 쪽 wrapper가 다시 파싱
         return answer_twoout_basesloaded_with_pitch(question, season, pitch_type)
 
@@ -517,7 +606,7 @@ def dispatch_to_engine(question: str, route_result: RouteResult) -> str:
         pitch_type = params.get("pitch_type")
         count_str = params.get("count_str")
         if not (pitch_type and count_str):
-            return "카운트(0B0S, 3B2S 등) 질문에서 구종/카운트를 제대로 인식하지 못했어요."
+            return unrecognized("카운트(0B0S, 3B2S 등) 질문에서 구종/카운트를 제대로 인식하지 못했어요.")
         return answer_count_with_pitch(question, season, pitch_type, count_str)
 
     if intent == "situation_risp":
@@ -525,7 +614,7 @@ def dispatch_to_engine(question: str, route_result: RouteResult) -> str:
         count_str = params.get("count_str")
         risp_mode = params.get("risp_mode", "overall")
         if not pitch_type:
-            return "득점권 질문에서 구종을 인식하지 못했어요."
+            return unrecognized("득점권 질문에서 구종을 인식하지 못했어요.")
         return answer_risp_with_pitch(
             question,
             season,
@@ -537,20 +626,20 @@ def dispatch_to_engine(question: str, route_result: RouteResult) -> str:
     if intent == "situation_hand_pitchtype_only":
         pitch_type = params.get("pitch_type")
         if not pitch_type:
-            return "질문에서 구종(예: 슬라이더, 포심)을 인식하지 못했어요."
+            return unrecognized("질문에서 구종(예: 슬라이더, 포심)을 인식하지 못했어요.")
         pitcher_hand = parse_pitcher_hand(question)
         batter_hand = parse_batter_hand(question)
         if not (pitcher_hand and batter_hand):
-            return "좌투/우투, 좌타/우타 정보를 인식하지 못했어요. 예: '좌투수 김광현이 우타자 양의지에게 슬라이더' 처럼 적어줘."
+            return unrecognized("좌투/우투, 좌타/우타 정보를 인식하지 못했어요. 예: '좌투수 김광현이 우타자 양의지에게 슬라이더' 처럼 적어줘.")
         return answer_hand_pitchtype_only(season, pitcher_hand, batter_hand, pitch_type)
 
     # ---------- 2) 매치업 추세/기본 ----------
 
     if intent == "matchup_trend":
         pitcher, batter = infer_vs_names_from_question(question)
-        print(f"\n🔍 [DEBUG] answer_matchup_trend: pitcher={pitcher}, batter={batter}, range={year_from}~{year_to}")
+        logger.debug("🔍 answer_matchup_trend: pitcher=%s, batter=%s, range=%s~%s", pitcher, batter, year_from, year_to)
         if not pitcher or not batter:
-            return (
+            return unrecognized(
                 "매치업 추세에서 투수/타자 이름을 인식하지 못했어요.\n"
                 "예: '2018년부터 2024년까지 김광현 vs 최정 매치업 추세 알려줘'"
             )
@@ -558,92 +647,92 @@ def dispatch_to_engine(question: str, route_result: RouteResult) -> str:
 
     if intent == "basic_matchup":
         pitcher, batter = infer_vs_names_from_question(question)
-        print(f"\n🔍 [DEBUG] answer_basic_matchup: season={season}, pitcher={pitcher}, batter={batter}")
+        logger.debug("🔍 answer_basic_matchup: season=%s, pitcher=%s, batter=%s", season, pitcher, batter)
         if not pitcher or not batter:
-            return "투수/타자 이름을 인식하지 못했어요. 예: '2024년 김광현 vs 최정 매치업 알려줘' 처럼 입력해 주세요."
+            return unrecognized("투수/타자 이름을 인식하지 못했어요. 예: '2024년 김광현 vs 최정 매치업 알려줘' 처럼 입력해 주세요.")
         return answer_basic_matchup(season, pitcher, batter)
 
     # ---------- 3) 투수 기준 TOP N 타자 ----------
 
     if intent == "pitcher_weak_batters_by_obp":
         pitcher = infer_pitcher_from_question(question)
-        print(f"\n🔍 [DEBUG] pitcher_weak_batters_by_obp: season={season}, pitcher={pitcher}")
+        logger.debug("🔍 pitcher_weak_batters_by_obp: season=%s, pitcher=%s", season, pitcher)
         if not pitcher:
-            return "출루율 기준 타자 랭킹에서 투수 이름을 인식하지 못했어요."
+            return unrecognized("출루율 기준 타자 랭킹에서 투수 이름을 인식하지 못했어요.")
         return answer_pitcher_weak_batters_by_obp(season, pitcher, top_n)
 
     if intent == "pitcher_high_ops_batters":
         pitcher = infer_pitcher_from_question(question)
-        print(f"\n🔍 [DEBUG] pitcher_high_ops_batters: season={season}, pitcher={pitcher}")
+        logger.debug("🔍 pitcher_high_ops_batters: season=%s, pitcher=%s", season, pitcher)
         if not pitcher:
-            return "OPS 기준 타자 랭킹에서 투수 이름을 인식하지 못했어요."
+            return unrecognized("OPS 기준 타자 랭킹에서 투수 이름을 인식하지 못했어요.")
         return answer_pitcher_high_ops_batters(season, pitcher, top_n)
 
     if intent == "pitcher_slider_friendly_batters":
         pitcher = infer_pitcher_from_question(question)
-        print(f"\n🔍 [DEBUG] pitcher_slider_friendly_batters: season={season}, pitcher={pitcher}")
+        logger.debug("🔍 pitcher_slider_friendly_batters: season=%s, pitcher=%s", season, pitcher)
         if not pitcher:
-            return "슬라이더 기준 타자 랭킹에서 투수 이름을 인식하지 못했어요."
+            return unrecognized("슬라이더 기준 타자 랭킹에서 투수 이름을 인식하지 못했어요.")
         return answer_pitcher_slider_friendly_batters(season, pitcher, top_n)
 
     if intent == "pitcher_clutch_hitters":
         pitcher = infer_pitcher_from_question(question)
-        print(f"\n🔍 [DEBUG] pitcher_clutch_hitters: season={season}, pitcher={pitcher}")
+        logger.debug("🔍 pitcher_clutch_hitters: season=%s, pitcher=%s", season, pitcher)
         if not pitcher:
-            return "득점권 클러치 타자 랭킹에서 투수 이름을 인식하지 못했어요."
+            return unrecognized("득점권 클러치 타자 랭킹에서 투수 이름을 인식하지 못했어요.")
         return answer_pitcher_clutch_hitters(season, pitcher, top_n)
 
     if intent == "pitcher_high_so_batters":
         pitcher = infer_pitcher_from_question(question)
-        print(f"\n🔍 [DEBUG] pitcher_high_so_batters: season={season}, pitcher={pitcher}")
+        logger.debug("🔍 pitcher_high_so_batters: season=%s, pitcher=%s", season, pitcher)
         if not pitcher:
-            return "삼진 많이 나올 타자 TOP 랭킹에서 투수 이름을 인식하지 못했어요."
+            return unrecognized("삼진 많이 나올 타자 TOP 랭킹에서 투수 이름을 인식하지 못했어요.")
         return answer_pitcher_high_so_batters(season, pitcher, top_n)
 
     if intent == "pitcher_weak_batters_in_risp":
         pitcher = infer_pitcher_from_question(question)
-        print(f"\n🔍 [DEBUG] pitcher_weak_batters_in_risp: season={season}, pitcher={pitcher}")
+        logger.debug("🔍 pitcher_weak_batters_in_risp: season=%s, pitcher=%s", season, pitcher)
         if not pitcher:
-            return "득점권에서 약한 타자 TOP 랭킹에서 투수 이름을 인식하지 못했어요."
+            return unrecognized("득점권에서 약한 타자 TOP 랭킹에서 투수 이름을 인식하지 못했어요.")
         return answer_pitcher_weak_batters_in_risp(season, pitcher, top_n)
 
     if intent == "pitcher_weak_batters_by_hand":
         pitcher = infer_pitcher_from_question(question)
         batter_hand = params.get("batter_hand")
-        print(f"\n🔍 [DEBUG] pitcher_weak_batters_by_hand: season={season}, pitcher={pitcher}, hand={batter_hand}")
+        logger.debug("🔍 pitcher_weak_batters_by_hand: season=%s, pitcher=%s, hand=%s", season, pitcher, batter_hand)
         if not pitcher or not batter_hand:
-            return "좌/우타자 기준 약한 타자 랭킹에서 투수 이름/핸드를 인식하지 못했어요."
+            return unrecognized("좌/우타자 기준 약한 타자 랭킹에서 투수 이름/핸드를 인식하지 못했어요.")
         return answer_pitcher_weak_batters_by_hand(season, pitcher, batter_hand, top_n)
 
     if intent == "pitcher_power_hitters":
         pitcher = infer_pitcher_from_question(question)
-        print(f"\n🔍 [DEBUG] pitcher_power_hitters: season={season}, pitcher={pitcher}, top_n={top_n}")
+        logger.debug("🔍 pitcher_power_hitters: season=%s, pitcher=%s, top_n=%s", season, pitcher, top_n)
         if not pitcher:
-            return "장타 잘 치는 타자 랭킹에서 투수 이름을 인식하지 못했어요."
+            return unrecognized("장타 잘 치는 타자 랭킹에서 투수 이름을 인식하지 못했어요.")
         # ⚠ hand 인자 넘기지 않음 (시그니처: (season, pitcher, top_n, batter_hand=None))
         return answer_pitcher_power_hitters(season, pitcher, top_n)
 
     if intent == "pitcher_weak_batters_by_avg":
         pitcher = infer_pitcher_from_question(question)
-        print(f"\n🔍 [DEBUG] pitcher_weak_batters_by_avg: season={season}, pitcher={pitcher}, top_n={top_n}")
+        logger.debug("🔍 pitcher_weak_batters_by_avg: season=%s, pitcher=%s, top_n=%s", season, pitcher, top_n)
         if not pitcher:
-            return "타율 기준 약한 타자 랭킹에서 투수 이름을 인식하지 못했어요."
+            return unrecognized("타율 기준 약한 타자 랭킹에서 투수 이름을 인식하지 못했어요.")
         return answer_pitcher_weak_batters_by_avg(season, pitcher, top_n)
 
     # ---------- 4) 타자 기준 TOP N 투수 ----------
 
     if intent == "batter_best_pitchers":
         batter = infer_batter_from_question(question)
-        print(f"\n🔍 [DEBUG] batter_best_pitchers: season={season}, batter={batter}, top_n={top_n}")
+        logger.debug("🔍 batter_best_pitchers: season=%s, batter=%s, top_n=%s", season, batter, top_n)
         if not batter:
-            return "타자가 잘 치는 투수 랭킹에서 타자 이름을 인식하지 못했어요."
+            return unrecognized("타자가 잘 치는 투수 랭킹에서 타자 이름을 인식하지 못했어요.")
         return answer_batter_best_pitchers(season, batter, top_n)
 
     if intent == "batter_worst_pitchers":
         batter = infer_batter_from_question(question)
-        print(f"\n🔍 [DEBUG] batter_worst_pitchers: season={season}, batter={batter}, top_n={top_n}")
+        logger.debug("🔍 batter_worst_pitchers: season=%s, batter=%s, top_n=%s", season, batter, top_n)
         if not batter:
-            return "타자가 고전하는 투수 랭킹에서 타자 이름을 인식하지 못했어요."
+            return unrecognized("타자가 고전하는 투수 랭킹에서 타자 이름을 인식하지 못했어요.")
         return answer_batter_worst_pitchers(season, batter, top_n)
 
     # ---------- 5) 타자 vs 구종 / 타자 vs 투수핸드 ----------
@@ -651,22 +740,22 @@ def dispatch_to_engine(question: str, route_result: RouteResult) -> str:
     if intent == "batter_vs_pitch_type":
         batter = infer_batter_from_question(question)
         pitch_type = params.get("pitch_type")
-        print(f"\n🔍 [DEBUG] batter_vs_pitch_type: season={season}, batter={batter}, pitch_type={pitch_type}, top_n={top_n}")
+        logger.debug("🔍 batter_vs_pitch_type: season=%s, batter=%s, pitch_type=%s, top_n=%s", season, batter, pitch_type, top_n)
         if not batter or not pitch_type:
-            return "구종 기준 질문에서 타자 이름/구종을 인식하지 못했어요."
+            return unrecognized("구종 기준 질문에서 타자 이름/구종을 인식하지 못했어요.")
         return answer_batter_vs_pitch_type(season, batter, pitch_type, top_n)
 
     if intent == "batter_vs_pitcher_hand":
         batter = infer_batter_from_question(question)
         pitcher_hand = params.get("pitcher_hand")
-        print(f"\n🔍 [DEBUG] batter_vs_pitcher_hand: season={season}, batter={batter}, pitcher_hand={pitcher_hand}, top_n={top_n}")
+        logger.debug("🔍 batter_vs_pitcher_hand: season=%s, batter=%s, pitcher_hand=%s, top_n=%s", season, batter, pitcher_hand, top_n)
         if not batter or not pitcher_hand:
-            return "좌/우투수 기준 질문에서 타자 이름/투수 핸드를 인식하지 못했어요."
+            return unrecognized("좌/우투수 기준 질문에서 타자 이름/투수 핸드를 인식하지 못했어요.")
         return answer_batter_vs_pitcher_hand(season, batter, pitcher_hand, top_n)
 
     # ---------- 6) 기타 / 미지원 ----------
 
-    return (
+    return unsupported(
         "아직 이 질문 문장은 규칙 기반 엔진에서 지원하지 않아요.\n"
         "예를 들어 다음과 같은 형식으로 물어봐 주세요:\n"
         " - 2024년 김광현 vs 최정 매치업 알려줘\n"
@@ -0,0 +1,185 @@
+# semantic_cache.py
+# ============================================
+# ⚾ 시맨틱 답변 캐시 (FAISS 내적 인덱스)
+#  - 질문 임베딩이 이전 질문과 충분히 비슷하면 저장된 RAG 답변 재사용
+#  - 메타데이터 필터(시즌/선수/핸드/구종)별로 인덱스를 나눠서 필터가 같은 질문끼리만 비교
+#    ("2023 양현종 좌타자 상대" ↔ "2024 양현종 좌타자 상대"는 임베딩이 거의 같아도 다른 답)
+#  - TTL / 최대 개수 / 데이터 버전 변경 시 무효화
+# ============================================
+
+import os
+import json
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+import faiss
+
+
+def filter_key(filters: Optional[Dict[str, Any]]) -> str:
+    """필터 → 파티션 키 (값 없는 조건은 빼고, 리스트는 정렬해서 순서와 무관하게)"""
+    normalized = {}
+    for key, value in (filters or {}).items():
+        if value is None:
+            continue
+        if isinstance(value, (list, tuple, set)):
+            normalized[key] = sorted(str(v) for v in value)
+        else:
+            normalized[key] = str(value)
+    return json.dumps(normalized, sort_keys=True, ensure_ascii=False)
+
+
+class SemanticCache:
+    """
+    RAGSystem.query 앞단의 시맨틱 캐시
+
+    - 벡터는 L2 정규화 후 IndexFlatIP에 넣으므로 점수 = 코사인 유사도
+    - 필터 키(filter_key)마다 인덱스를 따로 둠 → 필터가 다른 질문의 답변은 재사용하지 않음
+    - entries는 OrderedDict(삽입/최근 사용 순)라서 가장 오래된 것부터 제거 (파티션과 무관하게 전체 기준)
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.95,
+        ttl_seconds: float = 24 * 3600,
+        max_entries: int = 2000,
+        data_version: str = "",
+    ):
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.data_version = data_version
+
+        # 필터 키 → 인덱스 (파티션 첫 put 때 차원을 보고 생성)
+        self.indexes: Dict[str, faiss.Index] = {}
+        self.entries: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    # ----------------------------------------
+    # 내부 헬퍼
+    # ----------------------------------------
+    @staticmethod
+    def _as_matrix(vector: List[float]) -> np.ndarray:
+        x = np.asarray(vector, dtype="float32").reshape(1, -1)
+        faiss.normalize_L2(x)
+        return x
+
+    def _remove(self, ids: List[int]):
+        by_partition: Dict[str, List[int]] = {}
+        for i in ids:
+            entry = self.entries.pop(i, None)
+            if entry is not None:
+                by_partition.setdefault(entry["partition"], []).append(i)
+        for partition, part_ids in by_partition.items():
+            index = self.indexes[partition]
+            index.remove_ids(np.asarray(part_ids, dtype="int64"))
+            if index.ntotal == 0:
+                del self.indexes[partition]
+
+    def _is_expired(self, entry: Dict[str, Any], now: float) -> bool:
+        return self.ttl_seconds > 0 and now - entry["created_at"] > self.ttl_seconds
+
+    # ----------------------------------------
+    # 공개 API
+    # ----------------------------------------
+    def lookup(self, vector: List[float], filters: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """필터가 같은 이전 질문 중 가장 비슷한 것이 threshold 이상이면 캐시된 결과 반환"""
+        with self._lock:
+            index = self.indexes.get(filter_key(filters))
+            if index is None or index.ntotal == 0:
+                self.misses += 1
+                return None
+
+            scores, ids = index.search(self._as_matrix(vector), 1)
+            score, entry_id = float(scores[0][0]), int(ids[0][0])
+            entry = self.entries.get(entry_id)
+
+            if entry is None or score < self.threshold:
+                self.misses += 1
+                return None
+
+            if self._is_expired(entry, time.time()):
+                self._remove([entry_id])
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end(entry_id)
+            self.hits += 1
+            return {
+                "question": entry["question"],
+                "result": entry["result"],
+                "similarity": score,
+            }
+
+    def put(
+        self,
+        question: str,
+        vector: List[float],
+        result: Dict[str, Any],
+        filters: Optional[Dict[str, Any]] = None,
+    ):
+        """답변 결과를 필터 파티션에 저장 (최대 개수 초과 시 오래된 것부터 제거)"""
+        with self._lock:
+            x = self._as_matrix(vector)
+            partition = filter_key(filters)
+            index = self.indexes.get(partition)
+            if index is None:
+                index = self.indexes[partition] = faiss.IndexIDMap2(faiss.IndexFlatIP(x.shape[1]))
+
+            entry_id = self._next_id
+            self._next_id += 1
+            index.add_with_ids(x, np.asarray([entry_id], dtype="int64"))
+            self.entries[entry_id] = {
+                "question": question,
+                "result": result,
+                "partition": partition,
+                "created_at": time.time(),
+            }
+
+            overflow = len(self.entries) - self.max_entries
+            if overflow > 0:
+                self._remove(list(self.entries.keys())[:overflow])
+
+    def set_data_version(self, data_version: str):
+        """원본 데이터가 바뀌면 캐시 전체 무효화"""
+        with self._lock:
+            if data_version == self.data_version:
+                return
+            self.data_version = data_version
+            self._clear_locked()
+
+    def clear(self):
+        with self._lock:
+            self._clear_locked()
+
+    def _clear_locked(self):
+        self.indexes.clear()
+        self.entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self.entries),
+            "partitions": len(self.indexes),
+            "hits": self.hits,
+            "misses": self.misses,
+            "data_version": self.data_version,
+        }
+
+
+def create_semantic_cache(data_version: str = "") -> Optional[SemanticCache]:
+    """환경 변수 설정으로 시맨틱 캐시 생성 (SEMANTIC_CACHE_ENABLED=0이면 None)"""
+    if os.getenv("SEMANTIC_CACHE_ENABLED", "1") == "0":
+        return None
+
+    return SemanticCache(
+        threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95")),
+        ttl_seconds=float(os.getenv("SEMANTIC_CACHE_TTL", str(24 * 3600))),
+        max_entries=int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "2000")),
+        data_version=data_version,
+    )
@@ -7,7 +7,12 @@
 import os
 import pandas as pd
 
-print("🔔 situation_engine.py 실행 시작")
+from engine_result import EngineResult, ok, no_data, unrecognized
+from tracing import traced
+from logging_setup import get_logger
+
+logger = get_logger("situation_engine")
+logger.info("🔔 situation_engine.py 실행 시작")
 
 # ============================================
 # 0) 경로 설정 & 데이터 로드
@@ -16,19 +21,19 @@ print("🔔 situation_engine.py 실행 시작")
 SITUATION_CSV = r"C:\Users\wendy\Desktop\종합설계\RAG\RAG-ver2\add_random_final_2.csv"
 
 def load_situation_df():
-    print(f"📂 add_random_final_2.csv 로드 시도: {SITUATION_CSV}")
+    logger.info("📂 add_random_final_2.csv 로드 시도: %s", SITUATION_CSV)
     if not os.path.exists(SITUATION_CSV):
         raise FileNotFoundError(f"add_random_final_2.csv를 찾을 수 없습니다: {SITUATION_CSV}")
 
     last_err = None
     for enc in ["utf-8-sig", "cp949"]:
         try:
-            print(f"  🔄 인코딩={enc} 로드 시도...")
+            logger.info("🔄 인코딩=%s 로드 시도...", enc)
             df = pd.read_csv(SITUATION_CSV, encoding=enc)
-            print(f"  ✅ 로드 성공! shape={df.shape}")
+            logger.info("✅ 로드 성공! shape=%s", df.shape)
             return df
         except Exception as e:
-            print(f"  ⚠️ 인코딩 {enc} 실패: {repr(e)}")
+            logger.warning("⚠️ 인코딩 %s 실패: %r", enc, e)
             last_err = e
     raise RuntimeError(f"add_random_final_2.csv 로드 실패: {repr(last_err)}")
 
@@ -36,7 +41,7 @@ def load_situation_df():
 try:
     situation_df = load_situation_df()
 except Exception as e:
-    print("🚨 situation_df 로드 실패:", repr(e))
+    logger.error("🚨 situation_df 로드 실패: %r", e)
     # 메인에서 import 할 때 바로 죽으면 귀찮으니까, 일단 None으로 두고 함수에서 체크
     situation_df = None
 
@@ -69,6 +74,25 @@ def fmt(x, d=3):
         return "정보 없음"
 
 
+def num(x):
+    """payload용 숫자 변환 (NaN이나 None이면 None)."""
+    try:
+        v = float(x)
+    except Exception:
+        return None
+    return None if v != v else v
+
+
+RISP_COLS = ["RISP_OUT", "RISP_BB+HBP", "RISP_HIT"]
+RISP_2OUT_COLS = ["RISP_2OUT_OUT", "RISP_2OUT_BB+HBP", "RISP_2OUT_HIT"]
+FINAL_COLS = ["FINAL_BALL", "FINAL_BB+HBP", "FINAL_OUT"]
+
+
+def row_stats(row, cols) -> dict:
+    """payload용: row에 실제로 있는 컬럼만 {컬럼: 숫자}로 뽑기."""
+    return {c: num(row[c]) for c in cols if c and c in row.index}
+
+
 def ensure_df_ready():
     if situation_df is None:
         raise RuntimeError("situation_df가 로드되지 않았습니다. add_random_final_2.csv 경로를 확인하세요.")
@@ -207,6 +231,14 @@ def get_pitchstat_cols(row, pitch_type_ko: str):
 # 3) 공통 문장 빌더
 # ============================================
 
+def pitch_cols(row, pitch_type_ko: str) -> list:
+    """구종 스플릿(WHIFF/AVG/OBP) 컬럼 이름 리스트 (없으면 빈 리스트)."""
+    wc, _, ac, _, oc, _ = get_pitchstat_cols(row, pitch_type_ko)
+    if wc is None:
+        return []
+    return [wc, ac, oc]
+
+
 def build_triplet_sentence(label: str, out_col: str, bb_col: str, hit_col: str, row) -> str:
     if any(c not in row.index for c in [out_col, bb_col, hit_col]):
         return f"{label} 확률 정보가 데이터에 없습니다."
@@ -248,7 +280,8 @@ def build_pitchtype_sentence(row, pitch_type_ko: str) -> str:
 # 4) 상황별 답변 함수들
 # ============================================
 
-def answer_twoout_basesloaded_pitch(season, pitcher_name, batter_name, pitch_type_ko: str) -> str:
+@traced()
+def answer_twoout_basesloaded_pitch(season, pitcher_name, batter_name, pitch_type_ko: str) -> EngineResult:
     """
     2사 만루 + 특정 구종 질문:
     - RISP_HIT / RISP_BB+HBP / RISP_OUT
@@ -258,7 +291,7 @@ def answer_twoout_basesloaded_pitch(season, pitcher_name, batter_name, pitch_typ
     """
     row = resolve_row(season, pitcher_name, batter_name)
     if row is None:
-        return f"{season} 시즌 {pitcher_name} vs {batter_name} 매치업 데이터가 없습니다. (add_random_final_2.csv 확인)"
+        return no_data(f"{season} 시즌 {pitcher_name} vs {batter_name} 매치업 데이터가 없습니다. (add_random_final_2.csv 확인)")
 
     p_with = add_josa(pitcher_name, "과/와")
     b_subj = add_josa(batter_name, "이/가")
@@ -288,10 +321,16 @@ def answer_twoout_basesloaded_pitch(season, pitcher_name, batter_name, pitch_typ
         f"요약하면, 2사 만루에서 {p_with} {b_subj} 상대 {pitch_type_ko} 승부는 "
         "득점권/2사 득점권 성향과 구종 스플릿, 최종 볼/볼넷/아웃 확률을 종합해 판단할 수 있습니다."
     )
-    return "\n".join(lines)
+    stats = row_stats(row, RISP_COLS + RISP_2OUT_COLS + pitch_cols(row, pitch_type_ko) + FINAL_COLS)
+    return ok(
+        "\n".join(lines),
+        season=season, pitcher=pitcher_name, batter=batter_name,
+        pitch_type=pitch_type_ko, stats=stats,
+    )
 
 
-def answer_count_pitch(season, pitcher_name, batter_name, pitch_type_ko: str, count_str: str) -> str:
+@traced()
+def answer_count_pitch(season, pitcher_name, batter_name, pitch_type_ko: str, count_str: str) -> EngineResult:
     """
     0B0S / 3B2S / 0B2S / 3B0S + 특정 구종 질문.
     - {COUNT}_OUT / {COUNT}_BB+HBP / {COUNT}_HIT
@@ -300,7 +339,7 @@ def answer_count_pitch(season, pitcher_name, batter_name, pitch_type_ko: str, co
     """
     row = resolve_row(season, pitcher_name, batter_name)
     if row is None:
-        return f"{season} 시즌 {pitcher_name} vs {batter_name} 매치업 데이터가 없습니다. (add_random_final_2.csv 확인)"
+        return no_data(f"{season} 시즌 {pitcher_name} vs {batter_name} 매치업 데이터가 없습니다. (add_random_final_2.csv 확인)")
 
     p_with = add_josa(pitcher_name, "과/와")
     b_subj = add_josa(batter_name, "이/가")
@@ -341,9 +380,15 @@ def answer_count_pitch(season, pitcher_name, batter_name, pitch_type_ko: str, co
         f"정리하면, {label}에서 {p_with} {b_subj} 상대 {pitch_type_ko} 승부는 "
         "카운트별 랜덤 예측값과 구종 스플릿, 최종 결과 확률을 함께 고려해 판단할 수 있습니다."
     )
-    return "\n".join(lines)
+    stats = row_stats(row, [out_col, bb_col, hit_col] + RISP_COLS + pitch_cols(row, pitch_type_ko) + FINAL_COLS)
+    return ok(
+        "\n".join(lines),
+        season=season, pitcher=pitcher_name, batter=batter_name,
+        pitch_type=pitch_type_ko, count_str=count_str, stats=stats,
+    )
 
 
+@traced()
 def answer_risp_pitch(
     season,
     pitcher_name,
@@ -351,7 +396,7 @@ def answer_risp_pitch(
     pitch_type_ko: str,
     risp_mode: str = "overall",   # "overall" | "2out"
     count_str: str | None = None, # "0B0S"/"3B2S"/...
-) -> str:
+) -> EngineResult:
     """
     득점권(1사2루, 2사3루 등) + (옵션) 카운트 + 구종 질문.
     risp_mode:
@@ -361,7 +406,7 @@ def answer_risp_pitch(
     """
     row = resolve_row(season, pitcher_name, batter_name)
     if row is None:
-        return f"{season} 시즌 {pitcher_name} vs {batter_name} 매치업 데이터가 없습니다. (add_random_final_2.csv 확인)"
+        return no_data(f"{season} 시즌 {pitcher_name} vs {batter_name} 매치업 데이터가 없습니다. (add_random_final_2.csv 확인)")
 
     p_with = add_josa(pitcher_name, "과/와")
     b_subj = add_josa(batter_name, "이/가")
@@ -419,10 +464,17 @@ def answer_risp_pitch(
         f"요약하면, {label}에서 {p_with} {b_subj} 상대 {pitch_type_ko} 승부는 "
         "득점권 성향, (있다면) 카운트별 랜덤 예측, 구종 스플릿, 최종 결과 확률을 함께 보며 판단할 수 있습니다."
     )
-    return "\n".join(lines)
+    count_cols = [f"{count_str}_OUT", f"{count_str}_BB+HBP", f"{count_str}_HIT"] if count_str else []
+    stats = row_stats(row, RISP_COLS + RISP_2OUT_COLS + count_cols + pitch_cols(row, pitch_type_ko) + FINAL_COLS)
+    return ok(
+        "\n".join(lines),
+        season=season, pitcher=pitcher_name, batter=batter_name,
+        pitch_type=pitch_type_ko, risp_mode=risp_mode, count_str=count_str, stats=stats,
+    )
 
 
-def answer_hand_pitchtype_only(season, pitcher_name, batter_name, pitch_type_ko: str) -> str:
+@traced()
+def answer_hand_pitchtype_only(season, pitcher_name, batter_name, pitch_type_ko: str) -> EngineResult:
     """
     E블록: '좌투수 김광현이 우타자 오재일에게 슬라이더를 던지면?' 처럼
     카운트/득점권 언급 없는 구종 + 핸드 조합 질문.
@@ -432,7 +484,7 @@ def answer_hand_pitchtype_only(season, pitcher_name, batter_name, pitch_type_ko:
     """
     row = resolve_row(season, pitcher_name, batter_name)
     if row is None:
-        return f"{season} 시즌 {pitcher_name} vs {batter_name} 매치업 데이터가 없습니다. (add_random_final_2.csv 확인)"
+        return no_data(f"{season} 시즌 {pitcher_name} vs {batter_name} 매치업 데이터가 없습니다. (add_random_final_2.csv 확인)")
 
     p_with = add_josa(pitcher_name, "과/와")
     b_subj = add_josa(batter_name, "이/가")
@@ -461,7 +513,12 @@ def answer_hand_pitchtype_only(season, pitcher_name, batter_name, pitch_type_ko:
         f"정리하면, {p_with} {b_subj} 상대 {pitch_type_ko} 선택은 "
         "득점권 성향과 구종별 헛스윙/타율/출루율, 최종 결과 확률을 함께 고려할 수 있습니다."
     )
-    return "\n".join(lines)
+    stats = row_stats(row, RISP_COLS + RISP_2OUT_COLS + pitch_cols(row, pitch_type_ko) + FINAL_COLS)
+    return ok(
+        "\n".join(lines),
+        season=season, pitcher=pitcher_name, batter=batter_name,
+        pitch_type=pitch_type_ko, stats=stats,
+    )
 
 # ============================================
 # 4-2) router용 래퍼 함수들 (question 문자열 입력용)
@@ -514,30 +571,32 @@ def _extract_pitcher_batter_from_question(question: str):
         return None, None
 
 
-def answer_twoout_basesloaded_with_pitch(question: str, season: int, pitch_type_ko: str) -> str:
+@traced()
+def answer_twoout_basesloaded_with_pitch(question: str, season: int, pitch_type_ko: str) -> EngineResult:
     """
     router에서 사용하는 시그니처:
     (question, season, pitch_type) → 내부에서 이름을 파싱해 실제 함수 호출
     """
     pitcher, batter = _extract_pitcher_batter_from_question(question)
     if not pitcher or not batter:
-        return "투수/타자 이름을 인식하지 못했어요. '김광현이 양의지에게'처럼 문장을 써 주세요."
+        return unrecognized("투수/타자 이름을 인식하지 못했어요. '김광현이 양의지에게'처럼 문장을 써 주세요.")
     return answer_twoout_basesloaded_pitch(season, pitcher, batter, pitch_type_ko)
 
 
+@traced()
 def answer_risp_with_pitch(
     question: str,
     season: int,
     pitch_type_ko: str,
     risp_mode: str = "overall",
     count_str: str | None = None,
-) -> str:
+) -> EngineResult:
     """
     득점권 + (옵션) 카운트 + 구종 조합용 래퍼
     """
     pitcher, batter = _extract_pitcher_batter_from_question(question)
     if not pitcher or not batter:
-        return "투수/타자 이름을 인식하지 못했어요. '양현종이 최형우에게'처럼 문장을 써 주세요."
+        return unrecognized("투수/타자 이름을 인식하지 못했어요. '양현종이 최형우에게'처럼 문장을 써 주세요.")
     return answer_risp_pitch(
         season=season,
         pitcher_name=pitcher,
@@ -548,18 +607,19 @@ def answer_risp_with_pitch(
     )
 
 
+@traced()
 def answer_count_with_pitch(
     question: str,
     season: int,
     pitch_type_ko: str,
     count_str: str,
-) -> str:
+) -> EngineResult:
     """
     카운트(0B0S, 3B2S, 3B0S 등) + 구종 조합용 래퍼
     """
     pitcher, batter = _extract_pitcher_batter_from_question(question)
     if not pitcher or not batter:
-        return "투수/타자 이름을 인식하지 못했어요. '김광현이 최정에게'처럼 문장을 써 주세요."
+        return unrecognized("투수/타자 이름을 인식하지 못했어요. '김광현이 최정에게'처럼 문장을 써 주세요.")
     return answer_count_pitch(
         season=season,
         pitcher_name=pitcher,
@@ -0,0 +1,132 @@
+# store_manifest.py
+# ============================================
+# ⚾ 벡터 스토어 매니페스트 (현재 세대 + 원본 CSV 지문 + 임베딩 모델)
+#  - 인덱스는 세대 디렉터리(gen-...)마다 새로 만들고, manifest.json 교체로 원자적 전환
+#  - 여러 워커 중 하나만 다시 만들도록 파일 락
+# ============================================
+
+import os
+import json
+import time
+import uuid
+import hashlib
+from typing import Any, Dict, Optional
+
+from logging_setup import get_logger
+
+logger = get_logger("store_manifest")
+
+
+MANIFEST_FILE = "manifest.json"
+LOCK_FILE = ".rebuild.lock"
+GENERATION_PREFIX = "gen-"
+
+
+def csv_fingerprint(path: str, previous: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    원본 CSV 지문 {size, mtime_ns, sha256}
+
+    크기/수정 시각이 previous와 같으면 해시를 다시 계산하지 않음
+    """
+    st = os.stat(path)
+    if previous and previous.get("size") == st.st_size and previous.get("mtime_ns") == st.st_mtime_ns:
+        return previous
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": digest.hexdigest()}
+
+
+class ChunkSetDigest:
+    """
+    샤드에 들어간 청크 ID 집합의 지문 (순서 무관, 스트림으로 누적)
+
+    청크 ID는 내용 + 메타데이터의 sha256 → 청크가 하나라도 추가/삭제/변경되면 지문이 바뀜
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.value = 0
+
+    def add(self, chunk_id: str):
+        self.count += 1
+        self.value ^= int(chunk_id, 16)
+
+    def hexdigest(self) -> str:
+        return f"{self.count}-{self.value:064x}"
+
+
+def new_generation_name() -> str:
+    """시각 + pid + 임의 접미사 (같은 프로세스가 1초 안에 다시 구축해도 겹치지 않게)"""
+    return f"{GENERATION_PREFIX}{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+
+def read_manifest(root: str) -> Dict[str, Any]:
+    try:
+        with open(os.path.join(root, MANIFEST_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_manifest(root: str, manifest: Dict[str, Any]):
+    """임시 파일에 쓰고 교체 (읽는 쪽은 항상 완전한 이전/새 매니페스트 중 하나를 봄)"""
+    os.makedirs(root, exist_ok=True)
+    path = os.path.join(root, MANIFEST_FILE)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+class RebuildLock:
+    """
+    프로세스 간 재구축 락 (O_EXCL 파일 생성)
+
+    락을 잡은 프로세스가 죽어서 남은 파일은 ttl_seconds가 지나면 무시
+    """
+
+    def __init__(self, root: str, ttl_seconds: float = 3600):
+        self.path = os.path.join(root, LOCK_FILE)
+        self.ttl_seconds = ttl_seconds
+        self.held = False
+
+    def acquire(self) -> bool:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        for _ in range(2):
+            try:
+                fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                try:
+                    age = time.time() - os.path.getmtime(self.path)
+                except OSError:
+                    continue
+                if age < self.ttl_seconds:
+                    return False
+                logger.warning("⚠️ 오래된 재구축 락 제거 (%.0f초): %s", age, self.path)
+                try:
+                    os.remove(self.path)
+                except OSError:
+                    return False
+                continue
+            with os.fdopen(fd, "w") as f:
+                f.write(f"{os.getpid()} {time.time()}")
+            self.held = True
+            return True
+        return False
+
+    def release(self):
+        if self.held:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+            self.held = False
+
+    def __enter__(self) -> bool:
+        return self.acquire()
+
+    def __exit__(self, *exc):
+        self.release()
@@ -0,0 +1,279 @@
+# tracing.py
+# ============================================
+# ⚾ 요청 단위 트레이스 (span)
+#  - 현재 트레이스 / span은 contextvars로 전달
+#    (run_in_threadpool도 컨텍스트를 복사하므로 스레드 풀로 넘어가도 이어짐)
+#  - 샘플링: 요청에 trace=true, traceparent 헤더의 sampled 플래그, 그 밖에는 TRACE_SAMPLE_RATE 확률
+#    샘플링 안 된 요청은 ContextVar 조회 한 번으로 끝 (span 객체를 만들지 않음)
+#  - /chat 응답 debug_info["trace"]: span 목록 (요청했을 때만)
+#  - TRACE_EXPORT_PATH: 샘플링된 트레이스를 OTLP JSON(OpenTelemetry) 한 줄씩 기록 (백그라운드 스레드)
+# ============================================
+
+import os
+import json
+import time
+import queue
+import random
+import secrets
+import threading
+import functools
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from logging_setup import get_logger
+
+logger = get_logger("tracing")
+
+
+SERVICE_NAME = "kbo-chatbot"
+
+
+@dataclass
+class Span:
+    name: str
+    span_id: str
+    parent_id: Optional[str]
+    start_ns: int
+    end_ns: int = 0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+
+@dataclass
+class Trace:
+    trace_id: str
+    parent_id: Optional[str] = None    # traceparent로 이어받은 상위 span
+    spans: List[Span] = field(default_factory=list)
+
+    def summary(self) -> Dict[str, Any]:
+        """debug_info용 span 목록 (시작 시각은 트레이스 시작 기준 ms)"""
+        if not self.spans:
+            return {"trace_id": self.trace_id, "spans": []}
+        origin = min(s.start_ns for s in self.spans)
+        spans = sorted(self.spans, key=lambda s: s.start_ns)
+        return {
+            "trace_id": self.trace_id,
+            "spans": [
+                {
+                    "name": s.name,
+                    "span_id": s.span_id,
+                    "parent_id": s.parent_id,
+                    "start_ms": round((s.start_ns - origin) / 1e6, 3),
+                    "duration_ms": round((s.end_ns - s.start_ns) / 1e6, 3) if s.end_ns else None,
+                    **({"attributes": s.attributes} if s.attributes else {}),
+                    **({"error": s.error} if s.error else {}),
+                }
+                for s in spans
+            ],
+        }
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """OTLP/JSON (ExportTraceServiceRequest) 형식"""
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [_otlp_attribute("service.name", SERVICE_NAME)]},
+                "scopeSpans": [{
+                    "scope": {"name": SERVICE_NAME},
+                    "spans": [
+                        {
+                            "traceId": self.trace_id,
+                            "spanId": s.span_id,
+                            **({"parentSpanId": s.parent_id} if s.parent_id else {}),
+                            "name": s.name,
+                            "kind": 2 if s.parent_id == self.parent_id else 1,  # 루트 = SERVER, 나머지 INTERNAL
+                            "startTimeUnixNano": str(s.start_ns),
+                            "endTimeUnixNano": str(s.end_ns or s.start_ns),
+                            "attributes": [_otlp_attribute(k, v) for k, v in s.attributes.items()],
+                            "status": {"code": 2, "message": s.error} if s.error else {"code": 1},
+                        }
+                        for s in self.spans
+                    ],
+                }],
+            }]
+        }
+
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[Dict[str, Any]]:
+    """W3C traceparent (00-<trace_id 32>-<parent_id 16>-<flags 2>)"""
+    parts = (header or "").strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        sampled = bool(int(parts[3], 16) & 1)
+    except ValueError:
+        return None
+    return {"trace_id": parts[1], "parent_id": parts[2], "sampled": sampled}
+
+
+class FileExporter:
+    """OTLP JSON 한 줄씩 파일에 추가 (요청 스레드는 큐에 넣기만)"""
+
+    def __init__(self, path: str, max_queue: int = 1000):
+        self.path = path
+        self._queue: "queue.Queue[Trace]" = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+        self._thread.start()
+
+    def export(self, trace: Trace):
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            pass  # 기록이 밀리면 버림 (요청 처리를 막지 않음)
+
+    def _run(self):
+        while True:
+            trace = self._queue.get()
+            try:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(trace.to_otlp(), ensure_ascii=False) + "\n")
+            except OSError as e:
+                logger.warning("⚠️ 트레이스 기록 실패: %s", e)
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+_enabled = os.getenv("TRACE_ENABLED", "1") != "0"
+_sample_rate = float(os.getenv("TRACE_SAMPLE_RATE", "0"))
+_exporter: Optional[FileExporter] = None
+_exporter_lock = threading.Lock()
+
+
+def _get_exporter() -> Optional[FileExporter]:
+    global _exporter
+    path = os.getenv("TRACE_EXPORT_PATH")
+    if not path:
+        return None
+    with _exporter_lock:
+        if _exporter is None:
+            _exporter = FileExporter(path)
+        return _exporter
+
+
+@contextmanager
+def trace_request(name: str, requested: bool = False, traceparent: Optional[str] = None) -> Iterator[Optional[Trace]]:
+    """
+    요청 하나의 루트 span (샘플링되면 Trace, 아니면 None)
+
+    Args:
+        requested: 요청이 트레이스를 원함 (항상 샘플링)
+        traceparent: 호출한 쪽의 W3C traceparent 헤더 (trace_id를 이어받고 sampled 플래그를 따름)
+    """
+    incoming = parse_traceparent(traceparent)
+    sampled = _enabled and (
+        requested
+        or (incoming["sampled"] if incoming else False)
+        or (_sample_rate > 0 and random.random() < _sample_rate)
+    )
+    if not sampled:
+        yield None
+        return
+
+    trace = Trace(
+        trace_id=incoming["trace_id"] if incoming else secrets.token_hex(16),
+        parent_id=incoming["parent_id"] if incoming else None,
+    )
+    token = _current_trace.set(trace)
+    try:
+        with _span(trace, name, trace.parent_id):
+            yield trace
+    finally:
+        _current_trace.reset(token)
+        exporter = _get_exporter()
+        if exporter:
+            exporter.export(trace)
+
+
+@contextmanager
+def _span(trace: Trace, name: str, parent_id: Optional[str], **attributes: Any) -> Iterator[Span]:
+    s = Span(name, secrets.token_hex(8), parent_id, time.time_ns(), attributes=attributes)
+    trace.spans.append(s)
+    token = _current_span.set(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        s.end_ns = time.time_ns()
+        _current_span.reset(token)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """현재 트레이스 안의 하위 span (샘플링 안 된 요청이면 아무것도 안 함)"""
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+    parent = _current_span.get()
+    with _span(trace, name, parent.span_id if parent else trace.parent_id, **attributes) as s:
+        yield s
+
+
+def traced(name: Optional[str] = None) -> Callable:
+    """함수 전체를 span으로 (이름을 안 주면 함수 이름)"""
+    def decorate(fn: Callable) -> Callable:
+        span_name = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _current_trace.get() is None:
+                return fn(*args, **kwargs)
+            with span(span_name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def set_attribute(key: str, value: Any):
+    """현재 span에 속성 추가 (샘플링 안 된 요청이면 무시)"""
+    s = _current_span.get()
+    if s is not None and _current_trace.get() is not None:
+        s.set_attribute(key, value)
+
+
+# 테스트 코드
+if __name__ == "__main__":
+    @traced()
+    def route(q):
+        time.sleep(0.002)
+        set_attribute("intent", "basic_matchup")
+
+    @traced("answer_basic_matchup")
+    def answer():
+        time.sleep(0.005)
+
+    with trace_request("main.chat", requested=True) as t:
+        route("김광현 vs 최정")
+        with span("dispatch_to_engine"):
+            answer()
+    print(json.dumps(t.summary(), ensure_ascii=False, indent=2))
+
+    with trace_request("main.chat") as t:
+        route("샘플링 안 됨")
+    print("샘플링 안 된 요청:", t)
+
+    @traced()
+    def noop():
+        pass
+
+    started = time.perf_counter()
+    for _ in range(100000):
+        noop()
+    print(f"샘플링 안 된 요청의 traced 함수 10만 번: {(time.perf_counter() - started) * 1000:.1f}ms")
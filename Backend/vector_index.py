@@ -0,0 +1,293 @@
+# vector_index.py
+# ============================================
+# ⚾ FAISS 검색 인덱스 종류 선택 (flat / IVF-Flat / HNSW / IVF-PQ / SQ8 / PQ)
+#  - 저장된 flat 인덱스의 벡터로 근사 인덱스를 학습/구성
+#  - nprobe(IVF) / efSearch(HNSW)는 검색 시점 파라미터로 전달
+#  - 메타데이터 필터(IDSelector)와 같은 SearchParameters에 묶어서 사용
+#    단, 후보가 적으면 IVF / HNSW는 근사 탐색 중에 후보를 거의 못 만나므로
+#    EXACT_SEARCH_MAX_CANDIDATES 이하면 후보 벡터만 정확한 거리로 직접 계산
+#  - 압축 인덱스(sq8 / pq / ivf_pq)는 원본 벡터를 .npy로 mmap 해두고
+#    상위 후보만 정확한 거리로 다시 정렬 (exact re-rank)
+# ============================================
+
+import os
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import faiss
+
+from vector_store_io import temp_path
+
+from logging_setup import get_logger
+
+logger = get_logger("vector_index")
+
+
+INDEX_TYPES = ("flat", "ivf_flat", "hnsw", "ivf_pq", "sq8", "pq")
+
+# 벡터를 코드로 압축해서 들고 있는 인덱스 (원본 벡터는 메모리에 없음)
+COMPRESSED_TYPES = ("ivf_pq", "sq8", "pq")
+
+# k-means 학습 시 centroid 하나당 최소 학습 벡터 수 (faiss 권장값)
+_MIN_POINTS_PER_CENTROID = 39
+
+
+@dataclass
+class IndexConfig:
+    index_type: str = "flat"
+    nlist: int = 0            # IVF 클러스터 수 (0 = 4·√N 자동)
+    nprobe: int = 8           # IVF 검색 시 살펴볼 클러스터 수
+    hnsw_m: int = 32          # HNSW 노드당 이웃 수
+    ef_construction: int = 80
+    ef_search: int = 64       # HNSW 검색 후보 큐 크기
+    pq_m: int = 0             # PQ 서브벡터 수 (0 = 차원에 맞춰 자동)
+    pq_nbits: int = 8         # 서브벡터당 코드 비트 수
+    rerank_factor: int = 4    # 압축 인덱스에서 k × factor개 뽑아 원본 벡터로 재정렬 (0 = 끔)
+    exact_search_max: int = 2048  # 필터 후보가 이 수 이하면 근사 인덱스 대신 후보 벡터로 정확 검색
+
+    @classmethod
+    def from_env(cls) -> "IndexConfig":
+        """환경 변수 설정으로 인덱스 설정 생성"""
+        index_type = os.getenv("VECTOR_INDEX_TYPE", "flat").lower()
+        if index_type not in INDEX_TYPES:
+            logger.warning("⚠️ 알 수 없는 VECTOR_INDEX_TYPE=%s, flat 사용", index_type)
+            index_type = "flat"
+        return cls(
+            index_type=index_type,
+            nlist=int(os.getenv("IVF_NLIST", "0")),
+            nprobe=int(os.getenv("IVF_NPROBE", "8")),
+            hnsw_m=int(os.getenv("HNSW_M", "32")),
+            ef_construction=int(os.getenv("HNSW_EF_CONSTRUCTION", "80")),
+            ef_search=int(os.getenv("HNSW_EF_SEARCH", "64")),
+            pq_m=int(os.getenv("PQ_M", "0")),
+            pq_nbits=int(os.getenv("PQ_NBITS", "8")),
+            rerank_factor=int(os.getenv("EXACT_RERANK_FACTOR", "4")),
+            exact_search_max=int(os.getenv("EXACT_SEARCH_MAX_CANDIDATES", "2048")),
+        )
+
+    def build_signature(self) -> Dict[str, Any]:
+        """저장된 검색 인덱스가 현재 설정으로 만든 것인지 비교할 값 (검색 시점 파라미터는 제외)"""
+        if self.index_type == "flat":
+            return {"index_type": "flat"}
+        return {
+            "index_type": self.index_type,
+            "nlist": self.nlist,
+            "hnsw_m": self.hnsw_m,
+            "ef_construction": self.ef_construction,
+            "pq_m": self.pq_m,
+            "pq_nbits": self.pq_nbits,
+        }
+
+    @property
+    def compressed(self) -> bool:
+        return self.index_type in COMPRESSED_TYPES
+
+
+def auto_nlist(n: int, requested: int = 0) -> int:
+    """IVF 클러스터 수 (학습 벡터가 centroid당 최소 개수는 되도록 제한)"""
+    nlist = requested or int(4 * math.sqrt(max(n, 1)))
+    return max(1, min(nlist, n // _MIN_POINTS_PER_CENTROID))
+
+
+def auto_pq_m(d: int, requested: int = 0) -> int:
+    """
+    PQ 서브벡터 수 (8비트 코드 기준 float32 대비 약 16배 압축 = d/4 바이트)
+
+    차원을 나누어떨어지게 하는 값만 가능
+    """
+    if requested:
+        return requested
+    target = max(d // 4, 1)
+    for m in range(target, 0, -1):
+        if d % m == 0:
+            return m
+    return 1
+
+
+def extract_vectors(index: faiss.Index) -> np.ndarray:
+    """인덱스에 들어 있는 원본 벡터 (flat 인덱스 기준)"""
+    if index.ntotal == 0:
+        return np.zeros((0, index.d), dtype="float32")
+    return index.reconstruct_n(0, index.ntotal)
+
+
+def build_index(vectors: np.ndarray, config: IndexConfig) -> faiss.Index:
+    """
+    벡터로 설정된 종류의 인덱스 구성 (FAISS 위치 = 입력 벡터 순서 그대로)
+
+    학습 데이터가 모자라면 flat으로 대체
+    """
+    vectors = np.ascontiguousarray(vectors, dtype="float32")
+    n, d = vectors.shape
+    index_type = config.index_type
+
+    if index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(d, config.hnsw_m)
+        index.hnsw.efConstruction = config.ef_construction
+    elif index_type in ("sq8", "pq"):
+        if index_type == "sq8":
+            index = faiss.IndexScalarQuantizer(d, faiss.ScalarQuantizer.QT_8bit)
+        else:
+            nbits = min(config.pq_nbits, int(math.log2(max(n, 2))))
+            index = faiss.IndexPQ(d, auto_pq_m(d, config.pq_m), nbits)
+        try:
+            index.train(vectors)
+        except RuntimeError as e:
+            logger.warning("⚠️ %s 인덱스 학습 실패 (%s), flat 사용", index_type, e)
+            index = faiss.IndexFlatL2(d)
+    elif index_type in ("ivf_flat", "ivf_pq"):
+        nlist = auto_nlist(n, config.nlist)
+        quantizer = faiss.IndexFlatL2(d)
+        if index_type == "ivf_pq":
+            # 코드북 학습에 2^nbits개 이상 벡터가 필요 → 적으면 비트 수를 낮춤
+            nbits = min(config.pq_nbits, int(math.log2(max(n, 2))))
+            index = faiss.IndexIVFPQ(quantizer, d, nlist, auto_pq_m(d, config.pq_m), nbits)
+        else:
+            index = faiss.IndexIVFFlat(quantizer, d, nlist)
+        try:
+            index.train(vectors)
+        except RuntimeError as e:
+            logger.warning("⚠️ %s 인덱스 학습 실패 (%s), flat 사용", index_type, e)
+            index = faiss.IndexFlatL2(d)
+    else:
+        index = faiss.IndexFlatL2(d)
+
+    if n:
+        index.add(vectors)
+    return index
+
+
+def search_parameters(
+    index: faiss.Index,
+    config: Optional[IndexConfig] = None,
+    selector: Optional[faiss.IDSelector] = None,
+) -> Optional[faiss.SearchParameters]:
+    """
+    인덱스 종류에 맞는 검색 파라미터 (nprobe / efSearch + IDSelector)
+
+    IndexPQ는 파라미터를 받지 않으므로 항상 None (필터 검색은 use_exact_search로 후보만 정확 검색)
+    """
+    config = config or IndexConfig()
+    if not supports_selector(index):
+        return None
+    kwargs = {"sel": selector} if selector is not None else {}
+
+    if faiss.try_extract_index_ivf(index) is not None:
+        return faiss.SearchParametersIVF(nprobe=config.nprobe, **kwargs)
+    if isinstance(index, faiss.IndexHNSW):
+        return faiss.SearchParametersHNSW(efSearch=config.ef_search, **kwargs)
+    if kwargs:
+        return faiss.SearchParameters(**kwargs)
+    return None
+
+
+def supports_selector(index: faiss.Index) -> bool:
+    """
+    SearchParameters(IDSelector)를 받는 인덱스인지
+
+    IndexPQ::search는 검색 파라미터를 아예 받지 않음 ('!(params)' 검사에서 RuntimeError)
+    """
+    return not isinstance(index, faiss.IndexPQ)
+
+
+def use_exact_search(index: faiss.Index, config: IndexConfig, candidate_count: Optional[int]) -> bool:
+    """
+    필터 후보 안에서 근사 인덱스 대신 정확 검색을 할지
+
+    IVF는 nprobe개 클러스터, HNSW는 efSearch 크기 탐색 범위 밖의 후보는 못 찾으므로
+    후보가 적으면(선수 + 시즌 등) 근사 검색 결과가 k개보다 적거나 비어버림.
+    flat은 IDSelector 검색이 이미 정확 검색이라 해당 없음.
+    pq는 필터 검색 자체가 안 되므로 후보 수와 관계없이 항상 정확 검색
+    """
+    if candidate_count is None:
+        return False
+    if not supports_selector(index):
+        return True
+    if config.index_type == "flat":
+        return False
+    return candidate_count <= config.exact_search_max
+
+
+def exact_search(
+    query_vectors,
+    positions: np.ndarray,
+    vectors: np.ndarray,
+    k: int,
+) -> List[List[Tuple[int, float]]]:
+    """
+    후보 위치들의 원본 벡터로 정확한 L2 거리 top-k (여러 질의를 행렬 연산 한 번으로)
+
+    Args:
+        positions: 후보 위치 (vectors와 같은 순서)
+        vectors: 후보 위치의 원본 벡터 (len(positions) × d)
+
+    Returns:
+        질의별 [(위치, L2 거리), ...] 가까운 순
+    """
+    x = np.asarray(query_vectors, dtype="float32")
+    if len(positions) == 0:
+        return [[] for _ in range(len(x))]
+    vectors = np.asarray(vectors, dtype="float32")
+    # ||x - c||² = ||x||² - 2·x·c + ||c||²
+    distances = (
+        (x ** 2).sum(axis=1, keepdims=True)
+        - 2 * x @ vectors.T
+        + (vectors ** 2).sum(axis=1)[None, :]
+    )
+    np.maximum(distances, 0, out=distances)
+    k = min(k, len(positions))
+    top = np.argpartition(distances, k - 1, axis=1)[:, :k]
+    results = []
+    for row, cols in zip(distances, top):
+        cols = cols[np.argsort(row[cols])]
+        results.append([(int(positions[c]), float(row[c])) for c in cols])
+    return results
+
+
+def save_full_vectors(path: str, vectors: np.ndarray):
+    """원본(float32) 벡터를 .npy로 저장 (프로세스별 임시 파일에 쓰고 교체)"""
+    tmp_path = temp_path(path, ".tmp.npy")
+    np.save(tmp_path, np.ascontiguousarray(vectors, dtype="float32"))
+    os.replace(tmp_path, path)
+
+
+def open_full_vectors(path: str) -> np.ndarray:
+    """원본 벡터 파일을 memory-map으로 열기 (실제로 읽은 페이지만 메모리에 올라옴)"""
+    return np.load(path, mmap_mode="r")
+
+
+def exact_rerank(
+    query_vector,
+    positions: List[int],
+    full_vectors: np.ndarray,
+) -> List[Tuple[int, float]]:
+    """
+    압축 인덱스 후보를 원본 벡터와의 정확한 L2 거리로 다시 정렬
+
+    Returns:
+        [(위치, L2 거리), ...] 가까운 순
+    """
+    if not positions:
+        return []
+    # mmap 배열은 정렬된 위치로 읽어야 디스크 접근이 순차적
+    positions = np.unique(np.asarray(positions, dtype="int64"))
+    q = np.asarray(query_vector, dtype="float32")
+    candidates = np.asarray(full_vectors[positions], dtype="float32")
+    distances = ((candidates - q) ** 2).sum(axis=1)
+    order = np.argsort(distances)
+    return [(int(positions[i]), float(distances[i])) for i in order]
+
+
+def index_memory_bytes(index: faiss.Index) -> int:
+    """인덱스 메모리 사용량 근사치 (직렬화 크기)"""
+    return int(faiss.serialize_index(index).size)
+
+
+def describe(index: faiss.Index) -> str:
+    """로그용 인덱스 설명"""
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        return f"{type(index).__name__}(nlist={ivf.nlist}, ntotal={index.ntotal})"
+    return f"{type(index).__name__}(ntotal={index.ntotal})"
@@ -0,0 +1,344 @@
+# vector_shard.py
+# ============================================
+# ⚾ 벡터 스토어 샤드 (시즌 하나 = 샤드 하나, 선택적으로 전체 "all" 샤드)
+#  - 샤드마다 FAISS 벡터 스토어 + 검색 인덱스 + 메타데이터/BM25 역색인을 따로 가짐
+#  - 저장 경로도 샤드별 디렉터리 (세대 디렉터리 아래), 구축이 끝난 샤드는 읽기 전용
+#    → 갱신은 항상 새 세대를 만들어 매니페스트로 교체 (RAGSystem._rebuild_generation)
+#    → 바뀌지 않은 샤드는 새 세대로 하드 링크만 (link_shard_files), 바뀐 시즌 샤드만 새로 구성
+# ============================================
+
+import os
+import json
+import shutil
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import faiss
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+
+from metadata_index import MetadataIndex, search_batch_with_selector
+from lexical_index import BM25Index
+from vector_store_io import (
+    INDEX_FILE, DOCSTORE_FILE, SQLiteDocstore, copy_docstore,
+    load_vector_store, save_vector_store, read_index, write_index, temp_path, fetch_documents
+)
+from vector_index import (
+    IndexConfig, build_index, extract_vectors, describe,
+    save_full_vectors, open_full_vectors, exact_rerank, exact_search, use_exact_search
+)
+from logging_setup import get_logger
+
+logger = get_logger("vector_shard")
+
+
+ALL_SHARD = "all"
+_SEASON_PREFIX = "season_"
+
+# 세대 구축 때 한 번 학습해서 저장하는 검색 인덱스 (flat이 아닐 때)
+SEARCH_INDEX_FILE = "search.faiss"
+SEARCH_META_FILE = "search_index.json"
+FULL_VECTORS_FILE = "full_vectors.npy"
+
+
+def shard_name_for_season(season: Any) -> str:
+    return f"{_SEASON_PREFIX}{int(season)}"
+
+
+def is_season_shard(name: str) -> bool:
+    return name.startswith(_SEASON_PREFIX)
+
+
+def link_shard_files(src: str, dst: str):
+    """
+    이전 세대의 샤드 디렉터리를 새 세대로 옮겨 쓰기 (재구성 없이)
+
+    인덱스/벡터 파일은 한 번 쓰면 바뀌지 않으므로(임시 파일 → 교체) 하드 링크, 안 되면 복사.
+    docstore.sqlite는 WAL까지 포함한 일관된 사본이 필요해서 SQLite backup으로 복사
+    """
+    os.makedirs(dst, exist_ok=True)
+    for name in os.listdir(src):
+        src_file = os.path.join(src, name)
+        if name.startswith(DOCSTORE_FILE) or ".tmp" in name or not os.path.isfile(src_file):
+            continue
+        dst_file = os.path.join(dst, name)
+        try:
+            os.link(src_file, dst_file)
+        except OSError:
+            shutil.copy2(src_file, dst_file)
+    copy_docstore(os.path.join(src, DOCSTORE_FILE), os.path.join(dst, DOCSTORE_FILE))
+
+
+class VectorShard:
+    def __init__(
+        self,
+        name: str,
+        path: Optional[str],
+        embeddings,
+        embed_chunks: Callable[[List[Document]], List[List[float]]],
+        index_config: IndexConfig,
+        hybrid_search: bool = True,
+        mmap: bool = True,
+    ):
+        """
+        Args:
+            name: 샤드 이름 ("season_2024" / "all")
+            path: 샤드 저장 디렉터리 (None이면 메모리에만)
+            embed_chunks: 청크 목록 → 벡터 목록 (RAGSystem._embed_chunks, 청크 저장소 재사용)
+        """
+        self.name = name
+        self.path = path
+        self.embeddings = embeddings
+        self.embed_chunks = embed_chunks
+        self.index_config = index_config
+        self.hybrid_search = hybrid_search
+        self.mmap = mmap
+
+        self.vectorstore = None
+        self.metadata_index = None
+        self.lexical_index = None
+
+        # 저장되는 벡터 스토어는 항상 flat, 검색 인덱스는 세대 구축 때 한 번 학습해서 search.faiss로 저장
+        self.search_index = None
+        # 압축 인덱스일 때 정확한 재정렬에 쓰는 원본 벡터 (memory-mapped .npy)
+        self.full_vectors = None
+
+    @property
+    def size(self) -> int:
+        return len(self.vectorstore.index_to_docstore_id) if self.vectorstore else 0
+
+    # ----------------------------------------
+    # 로드 / 생성 / 저장
+    # ----------------------------------------
+    def load(self):
+        """저장된 샤드 로드 (pickle 없이 index.faiss + docstore.sqlite)"""
+        self.vectorstore, _ = load_vector_store(self.path, self.embeddings, mmap=self.mmap)
+
+    def add(
+        self,
+        chunks: Dict[str, Document],
+        vectors: Optional[Dict[str, List[float]]] = None,
+    ):
+        """
+        청크 추가 (처음 호출이면 벡터 스토어 생성, 세대 구축 중 save() 전에만)
+
+        저장 경로가 있으면 문서는 바로 docstore.sqlite에 기록 → 대량 구축 중에도 문서를 메모리에 쌓지 않음
+
+        Args:
+            vectors: {chunk_id: 벡터} 미리 계산한 임베딩 (없으면 embed_chunks로 계산)
+        """
+        if not chunks:
+            return
+        ids = list(chunks.keys())
+        docs = list(chunks.values())
+        if vectors is None:
+            vectors = dict(zip(ids, self.embed_chunks(docs)))
+
+        if self.vectorstore is None:
+            dim = len(vectors[ids[0]])
+            docstore = (
+                SQLiteDocstore(os.path.join(self.path, DOCSTORE_FILE)) if self.path else InMemoryDocstore()
+            )
+            self.vectorstore = FAISS(self.embeddings, faiss.IndexFlatL2(dim), docstore, {})
+
+        self.vectorstore.add_embeddings(
+            [(doc.page_content, vectors[cid]) for cid, doc in zip(ids, docs)],
+            metadatas=[doc.metadata for doc in docs],
+            ids=ids
+        )
+
+    def save(self):
+        """벡터 스토어 저장 후 (설정 시) memory-map으로 다시 열기 (구축 마지막에 한 번)"""
+        if not self.path:
+            return
+        save_vector_store(self.path, self.vectorstore)
+
+        # 저장한 파일을 다시 memory-map으로 열어서 메모리의 사본은 내려놓음
+        if self.mmap:
+            self.vectorstore.index, _ = read_index(
+                os.path.join(self.path, INDEX_FILE), mmap=True
+            )
+
+    # ----------------------------------------
+    # 검색 구조 구성
+    # ----------------------------------------
+    def setup(self, reuse: Optional["VectorShard"] = None):
+        """
+        검색 인덱스 열기 + 메타데이터 역색인 + BM25 역색인
+
+        Args:
+            reuse: 이전 세대의 같은 샤드 (같은 파일을 링크해 왔으면 위치가 같으므로 역색인을 그대로 사용)
+        """
+        self._open_search_index()
+        if reuse is not None and reuse.metadata_index is not None and self.shares_files_with(reuse):
+            self.metadata_index = reuse.metadata_index
+            self.lexical_index = reuse.lexical_index if self.hybrid_search else None
+            return
+        self.metadata_index = MetadataIndex.from_vectorstore(self.vectorstore)
+        if self.hybrid_search:
+            self.lexical_index = BM25Index.from_vectorstore(self.vectorstore)
+
+    def shares_files_with(self, other: "VectorShard") -> bool:
+        """other와 같은 index.faiss(하드 링크)를 쓰는지"""
+        if not (self.path and other.path):
+            return False
+        try:
+            return os.path.samefile(os.path.join(self.path, INDEX_FILE), os.path.join(other.path, INDEX_FILE))
+        except OSError:
+            return False
+
+    def build_search_index(self):
+        """
+        설정된 종류의 검색 인덱스를 flat 벡터로 학습/구성해서 저장 (세대 구축 단계에서 한 번)
+
+        압축 인덱스면 원본 벡터도 full_vectors.npy로 저장.
+        다른 워커는 setup()에서 저장된 파일을 열기만 함 (워커마다 학습하지 않음)
+        """
+        if self.index_config.index_type == "flat":
+            return
+        vectors = extract_vectors(self.vectorstore.index)
+        self.search_index = build_index(vectors, self.index_config)
+        logger.info("🏗️ [%s] 검색 인덱스: %s", self.name, describe(self.search_index))
+
+        if not self.path:
+            self._use_search_index(vectors)
+            return
+        write_index(self.search_index, os.path.join(self.path, SEARCH_INDEX_FILE))
+        if self.index_config.compressed:
+            save_full_vectors(os.path.join(self.path, FULL_VECTORS_FILE), vectors)
+        # 설정 기록은 마지막에 (중간에 죽으면 다음 로드에서 저장된 인덱스를 쓰지 않음)
+        meta_path = os.path.join(self.path, SEARCH_META_FILE)
+        tmp_path = temp_path(meta_path)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.index_config.build_signature(), f)
+        os.replace(tmp_path, meta_path)
+        self._use_search_index()
+
+    def _has_search_index(self) -> bool:
+        """현재 설정으로 만든 검색 인덱스(+ 원본 벡터)가 저장돼 있는지"""
+        if not self.path:
+            return False
+        try:
+            with open(os.path.join(self.path, SEARCH_META_FILE), encoding="utf-8") as f:
+                signature = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if signature != self.index_config.build_signature():
+            return False
+        if self.index_config.compressed and not os.path.exists(os.path.join(self.path, FULL_VECTORS_FILE)):
+            return False
+        return os.path.exists(os.path.join(self.path, SEARCH_INDEX_FILE))
+
+    def _open_search_index(self):
+        """저장된 검색 인덱스 열기 (flat이면 벡터 스토어 인덱스 그대로)"""
+        if self.index_config.index_type == "flat":
+            self.search_index = self.vectorstore.index
+            return
+        if self.search_index is not None:
+            return  # build_search_index로 방금 구성
+
+        if self._has_search_index():
+            self.search_index, _ = read_index(os.path.join(self.path, SEARCH_INDEX_FILE), mmap=self.mmap)
+            self._use_search_index()
+            return
+
+        # 인덱스 설정만 바꾸고 재구축 전인 세대 → 이 프로세스 메모리에서만 구성 (파일은 건드리지 않음)
+        logger.warning("⚠️ [%s] 저장된 검색 인덱스가 없거나 설정이 달라 메모리에서 구성 (재구축 전까지)", self.name)
+        vectors = extract_vectors(self.vectorstore.index)
+        self.search_index = build_index(vectors, self.index_config)
+        self._use_search_index(vectors)
+
+    def _use_search_index(self, vectors: Optional[np.ndarray] = None):
+        """압축 인덱스면 원본 벡터는 mmap 파일(vectors를 주면 메모리)로만 두고 flat 인덱스는 내려놓음"""
+        if not self.index_config.compressed:
+            return
+        if vectors is not None:
+            self.full_vectors = vectors
+        else:
+            self.full_vectors = open_full_vectors(os.path.join(self.path, FULL_VECTORS_FILE))
+        self.vectorstore.index = self.search_index
+
+    # ----------------------------------------
+    # 검색
+    # ----------------------------------------
+    def candidates(self, filters: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        return self.metadata_index.candidates(filters)
+
+    def vector_search(
+        self,
+        query_vector: List[float],
+        k: int,
+        positions: Optional[np.ndarray] = None,
+    ) -> List[Tuple[int, Document, float]]:
+        """
+        벡터 검색 [(위치, Document, L2 거리), ...]
+
+        압축 인덱스면 후보를 더 뽑아서 원본 벡터의 정확한 거리로 재정렬
+        """
+        return self.vector_search_batch([query_vector], k, positions)[0]
+
+    def vector_search_batch(
+        self,
+        query_vectors,
+        k: int,
+        positions: Optional[np.ndarray] = None,
+    ) -> List[List[Tuple[int, Document, float]]]:
+        """
+        여러 질의를 FAISS 검색 한 번으로 (같은 후보 위치 공유), 질의별 결과 리스트
+
+        후보가 적으면(use_exact_search, pq는 항상) 근사 인덱스 대신 후보 벡터로 정확 검색
+        """
+        if positions is not None and use_exact_search(self.search_index, self.index_config, int(positions.size)):
+            return self.exact_search_batch(query_vectors, k, positions)
+
+        rerank = self.full_vectors is not None and self.index_config.rerank_factor > 0
+        search_k = k * self.index_config.rerank_factor if rerank else k
+        rows = search_batch_with_selector(
+            self.vectorstore, query_vectors, search_k, positions,
+            index=self.search_index, config=self.index_config
+        )
+        if not rerank:
+            return rows
+
+        results = []
+        for query_vector, hits in zip(query_vectors, rows):
+            docs_by_position = {position: doc for position, doc, _ in hits}
+            reranked = exact_rerank(query_vector, list(docs_by_position), self.full_vectors)
+            results.append([
+                (position, docs_by_position[position], distance)
+                for position, distance in reranked[:k]
+            ])
+        return results
+
+    def exact_search_batch(
+        self,
+        query_vectors,
+        k: int,
+        positions: np.ndarray,
+    ) -> List[List[Tuple[int, Document, float]]]:
+        """후보 위치의 원본 벡터와 정확한 L2 거리로 top-k (질의별 결과 리스트)"""
+        positions = np.unique(np.asarray(positions, dtype="int64"))
+        rows = exact_search(query_vectors, positions, self._vectors_at(positions), k)
+        docs = fetch_documents(self.vectorstore, {p for row in rows for p, _ in row})
+        return [[(p, docs[p], d) for p, d in row if p in docs] for row in rows]
+
+    def _vectors_at(self, positions: np.ndarray) -> np.ndarray:
+        """위치(정렬됨) → 원본 벡터 (압축 인덱스면 mmap .npy, 아니면 flat 인덱스에서 복원)"""
+        if self.full_vectors is not None:
+            return np.asarray(self.full_vectors[positions], dtype="float32")
+        return self.vectorstore.index.reconstruct_batch(positions)
+
+    def lexical_search(
+        self,
+        question: str,
+        k: int,
+        positions: Optional[np.ndarray] = None,
+    ) -> List[Tuple[int, float]]:
+        if self.lexical_index is None:
+            return []
+        return self.lexical_index.search(question, k, positions)
+
+    def doc_at(self, position: int) -> Optional[Document]:
+        """FAISS 위치 → Document"""
+        return fetch_documents(self.vectorstore, [position]).get(position)
@@ -0,0 +1,242 @@
+# vector_store_io.py
+# ============================================
+# ⚾ 벡터 스토어 저장/로드 (pickle 없음)
+#  - index.faiss     : FAISS 인덱스 (가능하면 memory-map으로 열기 → 워커 간 페이지 캐시 공유)
+#  - docstore.sqlite : 문서 내용/메타데이터 + FAISS 위치 → 문서 ID (필요한 ID만 조회)
+#  - FAISS.load_local(allow_dangerous_deserialization=True) 대체
+# ============================================
+
+import os
+import json
+import uuid
+import sqlite3
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import faiss
+from langchain_community.docstore.base import AddableMixin, Docstore
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+
+
+INDEX_FILE = "index.faiss"
+DOCSTORE_FILE = "docstore.sqlite"
+LEGACY_PICKLE_FILE = "index.pkl"
+
+# SQLite 변수 개수 제한 때문에 IN (...) 조회를 나눠서
+_SQL_STEP = 500
+
+
+class SQLiteDocstore(Docstore, AddableMixin):
+    """langchain FAISS가 쓰는 docstore 인터페이스를 SQLite로 구현 (문서는 ID로 필요할 때만 읽음)"""
+
+    def __init__(self, path: str):
+        dirname = os.path.dirname(path)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS documents (id TEXT PRIMARY KEY, content TEXT NOT NULL, metadata TEXT NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS positions (position INTEGER PRIMARY KEY, id TEXT NOT NULL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _to_document(doc_id: str, content: str, metadata: str) -> Document:
+        return Document(id=doc_id, page_content=content, metadata=json.loads(metadata))
+
+    def search(self, search: str) -> Union[str, Document]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content, metadata FROM documents WHERE id = ?", (search,)
+            ).fetchone()
+        if row is None:
+            return f"ID {search} not found."
+        return self._to_document(search, *row)
+
+    def search_many(self, ids: Iterable[str]) -> Dict[str, Document]:
+        """여러 ID를 한 번에 조회 (없는 ID는 빠짐)"""
+        ids = list(dict.fromkeys(ids))
+        found: Dict[str, Document] = {}
+        with self._lock:
+            for i in range(0, len(ids), _SQL_STEP):
+                part = ids[i:i + _SQL_STEP]
+                marks = ",".join("?" * len(part))
+                rows = self._conn.execute(
+                    f"SELECT id, content, metadata FROM documents WHERE id IN ({marks})", part
+                ).fetchall()
+                for doc_id, content, metadata in rows:
+                    found[doc_id] = self._to_document(doc_id, content, metadata)
+        return found
+
+    def add(self, texts: Dict[str, Document]) -> None:
+        rows = [
+            (doc_id, doc.page_content, json.dumps(doc.metadata, ensure_ascii=False, default=str))
+            for doc_id, doc in texts.items()
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO documents (id, content, metadata) VALUES (?, ?, ?)", rows
+            )
+            self._conn.commit()
+
+    def delete(self, ids: List) -> None:
+        """
+        실제 삭제는 write_positions에서 (위치 표에 없는 문서 정리)
+
+        같은 파일을 여는 다른 워커가 아직 이전 위치 표로 검색 중일 수 있음
+        """
+        return None
+
+    def load_positions(self) -> Dict[int, str]:
+        """FAISS 위치 → 문서 ID"""
+        with self._lock:
+            rows = self._conn.execute("SELECT position, id FROM positions").fetchall()
+        return {int(position): doc_id for position, doc_id in rows}
+
+    def write_positions(self, index_to_docstore_id: Dict[int, str]):
+        """위치 표를 통째로 교체하고, 더 이상 참조되지 않는 문서는 삭제 (한 트랜잭션)"""
+        with self._lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM positions")
+                self._conn.executemany(
+                    "INSERT INTO positions (position, id) VALUES (?, ?)",
+                    [(int(p), doc_id) for p, doc_id in index_to_docstore_id.items()],
+                )
+                self._conn.execute("DELETE FROM documents WHERE id NOT IN (SELECT id FROM positions)")
+
+
+def fetch_documents(vectorstore, positions: Iterable[int]) -> Dict[int, Document]:
+    """FAISS 위치 목록 → {위치: Document} (SQLite docstore면 한 번에 조회)"""
+    ids_by_position = {}
+    for position in positions:
+        doc_id = vectorstore.index_to_docstore_id.get(int(position))
+        if doc_id is not None:
+            ids_by_position[int(position)] = doc_id
+
+    docstore = vectorstore.docstore
+    if isinstance(docstore, SQLiteDocstore):
+        docs = docstore.search_many(ids_by_position.values())
+        found = {p: docs.get(doc_id) for p, doc_id in ids_by_position.items()}
+    else:
+        found = {p: docstore.search(doc_id) for p, doc_id in ids_by_position.items()}
+    return {p: doc for p, doc in found.items() if isinstance(doc, Document)}
+
+
+def iter_documents(vectorstore, batch_size: int = 2000) -> Iterator[Tuple[int, Document]]:
+    """벡터 스토어의 전체 문서를 (위치, Document)로 순회 (배치 단위 조회)"""
+    positions = sorted(vectorstore.index_to_docstore_id)
+    for i in range(0, len(positions), batch_size):
+        docs = fetch_documents(vectorstore, positions[i:i + batch_size])
+        for position in positions[i:i + batch_size]:
+            if position in docs:
+                yield position, docs[position]
+
+
+def read_index(path: str, mmap: bool = True) -> Tuple[faiss.Index, bool]:
+    """
+    FAISS 인덱스 파일 열기
+
+    mmap=True면 IO_FLAG_MMAP_IFC(flat 코드 memory-map) → IO_FLAG_MMAP 순서로 시도.
+    memory-map으로 연 인덱스는 읽기 전용 (add/remove 하면 안 됨)
+
+    Returns:
+        (인덱스, memory-map 여부)
+    """
+    if mmap:
+        for flag_name in ("IO_FLAG_MMAP_IFC", "IO_FLAG_MMAP"):
+            flag = getattr(faiss, flag_name, None)
+            if flag is None:
+                continue
+            try:
+                return faiss.read_index(path, flag), True
+            except RuntimeError:
+                continue
+    return faiss.read_index(path), False
+
+
+def temp_path(path: str, suffix: str = ".tmp") -> str:
+    """같은 파일을 여러 프로세스가 동시에 써도 겹치지 않는 임시 파일 이름 (pid + 임의 값)"""
+    return f"{path}.{os.getpid()}.{uuid.uuid4().hex[:8]}{suffix}"
+
+
+def write_index(index: faiss.Index, path: str):
+    """FAISS 인덱스를 임시 파일에 쓰고 교체 (memory-map으로 열고 있는 파일을 덮어쓰지 않도록)"""
+    tmp_path = temp_path(path)
+    faiss.write_index(index, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def copy_docstore(src: str, dst: str):
+    """docstore.sqlite 사본 (SQLite backup → WAL에 남은 내용까지, 다른 워커가 읽는 중이어도 일관된 사본)"""
+    source = sqlite3.connect(src, timeout=30)
+    target = sqlite3.connect(dst)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+
+
+def has_vector_store(path: str) -> bool:
+    return os.path.exists(os.path.join(path, INDEX_FILE)) and os.path.exists(os.path.join(path, DOCSTORE_FILE))
+
+
+def is_legacy_store(path: str) -> bool:
+    """예전 save_local(pickle) 형식인지"""
+    return os.path.exists(os.path.join(path, LEGACY_PICKLE_FILE)) and not os.path.exists(os.path.join(path, DOCSTORE_FILE))
+
+
+def load_vector_store(path: str, embeddings, mmap: bool = True) -> Tuple[FAISS, bool]:
+    """
+    index.faiss + docstore.sqlite로 langchain FAISS 객체 구성 (pickle 사용 안 함)
+
+    Returns:
+        (벡터 스토어, 인덱스 memory-map 여부)
+    """
+    if not has_vector_store(path):
+        raise FileNotFoundError(f"{INDEX_FILE} / {DOCSTORE_FILE} 없음: {path}")
+
+    index, mapped = read_index(os.path.join(path, INDEX_FILE), mmap=mmap)
+    docstore = SQLiteDocstore(os.path.join(path, DOCSTORE_FILE))
+    index_to_docstore_id = docstore.load_positions()
+
+    # 저장 도중 중단되면 인덱스와 위치 표가 어긋날 수 있음 → 다시 만들도록
+    if len(index_to_docstore_id) != index.ntotal:
+        raise ValueError(
+            f"인덱스({index.ntotal})와 docstore 위치 표({len(index_to_docstore_id)}) 크기 불일치"
+        )
+    return FAISS(embeddings, index, docstore, index_to_docstore_id), mapped
+
+
+def save_vector_store(path: str, vectorstore: FAISS):
+    """
+    벡터 스토어 저장
+
+    메모리 docstore(InMemoryDocstore)면 SQLite로 옮기고 vectorstore.docstore도 교체.
+    인덱스는 임시 파일에 쓴 뒤 교체 (memory-map으로 열고 있는 파일을 덮어쓰지 않도록)
+    """
+    os.makedirs(path, exist_ok=True)
+
+    docstore = vectorstore.docstore
+    if not isinstance(docstore, SQLiteDocstore):
+        sqlite_docstore = SQLiteDocstore(os.path.join(path, DOCSTORE_FILE))
+        docs = {}
+        for doc_id in vectorstore.index_to_docstore_id.values():
+            doc = docstore.search(doc_id)
+            if isinstance(doc, Document):
+                docs[doc_id] = doc
+        sqlite_docstore.add(docs)
+        vectorstore.docstore = docstore = sqlite_docstore
+
+    index_path = os.path.join(path, INDEX_FILE)
+    tmp_path = temp_path(index_path)
+    faiss.write_index(vectorstore.index, tmp_path)
+    docstore.write_positions(vectorstore.index_to_docstore_id)
+    os.replace(tmp_path, index_path)